@@ -1,5 +1,12 @@
 # ai_chat.py
 import streamlit as st
+from utils import motion_note
+from kundli_calculator import PLANET_NAMES
+from aspects import chart_aspects, format_aspects
+from instrumentation import counted
+from insight_corpus import corpus_reading
+from forecasts import daily_forecast
+from transits import personal_transit_summary, transit_sign_line
 try:
     from ai_interpreter import create_ai_interpreter, DEPENDENCIES_AVAILABLE
     from config import Config
@@ -91,13 +98,25 @@ class KundliChatInterface:
             if "planets" in birth_chart_data:
                 context += "Planetary Positions:\n"
                 for planet, data in birth_chart_data["planets"].items():
-                    context += f"- {planet}: {data['degree']} (House {data['house']})\n"
+                    context += f"- {planet}: {data['degree']} (House {data['house']}{motion_note(data)})\n"
+            
+                # Charts restored without raw degrees cannot be aspected
+                if all('raw_degree' in birth_chart_data["planets"].get(name, {}) for name in PLANET_NAMES):
+                    context += "Aspects:\n" + format_aspects(chart_aspects(birth_chart_data["planets"])) + "\n"
             
             if "ascendant" in birth_chart_data:
                 context += f"Ascendant: {birth_chart_data['ascendant']}\n"
             
             if "birth_info" in birth_chart_data:
                 context += f"Birth Details: {birth_chart_data['birth_info']}\n"
+
+            if "vargas" in birth_chart_data:
+                context += "Divisional Charts:\n"
+                for varga_line in birth_chart_data["vargas"]:
+                    context += f"- {varga_line}\n"
+
+            if "dasha" in birth_chart_data:
+                context += f"Current Dasha (Mahadasha / Antardasha / Pratyantardasha): {birth_chart_data['dasha']}\n"
             
             return context
             
@@ -164,12 +183,55 @@ class KundliChatInterface:
             self.interpreter.clear_memory()
         st.success("Chat history cleared!")
 
-def render_ai_features(birth_chart_data=None):
+@st.cache_resource
+@counted("create_ai_interpreter")
+def get_shared_interpreter():
+    """One interpreter per server process instead of one per button click"""
+    return create_ai_interpreter()
+
+def quick_insight(birth_chart_data, question_type, smooth=False):
+    """
+    Insight from the snippet corpus in milliseconds; the interpreter (and
+    its LLM) is only created for smoothing or when no corpus has been built
+    """
+    if not smooth:
+        reading = corpus_reading(birth_chart_data["planets"], birth_chart_data["ascendant"], question_type)
+        if reading is not None:
+            return reading
+    return get_shared_interpreter().get_astrological_insights(
+        birth_chart_data["planets"],
+        birth_chart_data["ascendant"],
+        question_type,
+        smooth=smooth
+    )
+
+@counted("daily_prediction")
+def daily_prediction(birth_chart_data, chart_store=None):
+    """
+    Today's prediction; a stored chart adds its own transit summary
+    (natal houses, conjunctions, Sade Sati) to the prompt
+    """
+    transit_summary = None
+    current_positions = None
+    row_id = birth_chart_data.get("row_id")
+    if chart_store is not None and row_id is not None:
+        transit_degrees, transit_summary = personal_transit_summary(
+            chart_store, row_id, ayanamsa=birth_chart_data.get("ayanamsa", "lahiri"))
+        current_positions = transit_sign_line(transit_degrees)
+    if current_positions is None:
+        current_positions = daily_forecast()
+    birth_chart_context = f"Birth: {birth_chart_data['birth_info']}, Ascendant: {birth_chart_data['ascendant']}"
+    if "dasha" in birth_chart_data:
+        birth_chart_context += f", Current Dasha: {birth_chart_data['dasha']}"
+    return get_shared_interpreter().get_daily_prediction(current_positions, birth_chart_context, transit_summary)
+
+def render_ai_features(birth_chart_data=None, chart_store=None):
     """
     Main function to render all AI features - simplified version
     
     Args:
         birth_chart_data: Optional birth chart data
+        chart_store: Optional ChartStore holding the chart (for its daily transits)
     """
     # Simple AI features without complex state management
     st.subheader("🔮 AI Astrology Features")
@@ -177,63 +239,43 @@ def render_ai_features(birth_chart_data=None):
     # Quick insights section
     if birth_chart_data:
         st.write("**Get instant insights about your chart:**")
+        smooth = st.checkbox("Polish insights with AI (slower)", key="smooth_insights")
         
         col1, col2 = st.columns(2)
         
         with col1:
             if st.button("💼 Career Guidance", key="career_btn"):
                 try:
-                    from ai_interpreter import create_ai_interpreter
-                    interpreter = create_ai_interpreter()
-                    insight = interpreter.get_astrological_insights(
-                        birth_chart_data["planets"],
-                        birth_chart_data["ascendant"],
-                        "career and profession"
-                    )
-                    st.write(insight)
+                    st.write(quick_insight(birth_chart_data, "career and profession", smooth))
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
             
             if st.button("💕 Love & Relationships", key="love_btn"):
                 try:
-                    from ai_interpreter import create_ai_interpreter
-                    interpreter = create_ai_interpreter()
-                    insight = interpreter.get_astrological_insights(
-                        birth_chart_data["planets"],
-                        birth_chart_data["ascendant"],
-                        "love, relationships and marriage"
-                    )
-                    st.write(insight)
+                    st.write(quick_insight(birth_chart_data, "love, relationships and marriage", smooth))
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
         
         with col2:
             if st.button("🏥 Health Insights", key="health_btn"):
                 try:
-                    from ai_interpreter import create_ai_interpreter
-                    interpreter = create_ai_interpreter()
-                    insight = interpreter.get_astrological_insights(
-                        birth_chart_data["planets"],
-                        birth_chart_data["ascendant"],
-                        "health and wellness"
-                    )
-                    st.write(insight)
+                    st.write(quick_insight(birth_chart_data, "health and wellness", smooth))
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
             
             if st.button("💰 Finance & Wealth", key="finance_btn"):
                 try:
-                    from ai_interpreter import create_ai_interpreter
-                    interpreter = create_ai_interpreter()
-                    insight = interpreter.get_astrological_insights(
-                        birth_chart_data["planets"],
-                        birth_chart_data["ascendant"],
-                        "finance, wealth and prosperity"
-                    )
-                    st.write(insight)
+                    st.write(quick_insight(birth_chart_data, "finance, wealth and prosperity", smooth))
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
         
+        if st.button("🌅 Today's Prediction", key="daily_btn"):
+            try:
+                with st.spinner("Reading today's transits..."):
+                    st.write(daily_prediction(birth_chart_data, chart_store))
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
+
         # Simple chat section
         st.subheader("💬 Ask AI Astrologer")
         
@@ -242,9 +284,10 @@ def render_ai_features(birth_chart_data=None):
         if st.button("Ask AI", key="ask_ai_btn"):
             if question:
                 try:
-                    from ai_interpreter import create_ai_interpreter
-                    interpreter = create_ai_interpreter()
+                    interpreter = get_shared_interpreter()
                     birth_chart_context = f"Birth: {birth_chart_data['birth_info']}, Ascendant: {birth_chart_data['ascendant']}"
+                    if "dasha" in birth_chart_data:
+                        birth_chart_context += f", Current Dasha: {birth_chart_data['dasha']}"
                     
                     response = interpreter.chat_with_astrologer(question, birth_chart_context)
                     st.write("**AI Response:**")
@@ -1,5 +1,9 @@
 # ai_interpreter.py
 import os
+from utils import motion_note
+from kundli_calculator import PLANET_NAMES
+from aspects import chart_aspects, format_aspects
+from insight_corpus import corpus_reading, SMOOTH_TEMPLATE
 try:
     from langchain_groq import ChatGroq
     from langchain.prompts import PromptTemplate
@@ -87,13 +91,15 @@ class KundliAIInterpreter:
         
         # Daily prediction prompt
         self.daily_prompt = PromptTemplate(
-            input_variables=["current_positions", "birth_chart", "chat_history"],
+            input_variables=["current_positions", "birth_chart", "personal_transits", "chat_history"],
             template="""
             You are a Vedic astrologer providing daily guidance. Based on the current planetary 
             positions and the person's birth chart, provide today's predictions.
             
             Current Planetary Positions: {current_positions}
             Birth Chart Summary: {birth_chart}
+            Today's Transits Over the Birth Chart:
+            {personal_transits}
             
             Chat History: {chat_history}
             
@@ -124,6 +130,12 @@ class KundliAIInterpreter:
             positions. Be warm, supportive, and practical in your guidance.
             """
         )
+        
+        # Smoothing prompt for readings assembled from the snippet corpus
+        self.smooth_prompt = PromptTemplate(
+            input_variables=["reading", "question_type"],
+            template=SMOOTH_TEMPLATE
+        )
     
     def interpret_kundli(self, planets, ascendant, birth_info):
         """
@@ -170,13 +182,14 @@ class KundliAIInterpreter:
         except Exception as e:
             return f"Sorry, I encountered an error while interpreting your Kundli: {str(e)}. Please try again."
     
-    def get_daily_prediction(self, current_positions, birth_chart_summary):
+    def get_daily_prediction(self, current_positions, birth_chart_summary, transit_summary=None):
         """
         Generate daily astrological predictions
         
         Args:
             current_positions: Current planetary positions
             birth_chart_summary: Summary of birth chart
+            transit_summary: Optional personal transit text (transits.personal_transit_summary)
             
         Returns:
             str: AI-generated daily prediction
@@ -199,6 +212,7 @@ class KundliAIInterpreter:
             response = daily_chain.run(
                 current_positions=current_positions,
                 birth_chart=birth_chart_summary,
+                personal_transits=transit_summary or "Not available",
                 chat_history=""
             )
             
@@ -256,7 +270,11 @@ class KundliAIInterpreter:
         """
         formatted_text = ""
         for planet, data in planets.items():
-            formatted_text += f"{planet}: {data['degree']} (House {data['house']})\n"
+            formatted_text += f"{planet}: {data['degree']} (House {data['house']}{motion_note(data)})\n"
+
+        # Aspects come from the same raw degrees, no extra ephemeris work
+        if all('raw_degree' in planets.get(name, {}) for name in PLANET_NAMES):
+            formatted_text += "Aspects:\n" + format_aspects(chart_aspects(planets)) + "\n"
         
         return formatted_text.strip()
     
@@ -264,18 +282,48 @@ class KundliAIInterpreter:
         """Clear conversation memory"""
         self.memory.clear()
     
-    def get_astrological_insights(self, planets, ascendant, question_type="general"):
+    def smooth_reading(self, reading, question_type):
+        """
+        Rewrite a corpus reading as flowing prose without adding predictions
+        
+        Args:
+            reading: Reading assembled by insight_corpus
+            question_type: Topic of the reading
+            
+        Returns:
+            str: Smoothed reading (the original reading if the LLM call fails)
+        """
+        try:
+            smooth_chain = LLMChain(
+                llm=self.llm,
+                prompt=self.smooth_prompt,
+                verbose=False
+            )
+            return smooth_chain.run(reading=reading, question_type=question_type)
+        except Exception:
+            return reading
+    
+    def get_astrological_insights(self, planets, ascendant, question_type="general", smooth=False):
         """
         Get specific astrological insights based on question type
         
+        Career, love, health and finance insights are assembled from the
+        precomputed snippet corpus when it has been built; the LLM is only
+        called to smooth that text (smooth=True) or for other question types.
+        
         Args:
             planets: Planetary positions
             ascendant: Ascendant information
             question_type: Type of insight needed (career, love, health, etc.)
+            smooth: Pass a corpus reading through the LLM for more natural prose
             
         Returns:
             str: Targeted astrological insight
         """
+        reading = corpus_reading(planets, ascendant, question_type)
+        if reading is not None:
+            return self.smooth_reading(reading, question_type) if smooth else reading
+        
         try:
             # Create dynamic prompt based on question type
             insight_prompt = PromptTemplate(
@@ -0,0 +1,422 @@
+# analytic_ephemeris.py
+import argparse
+import numpy as np
+
+# Low-precision position engine built from truncated analytic series. It is
+# pure NumPy, vectorized over time and location, and touches no files, so
+# it is ready before any kernel or timescale data could be loaded.
+#
+# Planets: Keplerian elements with secular rates fitted to the JPL
+# ephemerides over 3000 BC - 3000 AD (E. M. Standish, "Keplerian Elements
+# for Approximate Positions of the Major Planets", table 2a, including the
+# extra mean-anomaly terms for Jupiter and Saturn), heliocentric in the mean
+# ecliptic and equinox of J2000.
+# Moon: the ELP-2000/82 truncation of Meeus, "Astronomical Algorithms",
+# chapter 47 (60 terms each in longitude, latitude and distance).
+#
+# Output matches kundli_calculator._compute_tropical_positions: astrometric
+# (light-time corrected) topocentric longitudes in the true ecliptic and
+# equinox of date, the frame the ayanamsa is measured in. The
+# expected worst-case differences from DE421 across its 1900-2053 span are
+# in ERROR_BOUNDS; python analytic_ephemeris.py measures them and fails when
+# a bound is exceeded. Checking later dates needs a longer kernel such as
+# DE440 (KUNDLI_EPHEMERIS=de440.bsp python analytic_ephemeris.py --end 2100).
+
+BODIES = ('Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn')
+
+J2000_JD = 2451545.0
+AU_KM = 149597870.7
+LIGHT_DAYS_PER_AU = AU_KM / 299792.458 / 86400.0
+EARTH_MOON_MASS_RATIO = 81.30056
+EARTH_RADIUS_KM = 6378.137
+EARTH_FLATTENING = 1 / 298.257223563
+KEPLER_ITERATIONS = 6
+# Half-width of the central difference used for speeds (days)
+SPEED_STEP_DAYS = 0.01
+# Spacing of the two instants compute_motion evaluates (days); small enough
+# that their midpoint matches the position at the instant to 0.02"
+MOTION_STEP_DAYS = 0.001
+# Instants per Moon series evaluation; bounds the (n, 60) temporaries
+MOON_CHUNK = 65536
+
+# Worst-case longitude error against DE421 across 1900-2053, in arc-seconds
+# (topocentric, ecliptic of date; 'Ascendant' is the sidereal-time angle).
+# Jupiter and Saturn lack the mutual perturbations, hence the wider bounds.
+ERROR_BOUNDS = {
+    'Sun': 60.0,
+    'Moon': 60.0,
+    'Mercury': 150.0,
+    'Venus': 150.0,
+    'Mars': 400.0,
+    'Jupiter': 900.0,
+    'Saturn': 1800.0,
+    'Ascendant': 2.0,
+}
+
+# (value at J2000, rate per Julian century) for a (AU), e, I, L, longitude
+# of perihelion and longitude of the ascending node (degrees)
+ORBITAL_ELEMENTS = {
+    'Mercury': ((0.38709843, 0.0), (0.20563661, 0.00002123), (7.00559432, -0.00590158),
+                (252.25166724, 149472.67486623), (77.45771895, 0.15940013), (48.33961819, -0.12214182)),
+    'Venus': ((0.72332102, -0.00000026), (0.00676399, -0.00005107), (3.39777545, 0.00043494),
+              (181.97970850, 58517.81560260), (131.76755713, 0.05679648), (76.67261496, -0.27274174)),
+    'EMBary': ((1.00000018, -0.00000003), (0.01673163, -0.00003661), (-0.00054346, -0.01337178),
+               (100.46691572, 35999.37306329), (102.93005885, 0.31795260), (-5.11260389, -0.24123856)),
+    'Mars': ((1.52371243, 0.00000097), (0.09336511, 0.00009149), (1.85181869, -0.00724757),
+             (-4.56813164, 19140.29934243), (-23.91744784, 0.45223625), (49.71320984, -0.26852431)),
+    'Jupiter': ((5.20248019, -0.00002864), (0.04853590, 0.00018026), (1.29861416, -0.00322699),
+                (34.33479152, 3034.90371757), (14.27495244, 0.18199196), (100.29282654, 0.13024619)),
+    'Saturn': ((9.54149883, -0.00003065), (0.05550825, -0.00032044), (2.49424102, 0.00451969),
+               (50.07571329, 1222.11494724), (92.86136063, 0.54179478), (113.63998702, -0.25015002)),
+}
+
+# Extra mean-anomaly terms b*T^2 + c*cos(f*T) + s*sin(f*T) (degrees)
+MEAN_ANOMALY_TERMS = {
+    'Jupiter': (-0.00012452, 0.06064060, -0.35635438, 38.35125000),
+    'Saturn': (0.00025899, -0.13434469, 0.87320147, 38.35125000),
+}
+
+# Moon longitude and distance: multiples of D, M, M', F; sum_l (1e-6 deg), sum_r (1e-3 km)
+MOON_LONGITUDE_DISTANCE = np.array([
+    (0, 0, 1, 0, 6288774, -20905355), (2, 0, -1, 0, 1274027, -3699111), (2, 0, 0, 0, 658314, -2955968),
+    (0, 0, 2, 0, 213618, -569925), (0, 1, 0, 0, -185116, 48888), (0, 0, 0, 2, -114332, -3149),
+    (2, 0, -2, 0, 58793, 246158), (2, -1, -1, 0, 57066, -152138), (2, 0, 1, 0, 53322, -170733),
+    (2, -1, 0, 0, 45758, -204586), (0, 1, -1, 0, -40923, -129620), (1, 0, 0, 0, -34720, 108743),
+    (0, 1, 1, 0, -30383, 104755), (2, 0, 0, -2, 15327, 10321), (0, 0, 1, 2, -12528, 0),
+    (0, 0, 1, -2, 10980, 79661), (4, 0, -1, 0, 10675, -34782), (0, 0, 3, 0, 10034, -23210),
+    (4, 0, -2, 0, 8548, -21636), (2, 1, -1, 0, -7888, 24208), (2, 1, 0, 0, -6766, 30824),
+    (1, 0, -1, 0, -5163, -8379), (1, 1, 0, 0, 4987, -16675), (2, -1, 1, 0, 4036, -12831),
+    (2, 0, 2, 0, 3994, -10445), (4, 0, 0, 0, 3861, -11650), (2, 0, -3, 0, 3665, 14403),
+    (0, 1, -2, 0, -2689, -7003), (2, 0, -1, 2, -2602, 0), (2, -1, -2, 0, 2390, 10056),
+    (1, 0, 1, 0, -2348, 6322), (2, -2, 0, 0, 2236, -9884), (0, 1, 2, 0, -2120, 5751),
+    (0, 2, 0, 0, -2069, 0), (2, -2, -1, 0, 2048, -4950), (2, 0, 1, -2, -1773, 4130),
+    (2, 0, 0, 2, -1595, 0), (4, -1, -1, 0, 1215, -3958), (0, 0, 2, 2, -1110, 0),
+    (3, 0, -1, 0, -892, 3258), (2, 1, 1, 0, -810, 2616), (4, -1, -2, 0, 759, -1897),
+    (0, 2, -1, 0, -713, -2117), (2, 2, -1, 0, -700, 2354), (2, 1, -2, 0, 691, 0),
+    (2, -1, 0, -2, 596, 0), (4, 0, 1, 0, 549, -1423), (0, 0, 4, 0, 537, -1117),
+    (4, -1, 0, 0, 520, -1571), (1, 0, -2, 0, -487, -1739), (2, 1, 0, -2, -399, 0),
+    (0, 0, 2, -2, -381, -4421), (1, 1, 1, 0, 351, 0), (3, 0, -2, 0, -340, 0),
+    (4, 0, -3, 0, 330, 0), (2, -1, 2, 0, 327, 0), (0, 2, 1, 0, -323, 1165),
+    (1, 1, -1, 0, 299, 0), (2, 0, 3, 0, 294, 0), (2, 0, -1, -2, 0, 8752),
+], dtype=float)
+
+# Moon latitude: multiples of D, M, M', F; sum_b (1e-6 deg)
+MOON_LATITUDE = np.array([
+    (0, 0, 0, 1, 5128122), (0, 0, 1, 1, 280602), (0, 0, 1, -1, 277693), (2, 0, 0, -1, 173237),
+    (2, 0, -1, 1, 55413), (2, 0, -1, -1, 46271), (2, 0, 0, 1, 32573), (0, 0, 2, 1, 17198),
+    (2, 0, 1, -1, 9266), (0, 0, 2, -1, 8822), (2, -1, 0, -1, 8216), (2, 0, -2, -1, 4324),
+    (2, 0, 1, 1, 4200), (2, 1, 0, -1, -3359), (2, -1, -1, 1, 2463), (2, -1, 0, 1, 2211),
+    (2, -1, -1, -1, 2065), (0, 1, -1, -1, -1870), (4, 0, -1, -1, 1828), (0, 1, 0, 1, -1794),
+    (0, 0, 0, 3, -1749), (0, 1, -1, 1, -1565), (1, 0, 0, 1, -1491), (0, 1, 1, 1, -1475),
+    (0, 1, 1, -1, -1410), (0, 1, 0, -1, -1344), (1, 0, 0, -1, -1335), (0, 0, 3, 1, 1107),
+    (4, 0, 0, -1, 1021), (4, 0, -1, 1, 833), (0, 0, 1, -3, 777), (4, 0, -2, 1, 671),
+    (2, 0, 0, -3, 607), (2, 0, 2, -1, 596), (2, -1, 1, -1, 491), (2, 0, -2, 1, -451),
+    (0, 0, 3, -1, 439), (2, 0, 2, 1, 422), (2, 0, -3, -1, 421), (2, 1, -1, 1, -366),
+    (2, 1, 0, 1, -351), (4, 0, 0, 1, 331), (2, -1, 1, 1, 315), (2, -2, 0, -1, 302),
+    (0, 0, 1, 3, -283), (2, 1, 1, -1, -229), (1, 1, 0, -1, 223), (1, 1, 0, 1, 223),
+    (0, 1, -2, -1, -220), (2, 1, -1, -1, -220), (1, 0, 1, 1, -185), (2, -1, -2, -1, 181),
+    (0, 1, 2, 1, -177), (4, 0, -2, -1, 176), (4, -1, -1, -1, 166), (1, 0, 1, -1, -164),
+    (4, 0, 1, -1, 132), (1, 0, -1, -1, -119), (4, -1, 0, -1, 115), (2, -2, 0, 1, 107),
+], dtype=float)
+
+def julian_day(year, month, day, hour=0.0, minute=0.0):
+    """
+    Julian date of proleptic Gregorian calendar components (vectorized).
+
+    Returns:
+        float or numpy.ndarray: Julian date in the time scale of the inputs
+    """
+    year, month = np.asarray(year, dtype=float), np.asarray(month, dtype=float)
+    january_february = month <= 2
+    year = np.where(january_february, year - 1, year)
+    month = np.where(january_february, month + 12, month)
+    century = np.floor(year / 100)
+    jd = (np.floor(365.25 * (year + 4716)) + np.floor(30.6001 * (month + 1)) + np.asarray(day, dtype=float)
+          + 2 - century + np.floor(century / 4) - 1524.5 + (np.asarray(hour) + np.asarray(minute) / 60.0) / 24.0)
+    return float(jd) if jd.ndim == 0 else jd
+
+def delta_t_seconds(jd_ut):
+    """TT - UT in seconds (Espenak & Meeus polynomials, long-term parabola outside 1900-2150)."""
+    year = 2000.0 + (np.asarray(jd_ut, dtype=float) - J2000_JD) / 365.25
+    t = year - 2000
+    long_term = -20 + 32 * ((year - 1820) / 100) ** 2
+    return np.select(
+        [year < 1900, year < 1920, year < 1941, year < 1961, year < 1986, year < 2005, year < 2050, year < 2150],
+        [long_term,
+         -2.79 + (year - 1900) * (1.494119 + (year - 1900) * (-0.0598939 + (year - 1900) * (0.0061966 - 0.000197 * (year - 1900)))),
+         21.20 + (year - 1920) * (0.84493 + (year - 1920) * (-0.076100 + 0.0020936 * (year - 1920))),
+         29.07 + 0.407 * (year - 1950) - (year - 1950) ** 2 / 233 + (year - 1950) ** 3 / 2547,
+         45.45 + 1.067 * (year - 1975) - (year - 1975) ** 2 / 260 - (year - 1975) ** 3 / 718,
+         63.86 + t * (0.3345 + t * (-0.060374 + t * (0.0017275 + t * (0.000651814 + 0.00002373599 * t)))),
+         62.92 + t * (0.32217 + 0.005589 * t),
+         long_term - 0.5628 * (2150 - year)],
+        long_term)
+
+def _mean_obliquity(T):
+    """Mean obliquity of the ecliptic of date (radians)."""
+    return np.radians(23.4392911111 - (46.8150 * T + 0.00059 * T ** 2 - 0.001813 * T ** 3) / 3600.0)
+
+def _nutation_longitude(T):
+    """Nutation in longitude from its main terms (degrees)."""
+    node = np.radians(125.04452 - 1934.136261 * T)
+    sun = np.radians(280.4665 + 36000.7698 * T)
+    moon = np.radians(218.3165 + 481267.8813 * T)
+    return (-17.20 * np.sin(node) - 1.32 * np.sin(2 * sun) - 0.23 * np.sin(2 * moon) + 0.21 * np.sin(2 * node)) / 3600.0
+
+def sidereal_time_degrees(jd_ut):
+    """
+    Greenwich apparent sidereal time as an angle, with the main nutation terms.
+
+    Returns:
+        numpy.ndarray: Degrees in [0, 360)
+    """
+    jd_ut = np.asarray(jd_ut, dtype=float)
+    T = (jd_ut - J2000_JD) / 36525.0
+    mean = 280.46061837 + 360.98564736629 * (jd_ut - J2000_JD) + 0.000387933 * T ** 2 - T ** 3 / 38710000.0
+    return (mean + _nutation_longitude(T) * np.cos(_mean_obliquity(T))) % 360
+
+def _precess(vector, T, t):
+    """Rotate ecliptic vectors (3, ...) from epoch T to epoch T + t, in Julian centuries from J2000 (Meeus 21.5)."""
+    arcsec = np.pi / (180 * 3600)
+    eta = ((47.0029 - 0.06603 * T + 0.000598 * T ** 2) * t + (-0.03302 + 0.000598 * T) * t ** 2
+           + 0.000060 * t ** 3) * arcsec
+    pi = np.radians(174.876384) + (3289.4789 * T + 0.60622 * T ** 2 - (869.8089 + 0.50491 * T) * t
+                                   + 0.03536 * t ** 2) * arcsec
+    p = ((5029.0966 + 2.22226 * T - 0.000042 * T ** 2) * t + (1.11113 - 0.000042 * T) * t ** 2
+         - 0.000006 * t ** 3) * arcsec
+
+    x, y, z = vector
+    distance = np.sqrt(x * x + y * y + z * z)
+    longitude, latitude = np.arctan2(y, x), np.arcsin(z / distance)
+    a = np.cos(eta) * np.cos(latitude) * np.sin(pi - longitude) - np.sin(eta) * np.sin(latitude)
+    b = np.cos(latitude) * np.cos(pi - longitude)
+    c = np.cos(eta) * np.sin(latitude) + np.sin(eta) * np.cos(latitude) * np.sin(pi - longitude)
+    longitude = p + pi - np.arctan2(a, b)
+    latitude = np.arcsin(np.clip(c, -1.0, 1.0))
+    return distance * np.array([np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude),
+                                np.sin(latitude)])
+
+def _heliocentric(name, T):
+    """Heliocentric J2000 ecliptic position (3, ...) in AU from the Keplerian elements."""
+    (a, e, inclination, mean_longitude, perihelion, node) = (value + rate * T
+                                                             for value, rate in ORBITAL_ELEMENTS[name])
+    mean_anomaly = mean_longitude - perihelion
+    if name in MEAN_ANOMALY_TERMS:
+        b, c, s, f = MEAN_ANOMALY_TERMS[name]
+        mean_anomaly = mean_anomaly + b * T ** 2 + c * np.cos(np.radians(f * T)) + s * np.sin(np.radians(f * T))
+    mean_anomaly = np.radians((mean_anomaly + 180) % 360 - 180)
+
+    anomaly = mean_anomaly + e * np.sin(mean_anomaly)
+    for _ in range(KEPLER_ITERATIONS):
+        anomaly = anomaly - (anomaly - e * np.sin(anomaly) - mean_anomaly) / (1 - e * np.cos(anomaly))
+    x_orbit = a * (np.cos(anomaly) - e)
+    y_orbit = a * np.sqrt(1 - e * e) * np.sin(anomaly)
+
+    argument = np.radians(perihelion - node)
+    node, inclination = np.radians(node), np.radians(inclination)
+    cos_w, sin_w, cos_o, sin_o, cos_i = np.cos(argument), np.sin(argument), np.cos(node), np.sin(node), np.cos(inclination)
+    return np.array([
+        (cos_w * cos_o - sin_w * sin_o * cos_i) * x_orbit + (-sin_w * cos_o - cos_w * sin_o * cos_i) * y_orbit,
+        (cos_w * sin_o + sin_w * cos_o * cos_i) * x_orbit + (-sin_w * sin_o + cos_w * cos_o * cos_i) * y_orbit,
+        np.sin(argument) * np.sin(inclination) * x_orbit + cos_w * np.sin(inclination) * y_orbit,
+    ])
+
+def _moon_series(T):
+    """Geocentric Moon in the ecliptic of date for a flat array of T: (longitude, latitude) radians, distance km."""
+    mean_longitude = 218.3164477 + 481267.88123421 * T - 0.0015786 * T ** 2 + T ** 3 / 538841 - T ** 4 / 65194000
+    elongation = 297.8501921 + 445267.1114034 * T - 0.0018819 * T ** 2 + T ** 3 / 545868 - T ** 4 / 113065000
+    sun_anomaly = 357.5291092 + 35999.0502909 * T - 0.0001536 * T ** 2 + T ** 3 / 24490000
+    moon_anomaly = 134.9633964 + 477198.8675055 * T + 0.0087414 * T ** 2 + T ** 3 / 69699 - T ** 4 / 14712000
+    argument = 93.2720950 + 483202.0175233 * T - 0.0036539 * T ** 2 - T ** 3 / 3526000 + T ** 4 / 863310000
+    a1, a2, a3 = (np.radians(119.75 + 131.849 * T), np.radians(53.09 + 479264.290 * T),
+                  np.radians(313.45 + 481266.484 * T))
+    eccentricity = 1 - 0.002516 * T - 0.0000074 * T ** 2
+
+    fundamental = np.radians(np.stack([elongation, sun_anomaly, moon_anomaly, argument], axis=-1))
+    mean_longitude, argument = np.radians(mean_longitude), np.radians(argument)
+    moon_anomaly = np.radians(moon_anomaly)
+
+    # Terms involving the Sun's anomaly shrink with the Earth's orbital eccentricity
+    def scaled(table):
+        angles = fundamental @ table[:, :4].T
+        return angles, eccentricity[:, None] ** np.abs(table[:, 1])
+
+    angles, factor = scaled(MOON_LONGITUDE_DISTANCE)
+    sum_l = (factor * np.sin(angles)) @ MOON_LONGITUDE_DISTANCE[:, 4]
+    sum_r = (factor * np.cos(angles)) @ MOON_LONGITUDE_DISTANCE[:, 5]
+    angles, factor = scaled(MOON_LATITUDE)
+    sum_b = (factor * np.sin(angles)) @ MOON_LATITUDE[:, 4]
+
+    sum_l += 3958 * np.sin(a1) + 1962 * np.sin(mean_longitude - argument) + 318 * np.sin(a2)
+    sum_b += (-2235 * np.sin(mean_longitude) + 382 * np.sin(a3) + 175 * np.sin(a1 - argument)
+              + 175 * np.sin(a1 + argument) + 127 * np.sin(mean_longitude - moon_anomaly)
+              - 115 * np.sin(mean_longitude + moon_anomaly))
+    return mean_longitude + np.radians(sum_l / 1e6), np.radians(sum_b / 1e6), 385000.56 + sum_r / 1000.0
+
+def _geocentric_moon(T):
+    """Geocentric Moon position (3, ...) in AU, mean ecliptic of date."""
+    flat = np.ravel(T)
+    longitude, latitude, distance = (np.empty_like(flat) for _ in range(3))
+    for start in range(0, flat.size, MOON_CHUNK):
+        chunk = slice(start, start + MOON_CHUNK)
+        longitude[chunk], latitude[chunk], distance[chunk] = _moon_series(flat[chunk])
+    distance = distance / AU_KM
+    return (distance * np.array([np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude),
+                                 np.sin(latitude)])).reshape((3,) + np.shape(T))
+
+def _observer(jd_ut, T, latitudes, longitudes):
+    """Geocentric position (3, ...) in AU of a sea-level observer, mean ecliptic of date."""
+    latitude = np.radians(latitudes)
+    c = 1 / np.sqrt(np.cos(latitude) ** 2 + (1 - EARTH_FLATTENING) ** 2 * np.sin(latitude) ** 2)
+    s = (1 - EARTH_FLATTENING) ** 2 * c
+    angle = np.radians(sidereal_time_degrees(jd_ut) + longitudes)
+    radius = EARTH_RADIUS_KM / AU_KM
+    x = radius * c * np.cos(latitude) * np.cos(angle)
+    y = radius * c * np.cos(latitude) * np.sin(angle)
+    z = radius * s * np.sin(latitude) * np.ones_like(angle)
+    obliquity = _mean_obliquity(T)
+    return np.array([x, y * np.cos(obliquity) + z * np.sin(obliquity), -y * np.sin(obliquity) + z * np.cos(obliquity)])
+
+def _longitudes(jd_ut, latitudes, longitudes, bodies, geocentric=False):
+    """
+    Astrometric longitudes (bodies, ...) in degrees, true ecliptic and equinox of date.
+
+    With geocentric, returns (longitudes, geocentric longitudes) from the same vectors.
+    """
+    jd_tt = jd_ut + delta_t_seconds(jd_ut) / 86400.0
+    T = (jd_tt - J2000_JD) / 36525.0
+    moon = _geocentric_moon(T)
+    # The elements are J2000; the Moon, the observer and the output are of date
+    earth = _heliocentric('EMBary', T) - _precess(moon, T, -T) / (1 + EARTH_MOON_MASS_RATIO)
+    observer = 0.0 if latitudes is None else _observer(jd_ut, T, latitudes, longitudes)
+
+    degrees, geocentric_degrees = [], []
+    for name in bodies:
+        if name == 'Sun':
+            vector = _precess(-earth, 0.0, T)
+        elif name == 'Moon':
+            vector = moon
+        else:
+            # One light-time iteration is well below the model error
+            vector = _heliocentric(name, T) - earth
+            light_time = np.sqrt(np.sum(vector ** 2, axis=0)) * LIGHT_DAYS_PER_AU
+            vector = _precess(_heliocentric(name, T - light_time / 36525.0) - earth, 0.0, T)
+        if geocentric:
+            geocentric_degrees.append(np.degrees(np.arctan2(vector[1], vector[0])))
+        vector = vector - observer
+        degrees.append(np.degrees(np.arctan2(vector[1], vector[0])))
+    nutation = _nutation_longitude(T)
+    if geocentric:
+        return (np.array(degrees) + nutation) % 360, (np.array(geocentric_degrees) + nutation) % 360
+    return (np.array(degrees) + nutation) % 360
+
+def compute_positions(jd_ut, latitudes=None, longitudes=None, bodies=BODIES, speeds=False):
+    """
+    Evaluate bodies and the ascendant analytically, without any ephemeris file.
+
+    Args:
+        jd_ut: Julian date(s) in UT
+        latitudes: Observer latitude(s) in degrees; None for geocentric positions
+        longitudes: Observer longitude(s) in degrees
+        bodies: Body names (subset of BODIES) in output row order
+        speeds: Also return longitude rates from a central difference (of the
+                same, possibly topocentric, positions; compute_motion gives
+                the geocentric rates the motion flags use)
+
+    Returns:
+        tuple: (planet_degrees, ascendant_degrees, planet_speeds) with one row
+               per body, like kundli_calculator._compute_tropical_positions;
+               the ascendant is None for geocentric positions and the speeds
+               are None unless requested
+    """
+    jd_ut = np.asarray(jd_ut, dtype=float)
+    if latitudes is not None:
+        latitudes, longitudes = np.asarray(latitudes, dtype=float), np.asarray(longitudes, dtype=float)
+        jd_ut = jd_ut + np.zeros(np.broadcast(jd_ut, latitudes, longitudes).shape)
+    ascendant = None if longitudes is None else (sidereal_time_degrees(jd_ut) + longitudes) % 360
+    if not speeds:
+        return _longitudes(jd_ut, latitudes, longitudes, bodies), ascendant, None
+
+    # Both neighbours and the instant itself in one vectorized evaluation
+    offsets = np.array([-SPEED_STEP_DAYS, 0.0, SPEED_STEP_DAYS]).reshape((3,) + (1,) * jd_ut.ndim)
+    stacked = _longitudes(jd_ut + offsets, latitudes, longitudes, bodies)
+    before, degrees, after = stacked[:, 0], stacked[:, 1], stacked[:, 2]
+    return degrees, ascendant, ((after - before + 180) % 360 - 180) / (2 * SPEED_STEP_DAYS)
+
+def compute_motion(jd_ut, latitudes, longitudes, bodies=BODIES):
+    """
+    Topocentric positions plus the geocentric motion, from one stacked evaluation.
+
+    Only the two instants MOTION_STEP_DAYS apart, centred on jd_ut, are
+    evaluated: their midpoint gives the positions and their difference the
+    rates, both to second order. The observer only shifts the vectors, so
+    the geocentric longitudes come from the same pass.
+
+    Returns:
+        tuple: (planet_degrees, ascendant_degrees, geocentric_degrees, geocentric_speeds)
+               laid out like kundli_calculator._compute_tropical_positions(..., motion=True)
+    """
+    jd_ut = np.asarray(jd_ut, dtype=float)
+    latitudes, longitudes = np.asarray(latitudes, dtype=float), np.asarray(longitudes, dtype=float)
+    jd_ut = jd_ut + np.zeros(np.broadcast(jd_ut, latitudes, longitudes).shape)
+    ascendant = (sidereal_time_degrees(jd_ut) + longitudes) % 360
+
+    offsets = np.array([-MOTION_STEP_DAYS / 2, MOTION_STEP_DAYS / 2]).reshape((2,) + (1,) * jd_ut.ndim)
+    topocentric, geocentric = _longitudes(jd_ut + offsets, latitudes, longitudes, bodies, geocentric=True)
+
+    def midpoint_and_change(stacked):
+        change = (stacked[:, 1] - stacked[:, 0] + 180) % 360 - 180
+        return (stacked[:, 0] + change / 2) % 360, change
+
+    planet_degrees, _ = midpoint_and_change(topocentric)
+    geocentric_degrees, change = midpoint_and_change(geocentric)
+    return planet_degrees, ascendant, geocentric_degrees, change / MOTION_STEP_DAYS
+
+def compare_with_ephemeris(start_year=1900, end_year=2053, samples=20000, latitude=28.6139, longitude=77.2090,
+                           seed=0):
+    """
+    Measure the analytic engine against the Skyfield kernel (DE421 by default).
+
+    Random instants across the range are evaluated by both engines for one
+    observer through kundli_calculator.calculate_positions_jd. The range is
+    clamped to the loaded kernel's coverage (DE421 ends in October 2053;
+    point KUNDLI_EPHEMERIS at DE440 to check later years).
+
+    Returns:
+        dict: name -> {'max': worst error, 'rms': RMS error, 'bound': ERROR_BOUNDS value}
+              in arc-seconds, for every body and the ascendant
+    """
+    from kundli_calculator import PLANET_NAMES, calculate_positions_jd
+    from ephemeris import kernel_coverage
+
+    # A day of margin leaves room for light-time and the TDB - UT offset
+    kernel_start, kernel_end = kernel_coverage()
+    start_jd = max(julian_day(start_year, 1, 1), kernel_start + 1)
+    end_jd = min(julian_day(end_year, 1, 1), kernel_end - 1)
+    if start_jd >= end_jd:
+        raise ValueError(f"The ephemeris kernel does not cover {start_year}-{end_year}")
+
+    rng = np.random.default_rng(seed)
+    jd = rng.uniform(start_jd, end_jd, samples)
+    expected, expected_ascendant = calculate_positions_jd(jd, latitude, longitude, 'tropical', engine='ephemeris')
+    actual, actual_ascendant = calculate_positions_jd(jd, latitude, longitude, 'tropical', engine='analytic')
+
+    errors = np.column_stack((actual, actual_ascendant)) - np.column_stack((expected, expected_ascendant))
+    errors = np.abs((errors + 180) % 360 - 180) * 3600
+    return {name: {'max': float(column.max()), 'rms': float(np.sqrt(np.mean(column ** 2))),
+                   'bound': ERROR_BOUNDS[name]}
+            for name, column in zip(list(PLANET_NAMES) + ['Ascendant'], errors.T)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the analytic ephemeris with the kernel")
+    parser.add_argument("--start", type=int, default=1900, help="First year")
+    parser.add_argument("--end", type=int, default=2053, help="Last year (clamped to the kernel coverage)")
+    parser.add_argument("--samples", type=int, default=20000)
+    args = parser.parse_args()
+
+    report = compare_with_ephemeris(args.start, args.end, args.samples)
+    for name, errors in report.items():
+        status = "ok" if errors['max'] <= errors['bound'] else "EXCEEDS BOUND"
+        print(f"{name:10s} max {errors['max']:8.1f}\"  rms {errors['rms']:8.1f}\"  bound {errors['bound']:7.1f}\"  {status}")
+    if any(errors['max'] > errors['bound'] for errors in report.values()):
+        raise SystemExit(1)
@@ -1,11 +1,21 @@
 # app.py
 import streamlit as st
 from kundli_calculator import calculate_planets
-from kundali_chart import draw_kundali_chart
+from kundali_chart import draw_kundali_chart, draw_sensitivity_timeline
 from forecasts import daily_forecast
-from utils import format_date, format_planet_positions
-from datetime import datetime, date
+from utils import format_date, format_planet_positions, julian_date
+from dasha import dasha_from_planets, format_dasha_period
+from vargas import varga_chart, format_varga_positions, VARGA_NAMES
+from chart_store import ChartStore, DEFAULT_STORE_DIR, chart_batch_from_planets
+from rectification import birth_time_sweep, format_sweep
+from timezones import resolve_timezone, utc_offset_hours
+from panchang import get_panchang_year, iter_panchang_csv, iter_panchang_json
+from instrumentation import counted
+import io
+import os
+from datetime import datetime, date, timedelta
 from geopy.geocoders import Nominatim
+import matplotlib.pyplot as plt
 import ssl
 import certifi
 import time
@@ -20,6 +30,11 @@ except ImportError as e:
     AI_FEATURES_AVAILABLE = False
     print(f"AI features not available: {e}")
 
+# Fragments rerun on their own when their widgets change (st.experimental_fragment before Streamlit 1.37)
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda function: function)
+
+FORECAST_TTL_SECONDS = 15 * 60
+
 # Initialize session state for AI interpreter (singleton pattern)
 if "ai_interpreter" not in st.session_state:
     st.session_state.ai_interpreter = None
@@ -38,197 +53,356 @@ def get_ai_interpreter():
             return None
     return None
 
-st.title("🪐 Kundli Generator AI")
-
-# Create main tabs to separate basic Kundli from AI features
-main_tab, ai_tab = st.tabs(["📊 Generate Kundli", "🤖 AI Features"])
+@st.cache_resource
+def get_chart_store():
+    """Get the persistent chart store (cached so segments stay memory-mapped)"""
+    store_dir = os.getenv("CHART_STORE_DIR", DEFAULT_STORE_DIR)
+    return ChartStore(store_dir) if store_dir else None
 
-# Sidebar for AI features
-with st.sidebar:
-    st.header("🤖 AI Features")
-    
-    # Check if AI features are available
-    if not AI_FEATURES_AVAILABLE:
-        st.warning("⚠️ AI Features Not Available")
-        st.info("Install AI dependencies: pip install langchain langchain-groq python-dotenv groq")
-    else:
+@st.cache_data(show_spinner=False)
+@counted("geocode")
+def search_locations(query):
+    """Geocode a search string once; returns (address, latitude, longitude) tuples"""
+    ctx = ssl.create_default_context(cafile=certifi.where())
+    geolocator = Nominatim(
+        user_agent="kundli_generator",
+        ssl_context=ctx,
+        timeout=10  # Increase timeout
+    )
+    for attempt in range(3):  # Try 3 times
         try:
-            Config.validate_config()
-            st.success("✅ AI Features Enabled")
-            st.info("Generate your Kundli to unlock AI features!")
-                
-        except ValueError:
-            st.warning("⚠️ AI Features Disabled")
-            st.info("Set GROQ_API_KEY to enable AI features")
-    
-    st.markdown("---")
-    st.markdown("**Features:**")
-    st.markdown("• AI-powered Kundli interpretation")
-    st.markdown("• Conversational astrology chat")
-    st.markdown("• Personalized insights")
-    st.markdown("• Daily predictions")
+            locations = geolocator.geocode(query, exactly_one=False, limit=5)
+            return [(loc.address, loc.latitude, loc.longitude) for loc in locations or []]
+        except Exception as retry_error:
+            if attempt == 2:  # Last attempt
+                raise retry_error
+            time.sleep(1)  # Wait 1 second before retry
 
-# Main Kundli Generation Tab
-with main_tab:
-    st.subheader("📊 Generate Your Kundli")
-    
-    # Inputs with calendar and location
-    birth_date = st.date_input("Birth Date", value=date(2000, 1, 1))
-    birth_time_str = st.text_input("Birth Time (HH:MM, 24-hour format)", "12:00")
+@st.cache_data(ttl=FORECAST_TTL_SECONDS, show_spinner=False)
+@counted("daily_forecast")
+def cached_daily_forecast():
+    """Daily forecast, recomputed at most every FORECAST_TTL_SECONDS"""
+    return daily_forecast()
 
-    # Location search with suggestions
-    location_search = st.text_input("Type Birth Location (City, Country)", "")
+@counted("render_figure")
+def figure_png(fig):
+    """Render a Matplotlib figure to PNG bytes once so reruns only redisplay it"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
 
-    # Get coordinates from location
-    latitude = None
-    longitude = None
-    valid_input = True
-    location_options = []
+@counted("calculate_planets")
+def compute_planets(*args, **kwargs):
+    return calculate_planets(*args, **kwargs)
+
+@counted("birth_time_sweep")
+def compute_sweep(*args, **kwargs):
+    return birth_time_sweep(*args, **kwargs)
+
+@counted("panchang")
+def compute_panchang(*args, **kwargs):
+    return get_panchang_year(*args, **kwargs)
+
+def generate_chart(birth_dt, birth_time_str, location, zodiac, ayanamsa, utc_offset, sweep_minutes):
+    """
+    Compute the chart and every derived artifact once per Generate click.
+
+    Returns:
+        tuple: (chart, error) where chart holds everything the chart display
+               needs (text and PNG images) and error is a message or None
+    """
+    latitude, longitude = location["latitude"], location["longitude"]
+    planets, ascendant, ascendant_degrees = compute_planets(
+        birth_dt.strftime('%Y/%m/%d'), birth_time_str, latitude, longitude,
+        zodiac=zodiac, ayanamsa=ayanamsa, utc_offset_hours=utc_offset, raw_ascendant=True)
+    if isinstance(planets, str):
+        return None, planets
+    birth_dt_utc = birth_dt - timedelta(hours=utc_offset)
+
+    # Current Vimshottari period (bisection lookup, no tree expansion)
+    current_dasha = format_dasha_period(dasha_from_planets(planets, birth_dt, datetime.now()))
+
+    # Divisional charts from the same raw longitudes (no extra ephemeris work); the
+    # ascendant label is rounded to the arc-minute, too coarse for the finer vargas
+    divisional_charts = {division: varga_chart(planets, ascendant_degrees['degree'], division) for division in (9, 10)}
+
+    chart = {
+        "planets": planets,
+        "ascendant": ascendant,
+        "birth_dt": birth_dt,
+        "dasha": current_dasha,
+        "chart_png": figure_png(draw_kundali_chart(planets, ascendant)),
+        "varga_pngs": [(f"{VARGA_NAMES[division]} (D{division}) Chart",
+                        figure_png(draw_kundali_chart(varga_planets, varga_ascendant,
+                                                      title=f"{VARGA_NAMES[division]} (D{division})")))
+                       for division, (varga_planets, varga_ascendant) in divisional_charts.items()],
+        "sweep_png": None,
+        "sweep_text": None,
+        "sweep_error": None,
+        "store_error": None,
+    }
+
+    # Birth-time sensitivity: every minute of the window in one vectorized evaluation
+    try:
+        sweep = compute_sweep(birth_dt_utc, latitude, longitude, window_minutes=sweep_minutes,
+                              utc_offset_hours=utc_offset, zodiac=zodiac, ayanamsa=ayanamsa)
+        chart["sweep_png"] = figure_png(draw_sensitivity_timeline(sweep))
+        chart["sweep_text"] = format_sweep(sweep)
+    except Exception as sweep_error:
+        chart["sweep_error"] = str(sweep_error)
+
+    # Birth chart data for AI features
+    chart["birth_chart_data"] = {
+        "planets": planets,
+        "ascendant": ascendant,
+        "birth_info": f"{format_date(birth_dt)} at {birth_time_str}, {location['name']}",
+        "birth_dt": birth_dt,
+        "zodiac": zodiac,
+        "ayanamsa": ayanamsa,
+        "dasha": current_dasha,
+        "vargas": [format_varga_positions(varga_planets, varga_ascendant, division)
+                   for division, (varga_planets, varga_ascendant) in divisional_charts.items()]
+    }
+
+    # Persist the chart beyond this session
+    try:
+        chart_store = get_chart_store()
+        if chart_store is not None:
+            row_id, _ = chart_store.append(chart_batch_from_planets(planets, ascendant_degrees,
+                                                                    julian_date(birth_dt_utc)),
+                                           [latitude], [longitude])
+            # Lets the daily prediction look up this chart's transit summary
+            chart["birth_chart_data"]["row_id"] = row_id
+            # Fold single-chart segments together once they pile up
+            if len(chart_store.manifest["segments"]) > 64:
+                chart_store.compact()
+    except Exception as store_error:
+        chart["store_error"] = str(store_error)
+    return chart, None
+
+@fragment
+def location_input():
+    """Location search; reruns on its own while the user types or picks a suggestion"""
+    location_search = st.text_input("Type Birth Location (City, Country)", "", key="location_search")
+    location = None
 
     # Search for location suggestions when user types
     if location_search and len(location_search) >= 3:
         try:
-            ctx = ssl.create_default_context(cafile=certifi.where())
-            geolocator = Nominatim(
-                user_agent="kundli_generator", 
-                ssl_context=ctx,
-                timeout=10  # Increase timeout
-            )
-            
+            # A search that already failed in this session goes straight to manual input until the text changes
+            failed_searches = st.session_state.setdefault("failed_searches", {})
+            if location_search in failed_searches:
+                raise RuntimeError(failed_searches[location_search])
             with st.spinner("Searching for locations..."):
-                # Get multiple location results with retry
-                locations = None
-                for attempt in range(3):  # Try 3 times
-                    try:
-                        locations = geolocator.geocode(location_search, exactly_one=False, limit=5)
-                        break
-                    except Exception as retry_error:
-                        if attempt == 2:  # Last attempt
-                            raise retry_error
-                        time.sleep(1)  # Wait 1 second before retry
-            
-            if locations:
-                # Create options from search results
-                location_options = [loc.address for loc in locations]
-                
+                try:
+                    results = search_locations(location_search)
+                except Exception as search_error:
+                    failed_searches[location_search] = str(search_error)
+                    raise
+
+            if results:
                 # Show dropdown with suggestions
+                addresses = [address for address, _, _ in results]
                 selected_location = st.selectbox(
                     "Select Location from suggestions:",
-                    options=location_options,
+                    options=addresses,
                     key="location_select"
                 )
-                
-                # Get coordinates for selected location
-                if selected_location:
-                    try:
-                        selected_loc_data = geolocator.geocode(selected_location, timeout=10)
-                        if selected_loc_data:
-                            latitude = selected_loc_data.latitude
-                            longitude = selected_loc_data.longitude
-                            st.success(f"📍 Selected: {selected_location} (Lat: {latitude:.4f}, Lon: {longitude:.4f})")
-                    except Exception as coord_error:
-                        st.warning(f"Could not get coordinates for selected location: {coord_error}")
-                        valid_input = False
+                # Coordinates come with the search results, no second lookup
+                address, latitude, longitude = results[addresses.index(selected_location)]
+                location = {"name": address, "latitude": latitude, "longitude": longitude}
+                st.success(f"📍 Selected: {selected_location} (Lat: {latitude:.4f}, Lon: {longitude:.4f})")
             else:
                 st.warning("No locations found. Try a different search term.")
-                valid_input = False
-                
+
         except Exception as e:
             st.error(f"Error searching location: {str(e)}")
             st.info("💡 **Tip**: You can also manually enter coordinates if location search is not working.")
-            
+
             # Manual coordinate input as fallback
             st.subheader("🔧 Manual Location Input")
             manual_lat = st.number_input("Enter Latitude:", value=0.0, format="%.4f", key="manual_lat")
             manual_lon = st.number_input("Enter Longitude:", value=0.0, format="%.4f", key="manual_lon")
-            
+
             if manual_lat != 0.0 and manual_lon != 0.0:
-                latitude = manual_lat
-                longitude = manual_lon
-                st.success(f"📍 Using manual coordinates: Lat {latitude:.4f}, Lon {longitude:.4f}")
-                valid_input = True
+                location = {"name": f"{manual_lat:.4f}, {manual_lon:.4f}", "latitude": manual_lat, "longitude": manual_lon}
+                st.success(f"📍 Using manual coordinates: Lat {manual_lat:.4f}, Lon {manual_lon:.4f}")
     elif location_search and len(location_search) < 3:
         st.info("Type at least 3 characters to search for locations")
-        valid_input = False
     else:
         st.info("Enter a location to begin (e.g., 'New Delhi', 'Mumbai', 'London')")
-        
+
         # Quick reference for common Indian cities
         st.subheader("🏙️ Quick Reference - Major Indian Cities")
         col1, col2, col3 = st.columns(3)
-        
+
         with col1:
             st.write("**North India:**")
             st.write("• New Delhi")
             st.write("• Mumbai")
             st.write("• Pune")
             st.write("• Jaipur")
-        
+
         with col2:
             st.write("**South India:**")
             st.write("• Bangalore")
             st.write("• Chennai")
             st.write("• Hyderabad")
             st.write("• Kochi")
-        
+
         with col3:
             st.write("**East/West:**")
             st.write("• Kolkata")
             st.write("• Ahmedabad")
             st.write("• Bhopal")
             st.write("• Indore")
-        
-        valid_input = False
+
+    # A new place changes the time zone and Panchang, so refresh the rest of the page (all cached)
+    if location != st.session_state.get("location"):
+        st.session_state.location = location
+        st.rerun()
+
+@fragment
+def birth_input():
+    """Birth details and the Generate button; reruns on its own while they are edited"""
+    # Inputs with calendar
+    birth_date = st.date_input("Birth Date", value=date(2000, 1, 1), key="birth_date")
+    birth_time_str = st.text_input("Birth Time (HH:MM, 24-hour format)", "12:00", key="birth_time")
+
+    # Zodiac selection - both frames come from the same ephemeris evaluation
+    zodiac_label = st.radio("Zodiac", ["Sidereal (Vedic)", "Tropical"], horizontal=True, key="zodiac")
+    zodiac = "sidereal" if zodiac_label.startswith("Sidereal") else "tropical"
+    ayanamsa = "lahiri"
+    if zodiac == "sidereal":
+        ayanamsa = st.selectbox("Ayanamsa", ["lahiri", "raman", "kp"], key="ayanamsa",
+                                format_func=lambda name: {"lahiri": "Lahiri", "raman": "Raman", "kp": "KP (Krishnamurti)"}[name])
+
+    location = st.session_state.get("location")
+    valid_input = location is not None
 
     # Validate time input
     try:
         birth_dt = datetime.combine(birth_date, datetime.strptime(birth_time_str, '%H:%M').time())
-        birth_date_str = birth_date.strftime('%Y/%m/%d')
     except ValueError:
         st.error("Invalid time format. Use HH:MM (24-hour format).")
         valid_input = False
 
-    if st.button("Generate Kundli") and valid_input and latitude and longitude:
-        planets, ascendant = calculate_planets(birth_date_str, birth_time_str, latitude, longitude)
+    # Birth times are local civil times; resolve the historical UTC offset offline
+    utc_offset = 0.0
+    if valid_input:
+        try:
+            birth_timezone = resolve_timezone(location["latitude"], location["longitude"])
+            utc_offset = utc_offset_hours(location["latitude"], location["longitude"], birth_dt)
+            st.caption(f"🕒 Time zone: {birth_timezone} (UTC{utc_offset:+g} at birth)")
+        except (FileNotFoundError, LookupError):
+            # No boundary data for this location: ask for the offset
+            utc_offset = st.number_input("UTC offset of birth time (hours)", min_value=-12.0, max_value=14.0,
+                                         value=5.5, step=0.25, key="manual_utc_offset")
+    st.session_state.utc_offset = utc_offset
+    st.session_state.ayanamsa_choice = ayanamsa
+
+    # Window swept around the entered time to show how sensitive the chart is to it
+    sweep_minutes = st.slider("Birth-time uncertainty (± minutes)", min_value=10, max_value=240, value=120, step=10,
+                              key="sweep_minutes")
 
-        if isinstance(planets, str):
-            st.error(f"Error calculating Kundli: {planets}")
+    if st.button("Generate Kundli", key="generate") and valid_input:
+        with st.spinner("Calculating chart..."):
+            chart, error = generate_chart(birth_dt, birth_time_str, location, zodiac, ayanamsa, utc_offset, sweep_minutes)
+        if error:
+            st.error(f"Error calculating Kundli: {error}")
         else:
-            # Store birth chart data for AI features
-            birth_chart_data = {
-                "planets": planets,
-                "ascendant": ascendant,
-                "birth_info": f"{format_date(birth_dt)} at {birth_time_str}, {selected_location}",
-                "birth_dt": birth_dt
-            }
-            
-            st.subheader("🌟 Planet Positions & Predictions")
-            st.text(format_planet_positions(planets))
-
-            st.subheader("🪞 Ascendant (Lagna)")
-            st.write(ascendant)
-
-            st.subheader("📅 Birth Date")
-            st.write(format_date(birth_dt))
-
-            # Draw chart
-            fig = draw_kundali_chart(planets, ascendant)
-            st.pyplot(fig)
-            
+            st.session_state.chart = chart
             # Store birth chart data in session state for AI features
-            st.session_state.birth_chart_data = birth_chart_data
-            
-            st.success("✅ Kundli generated successfully! Switch to the AI Features tab to get AI insights.")
+            st.session_state.birth_chart_data = chart["birth_chart_data"]
+            # Show the new chart and unlock the AI tab; everything else is served from caches
+            st.rerun()
+
+@fragment
+def chart_display():
+    """Show the last generated chart from stored artifacts (no recomputation or re-rendering)"""
+    chart = st.session_state.get("chart")
+    if not chart:
+        return
+
+    st.subheader("🌟 Planet Positions & Predictions")
+    st.text(format_planet_positions(chart["planets"]))
+
+    st.subheader("🪞 Ascendant (Lagna)")
+    st.write(chart["ascendant"])
+
+    st.subheader("📅 Birth Date")
+    st.write(format_date(chart["birth_dt"]))
+
+    st.subheader("⏳ Current Dasha (Vimshottari)")
+    st.write(chart["dasha"])
 
-    # Display daily forecast
+    st.image(chart["chart_png"])
+
+    # Divisional charts
+    for title, png in chart["varga_pngs"]:
+        with st.expander(title):
+            st.image(png)
+
+    with st.expander("⏱️ Birth-Time Sensitivity"):
+        if chart["sweep_png"]:
+            st.image(chart["sweep_png"])
+            st.text(chart["sweep_text"])
+        else:
+            st.warning(f"Sensitivity sweep failed: {chart['sweep_error']}")
+
+    if chart["store_error"]:
+        st.warning(f"Chart could not be saved: {chart['store_error']}")
+
+    st.success("✅ Kundli generated successfully! Switch to the AI Features tab to get AI insights.")
+
+@fragment
+def forecast_display():
+    """Daily forecast from the time-limited cache"""
     st.subheader("🌙 Daily Forecast")
-    basic_forecast = daily_forecast()
-    st.write(basic_forecast)
+    st.write(cached_daily_forecast())
 
-# AI Features Tab
-with ai_tab:
+@fragment
+def panchang_display():
+    """Yearly Panchang for the selected location (cached per year and 0.1 degree cell)"""
+    with st.expander("🗓️ Panchang"):
+        location = st.session_state.get("location")
+        if not location:
+            st.info("Select a location above to see the Panchang")
+            return
+
+        panchang_col1, panchang_col2 = st.columns(2)
+        with panchang_col1:
+            # Whole years inside the ephemeris coverage (de421 ends in October 2053)
+            panchang_year = st.number_input("Year", min_value=1900, max_value=2052, value=date.today().year, step=1,
+                                            key="panchang_year")
+        with panchang_col2:
+            panchang_offset = st.number_input("UTC offset (hours)", min_value=-12.0, max_value=14.0,
+                                              value=float(st.session_state.get("utc_offset", 0.0)), step=0.25,
+                                              key="panchang_offset")
+        if st.button("Show Panchang", key="show_panchang"):
+            with st.spinner("Computing Panchang..."):
+                records = compute_panchang(int(panchang_year), location["latitude"], location["longitude"],
+                                           panchang_offset, ayanamsa=st.session_state.get("ayanamsa_choice", "lahiri"))
+            st.session_state.panchang = (int(panchang_year), records)
+
+        # Keep the last table on screen across reruns (e.g. after a download click)
+        if "panchang" in st.session_state:
+            year, records = st.session_state.panchang
+            st.dataframe(list(records), use_container_width=True)
+            download_col1, download_col2 = st.columns(2)
+            with download_col1:
+                st.download_button("Download CSV", "".join(iter_panchang_csv(records)),
+                                   file_name=f"panchang-{year}.csv", mime="text/csv")
+            with download_col2:
+                st.download_button("Download JSON", "".join(iter_panchang_json(records)),
+                                   file_name=f"panchang-{year}.json", mime="application/json")
+
+@fragment
+def ai_features():
+    """AI tab; its buttons and chat rerun only this fragment"""
     st.subheader("🤖 AI-Powered Astrology Features")
-    
+
     # Check if birth chart data is available
     if "birth_chart_data" not in st.session_state:
         st.info("👆 Please generate your Kundli first in the 'Generate Kundli' tab to unlock AI features!")
@@ -240,11 +414,53 @@ with ai_tab:
             try:
                 Config.validate_config()
                 st.success("✅ AI Features Ready!")
-                
+
                 # Show AI features
-                render_ai_features(st.session_state.birth_chart_data)
-                
+                render_ai_features(st.session_state.birth_chart_data, get_chart_store())
+
             except ValueError as e:
                 st.warning(f"AI features not available: {str(e)}")
                 st.info("To enable AI features, please set your GROQ_API_KEY in environment variables or .env file")
 
+st.title("🪐 Kundli Generator AI")
+
+# Create main tabs to separate basic Kundli from AI features
+main_tab, ai_tab = st.tabs(["📊 Generate Kundli", "🤖 AI Features"])
+
+# Sidebar for AI features (static, drawn only on full reruns)
+with st.sidebar:
+    st.header("🤖 AI Features")
+
+    # Check if AI features are available
+    if not AI_FEATURES_AVAILABLE:
+        st.warning("⚠️ AI Features Not Available")
+        st.info("Install AI dependencies: pip install langchain langchain-groq python-dotenv groq")
+    else:
+        try:
+            Config.validate_config()
+            st.success("✅ AI Features Enabled")
+            st.info("Generate your Kundli to unlock AI features!")
+
+        except ValueError:
+            st.warning("⚠️ AI Features Disabled")
+            st.info("Set GROQ_API_KEY to enable AI features")
+
+    st.markdown("---")
+    st.markdown("**Features:**")
+    st.markdown("• AI-powered Kundli interpretation")
+    st.markdown("• Conversational astrology chat")
+    st.markdown("• Personalized insights")
+    st.markdown("• Daily predictions")
+
+# Main Kundli Generation Tab: each section reruns independently
+with main_tab:
+    st.subheader("📊 Generate Your Kundli")
+    location_input()
+    birth_input()
+    chart_display()
+    forecast_display()
+    panchang_display()
+
+# AI Features Tab
+with ai_tab:
+    ai_features()
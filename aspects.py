@@ -0,0 +1,134 @@
+# aspects.py
+import numpy as np
+from kundli_calculator import PLANET_NAMES
+from utils import sign_indices
+
+# Western-style aspects: name -> (exact angle, orb in degrees)
+ASPECTS = {
+    'conjunction': (0.0, 8.0),
+    'opposition': (180.0, 8.0),
+    'trine': (120.0, 7.0),
+    'square': (90.0, 7.0),
+}
+ASPECT_NAMES = list(ASPECTS)
+
+# Graha drishti: signs counted from the planet (inclusive) that it aspects
+DRISHTI = {name: (7,) for name in PLANET_NAMES}
+DRISHTI.update({'Mars': (4, 7, 8), 'Jupiter': (5, 7, 9), 'Saturn': (3, 7, 10)})
+
+def separation_matrix(degrees_a, degrees_b):
+    """
+    Angular separations (0-180) between every body of a and every body of b.
+
+    Args:
+        degrees_a: (..., n) longitudes
+        degrees_b: (..., m) longitudes
+
+    Returns:
+        numpy.ndarray: (..., n, m) separations in degrees
+    """
+    difference = np.asarray(degrees_b, dtype=float)[..., None, :] - np.asarray(degrees_a, dtype=float)[..., :, None]
+    return np.abs((difference + 180) % 360 - 180)
+
+def aspect_matrix(degrees_a, degrees_b):
+    """
+    Classify every pair into an ASPECTS entry with vectorized orb masks.
+
+    Returns:
+        tuple: (codes, orbs) arrays of shape (..., n, m); codes index
+               ASPECT_NAMES (-1 for no aspect), orbs are the distance from exact
+    """
+    separation = separation_matrix(degrees_a, degrees_b)
+    codes = np.full(separation.shape, -1, dtype=np.int8)
+    orbs = np.zeros(separation.shape)
+    # Orbs never overlap, so each pair matches at most one aspect
+    for code, (angle, orb) in enumerate(ASPECTS.values()):
+        deviation = np.abs(separation - angle)
+        hit = deviation <= orb
+        codes[hit] = code
+        orbs[hit] = deviation[hit]
+    return codes, orbs
+
+def drishti_matrix(degrees_a, degrees_b, planet_names=PLANET_NAMES):
+    """
+    Vedic sign-based aspects: True where body i of a casts drishti on body j of b.
+
+    Returns:
+        numpy.ndarray: (..., n, m) boolean array
+    """
+    counts = (sign_indices(degrees_b)[..., None, :].astype(np.int16)
+              - sign_indices(degrees_a)[..., :, None]) % 12 + 1
+    allowed = np.zeros((len(planet_names), 13), dtype=bool)
+    for row, name in enumerate(planet_names):
+        allowed[row, list(DRISHTI[name])] = True
+    return np.take_along_axis(np.broadcast_to(allowed, counts.shape[:-1] + (13,)), counts, axis=-1)
+
+def _degrees(planets, planet_names):
+    return np.array([planets[name]['raw_degree'] for name in planet_names])
+
+def _pairs(codes, orbs, drishti, names_a, names_b, upper_only):
+    """Turn dense matrices into a sparse list of aspect dictionaries."""
+    if upper_only:
+        # Drishti is directional, so only the symmetric aspects are halved
+        codes = np.where(np.triu(np.ones(codes.shape, dtype=bool), k=1), codes, -1)
+    aspects = [{'from': names_a[i], 'to': names_b[j], 'aspect': ASPECT_NAMES[codes[i, j]], 'orb': float(orbs[i, j])}
+               for i, j in zip(*np.nonzero(codes >= 0))]
+    drishtis = [{'from': names_a[i], 'to': names_b[j]} for i, j in zip(*np.nonzero(drishti))]
+    return {'aspects': sorted(aspects, key=lambda aspect: aspect['orb']), 'drishti': drishtis}
+
+def chart_aspects(planets, planet_names=PLANET_NAMES):
+    """
+    Aspects within one chart from the raw_degree values of calculate_planets.
+
+    Returns:
+        dict: 'aspects' (from, to, aspect, orb; tightest first) and 'drishti' (from, to)
+    """
+    degrees = _degrees(planets, planet_names)
+    codes, orbs = aspect_matrix(degrees, degrees)
+    return _pairs(codes, orbs, drishti_matrix(degrees, degrees, planet_names), planet_names, planet_names, True)
+
+def synastry_aspects(planets_a, planets_b, planet_names=PLANET_NAMES):
+    """
+    Aspects from every body of chart a to every body of chart b.
+
+    Returns:
+        dict: Same layout as chart_aspects; 'from' names chart a, 'to' names chart b
+    """
+    degrees_a, degrees_b = _degrees(planets_a, planet_names), _degrees(planets_b, planet_names)
+    codes, orbs = aspect_matrix(degrees_a, degrees_b)
+    return _pairs(codes, orbs, drishti_matrix(degrees_a, degrees_b, planet_names), planet_names, planet_names, False)
+
+def batch_aspects(degrees, other_degrees=None, planet_names=PLANET_NAMES):
+    """
+    Sparse aspect list for a whole batch of charts.
+
+    Args:
+        degrees: (n_charts, bodies) longitudes, e.g. calculate_planets_batch()['raw_degree']
+        other_degrees: Optional (n_charts, bodies) partner longitudes for row-wise synastry;
+                       without it, pairs within each chart are returned once
+        planet_names: Body names of the columns, used for the drishti rules
+
+    Returns:
+        dict: Parallel arrays 'chart', 'from', 'to' (body indices), 'aspect'
+              (index into ASPECT_NAMES) and 'orb', plus 'drishti' with
+              parallel 'chart', 'from' and 'to' arrays
+    """
+    degrees = np.asarray(degrees, dtype=float)
+    other = degrees if other_degrees is None else np.asarray(other_degrees, dtype=float)
+    codes, orbs = aspect_matrix(degrees, other)
+    if other_degrees is None:
+        codes = np.where(np.triu(np.ones(codes.shape[-2:], dtype=bool), k=1), codes, -1)
+    chart, first, second = np.nonzero(codes >= 0)
+    # Drishti is directional, so every ordered pair is kept
+    drishti_chart, drishti_from, drishti_to = np.nonzero(drishti_matrix(degrees, other, planet_names))
+    return {'chart': chart, 'from': first, 'to': second,
+            'aspect': codes[chart, first, second], 'orb': orbs[chart, first, second],
+            'drishti': {'chart': drishti_chart, 'from': drishti_from, 'to': drishti_to}}
+
+def format_aspects(result, limit=None):
+    """Return a readable aspect list, tightest aspects first."""
+    lines = [f"{aspect['from']} {aspect['aspect']} {aspect['to']} (orb {aspect['orb']:.1f}°)"
+             for aspect in result['aspects'][:limit]]
+    if result['drishti']:
+        lines.append("Drishti: " + ", ".join(f"{item['from']} → {item['to']}" for item in result['drishti']))
+    return "\n".join(lines)
@@ -0,0 +1,106 @@
+# ayanamsa.py
+import os
+import numpy as np
+
+# Table covers 1800-2200 at a 1-day step, which keeps linear interpolation
+# error far below an arc-second for these smooth precession models.
+TABLE_START_JD = 2378496.5   # 1800-01-01 00:00 UTC
+TABLE_END_JD = 2524593.5     # 2200-01-01 00:00 UTC
+TABLE_STEP_DAYS = 1.0
+J2000_JD = 2451545.0
+
+# Ayanamsa value at J2000.0 in degrees for each supported system
+AYANAMSA_SYSTEMS = {
+    'lahiri': 23.857092,
+    'raman': 22.410791,
+    'kp': 23.760240,
+}
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ayanamsa_table.npy')
+
+_table_cache = {}
+
+def _ayanamsa_from_model(jd, system):
+    """Evaluate the ayanamsa polynomial (general precession in longitude) at Julian dates."""
+    t = (np.asarray(jd, dtype=float) - J2000_JD) / 36525.0
+    precession_arcsec = 5028.796195 * t + 1.1054348 * t ** 2
+    return AYANAMSA_SYSTEMS[system] + precession_arcsec / 3600.0
+
+def build_ayanamsa_table(path=DEFAULT_TABLE_PATH):
+    """
+    Precompute the ayanamsa table and save it as a .npy file.
+
+    Args:
+        path: Destination file path
+
+    Returns:
+        str: Path of the written table
+    """
+    jd = np.arange(TABLE_START_JD, TABLE_END_JD + TABLE_STEP_DAYS, TABLE_STEP_DAYS)
+    table = np.empty((len(AYANAMSA_SYSTEMS), len(jd)), dtype=np.float64)
+    for row, system in enumerate(AYANAMSA_SYSTEMS):
+        table[row] = _ayanamsa_from_model(jd, system)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp.npy'
+    np.save(tmp_path, table)
+    os.replace(tmp_path, path)
+    return path
+
+def load_ayanamsa_table(path=DEFAULT_TABLE_PATH):
+    """
+    Load the ayanamsa table memory-mapped read-only, building it on first use.
+
+    Args:
+        path: Table file path
+
+    Returns:
+        numpy.ndarray: Array of shape (systems, days), one row per system
+    """
+    if path not in _table_cache:
+        if not os.path.exists(path):
+            try:
+                build_ayanamsa_table(path)
+            except OSError:
+                # Read-only install: fall back to an in-memory table
+                jd = np.arange(TABLE_START_JD, TABLE_END_JD + TABLE_STEP_DAYS, TABLE_STEP_DAYS)
+                _table_cache[path] = np.vstack([_ayanamsa_from_model(jd, s) for s in AYANAMSA_SYSTEMS])
+                return _table_cache[path]
+        _table_cache[path] = np.load(path, mmap_mode='r')
+    return _table_cache[path]
+
+def get_ayanamsa(jd, system='lahiri', use_table=True):
+    """
+    Look up the ayanamsa for one or more Julian dates (UT).
+
+    Args:
+        jd: Julian date or array of Julian dates
+        system: Ayanamsa system name ('lahiri', 'raman' or 'kp')
+        use_table: Interpolate the memory-mapped table; False evaluates the
+                   model directly without touching the disk
+
+    Returns:
+        float or numpy.ndarray: Ayanamsa in degrees
+    """
+    system = system.lower()
+    if system not in AYANAMSA_SYSTEMS:
+        raise ValueError(f"Unknown ayanamsa system '{system}'. Choose from: {', '.join(AYANAMSA_SYSTEMS)}")
+
+    jd = np.asarray(jd, dtype=float)
+    in_range = (jd >= TABLE_START_JD) & (jd <= TABLE_END_JD)
+    if use_table and np.all(in_range):
+        table = load_ayanamsa_table()
+        row = list(AYANAMSA_SYSTEMS).index(system)
+        position = (jd - TABLE_START_JD) / TABLE_STEP_DAYS
+        index = np.minimum(position.astype(np.int64), table.shape[1] - 2)
+        frac = position - index
+        values = table[row, index] * (1.0 - frac) + table[row, index + 1] * frac
+    else:
+        # Outside the table span (or without the table) the model is evaluated directly
+        values = _ayanamsa_from_model(jd, system)
+
+    return float(values) if values.ndim == 0 else values
+
+def to_sidereal(tropical_degrees, jd, system='lahiri'):
+    """Convert tropical longitudes to sidereal longitudes (degrees, 0-360)."""
+    return (np.asarray(tropical_degrees) - get_ayanamsa(jd, system)) % 360
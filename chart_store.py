@@ -0,0 +1,395 @@
+# chart_store.py
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+import numpy as np
+from utils import ZODIAC_SIGNS, sign_indices
+from kundli_calculator import PLANET_NAMES
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'charts')
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = '.lock'
+
+# Popcount lookup for counting bitmap matches without unpacking
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+def _column_specs(planet_names):
+    """Column name -> dtype for a store holding the given bodies."""
+    specs = {'birth_jd': np.float64, 'latitude': np.float32, 'longitude': np.float32,
+             'user_id': np.int64, 'ascendant': np.float32, 'ascendant_sign': np.int8}
+    for name in planet_names:
+        specs[f'{name}_degree'] = np.float32
+        specs[f'{name}_sign'] = np.int8
+        specs[f'{name}_house'] = np.int8
+    return specs
+
+def _index_specs(planet_names):
+    """Indexed column name -> (lowest value, number of values) for bitmap indexes."""
+    specs = {'ascendant_sign': (0, 12)}
+    for name in planet_names:
+        specs[f'{name}_sign'] = (0, 12)
+        specs[f'{name}_house'] = (1, 12)
+    return specs
+
+def _normalize_value(column, value):
+    """Accept sign names for *_sign columns."""
+    if column.endswith('_sign') and isinstance(value, str):
+        return ZODIAC_SIGNS.index(value.capitalize())
+    return value
+
+class ChartStore:
+    """
+    Columnar, append-only chart store backed by memory-mapped .npy files.
+
+    Each append writes an immutable segment directory holding one .npy file
+    per column plus bitmap indexes for every sign/house column. The manifest
+    is replaced atomically once a segment is complete, so readers never see
+    partial writes. Queries AND the bitmaps of each segment and only scan
+    memory-mapped columns for range predicates.
+
+    One store may be shared by many threads and processes: segment names are
+    unique, manifest updates and compaction run under a thread lock plus a
+    file lock, and readers map the files of a manifest snapshot under the
+    same lock, so compaction cannot remove a segment they are about to open.
+    """
+
+    def __init__(self, path, zodiac='sidereal', planet_names=PLANET_NAMES):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._segment_cache = {}
+        os.makedirs(path, exist_ok=True)
+        with self._locked():
+            if os.path.exists(os.path.join(path, MANIFEST_NAME)):
+                self._load_manifest()
+            else:
+                self.manifest = {'zodiac': zodiac, 'planet_names': list(planet_names), 'segments': []}
+                self._write_manifest()
+        self.zodiac = self.manifest['zodiac']
+        self.planet_names = self.manifest['planet_names']
+        self.columns = _column_specs(self.planet_names)
+        self.indexes = _index_specs(self.planet_names)
+
+    def __len__(self):
+        with self._locked():
+            self._load_manifest()
+            return sum(segment['rows'] for segment in self.manifest['segments'])
+
+    @contextmanager
+    def _locked(self):
+        """Serialize manifest changes and segment removal across threads and processes."""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+            else:
+                with open(os.path.join(self.path, LOCK_NAME), 'a') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_manifest(self):
+        """Re-read the manifest, which other processes may have replaced (call under the lock)."""
+        with open(os.path.join(self.path, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+
+    def _write_manifest(self):
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        tmp_path = f"{manifest_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    def _write_segment(self, data, rows):
+        """Write columns and bitmap indexes into a new, uniquely named segment directory and return its name."""
+        segment_name = f"seg-{uuid.uuid4().hex}"
+        segment_path = os.path.join(self.path, segment_name)
+        os.makedirs(segment_path)
+        for column, dtype in self.columns.items():
+            values = np.asarray(data[column], dtype=dtype).reshape(rows)
+            np.save(os.path.join(segment_path, f'{column}.npy'), values)
+            if column in self.indexes:
+                low, count = self.indexes[column]
+                bitmaps = np.packbits(values[None, :] == np.arange(low, low + count, dtype=dtype)[:, None], axis=1)
+                np.save(os.path.join(segment_path, f'{column}.bitmap.npy'), bitmaps)
+        return segment_name
+
+    def append(self, batch, latitudes, longitudes, user_ids=None):
+        """
+        Persist a batch of charts as a new segment.
+
+        Args:
+            batch: Dictionary from calculate_planets_batch (or chart_batch_from_planets)
+            latitudes: Birth latitudes, one per chart
+            longitudes: Birth longitudes, one per chart
+            user_ids: Optional integer ids, one per chart (-1 when missing)
+
+        Returns:
+            tuple: (first_row_id, row_count) of the appended charts
+        """
+        degrees = np.asarray(batch[f'{self.zodiac}_degree'])
+        ascendant = np.asarray(batch[f'{self.zodiac}_ascendant'])
+        rows = degrees.shape[0]
+        if rows == 0:
+            return len(self), 0
+        body_columns = [batch['planet_names'].index(name) for name in self.planet_names]
+
+        data = {
+            'birth_jd': batch['jd'],
+            'latitude': latitudes,
+            'longitude': longitudes,
+            'user_id': np.full(rows, -1) if user_ids is None else user_ids,
+            'ascendant': ascendant,
+            'ascendant_sign': sign_indices(ascendant),
+        }
+        signs = np.asarray(batch[f'{self.zodiac}_signs'])
+        houses = np.asarray(batch[f'{self.zodiac}_houses'])
+        for name, column in zip(self.planet_names, body_columns):
+            data[f'{name}_degree'] = degrees[:, column]
+            data[f'{name}_sign'] = signs[:, column]
+            data[f'{name}_house'] = houses[:, column]
+
+        # The segment is private until the manifest lists it, so only the swap is locked
+        segment_name = self._write_segment(data, rows)
+        with self._locked():
+            self._load_manifest()
+            first_row = sum(segment['rows'] for segment in self.manifest['segments'])
+            self.manifest['segments'].append({'name': segment_name, 'rows': rows})
+            self._write_manifest()
+        return first_row, rows
+
+    def compact(self, small_rows=100_000):
+        """
+        Merge runs of adjacent segments smaller than small_rows, e.g. after many single-chart appends.
+
+        Each run is replaced in place by one segment holding its rows in the
+        same order, so global row ids (from query() or transit summaries)
+        keep pointing at the same charts.
+
+        Returns:
+            int: Number of segments merged
+        """
+        with self._locked():
+            self._load_manifest()
+            runs, current = [], []
+            for segment in self.manifest['segments']:
+                if segment['rows'] < small_rows:
+                    current.append(segment)
+                else:
+                    runs.append(current)
+                    runs.append([segment])
+                    current = []
+            runs.append(current)
+
+            segments, removed = [], []
+            for run in runs:
+                if len(run) < 2 or run[0]['rows'] >= small_rows:
+                    segments.extend(run)
+                    continue
+                merged = {column: np.concatenate([self._open(segment, column) for segment in run])
+                          for column in self.columns}
+                rows = len(merged['birth_jd'])
+                segments.append({'name': self._write_segment(merged, rows), 'rows': rows})
+                removed.extend(segment['name'] for segment in run)
+            if not removed:
+                return 0
+            self.manifest['segments'] = segments
+            self._write_manifest()
+
+            # Readers that mapped these files keep their mappings; new snapshots no longer list them
+            for key in [key for key in self._segment_cache if key[0] in removed]:
+                del self._segment_cache[key]
+            for name in removed:
+                segment_path = os.path.join(self.path, name)
+                try:
+                    for file_name in os.listdir(segment_path):
+                        os.remove(os.path.join(segment_path, file_name))
+                    os.rmdir(segment_path)
+                except OSError:
+                    pass  # e.g. still mapped on Windows; the directory is no longer referenced
+        return len(removed)
+
+    def _open(self, segment, name):
+        """Memory-map one column or bitmap file of a segment (call under the lock)."""
+        key = (segment['name'], name)
+        if key not in self._segment_cache:
+            self._segment_cache[key] = np.load(os.path.join(self.path, segment['name'], f'{name}.npy'), mmap_mode='r')
+        return self._segment_cache[key]
+
+    def _snapshot(self, names):
+        """
+        Map the given files of every segment in the current manifest.
+
+        Returns:
+            list: (segment, dict of file name -> memory-mapped array) pairs
+        """
+        with self._locked():
+            self._load_manifest()
+            return [(segment, {name: self._open(segment, name) for name in names})
+                    for segment in self.manifest['segments']]
+
+    def _segment_bitmap(self, files, conditions):
+        """AND together bitmap rows for equality/IN conditions; None when unconstrained."""
+        combined = None
+        for column, value in conditions.items():
+            low, _ = self.indexes[column]
+            bitmaps = files[f'{column}.bitmap']
+            selected = np.bitwise_or.reduce(np.stack([bitmaps[v - low] for v in value]), axis=0)
+            combined = selected if combined is None else combined & selected
+        return combined
+
+    def _split_conditions(self, conditions):
+        """
+        Separate indexed equality conditions from range predicates.
+
+        Indexed values are normalized to lists of integers and checked
+        against the index range.
+
+        Raises:
+            ValueError: For unknown columns or values outside an index
+        """
+        indexed, ranges = {}, {}
+        for column, value in conditions.items():
+            if column not in self.columns:
+                raise ValueError(f"Unknown column '{column}'")
+            if column in self.indexes:
+                low, count = self.indexes[column]
+                values = []
+                for v in (value if isinstance(value, (list, tuple, set)) else [value]):
+                    try:
+                        normalized = _normalize_value(column, v)
+                    except ValueError:
+                        raise ValueError(f"Unknown sign '{v}' for {column}") from None
+                    if isinstance(normalized, bool) or not isinstance(normalized, (int, np.integer)) \
+                            or not low <= normalized < low + count:
+                        raise ValueError(f"{column} must be between {low} and {low + count - 1}, got {v!r}")
+                    values.append(int(normalized))
+                indexed[column] = values
+            else:
+                ranges[column] = value
+        return indexed, ranges
+
+    def query(self, **conditions):
+        """
+        Find row ids matching all conditions.
+
+        Sign and house columns (e.g. Saturn_house=7, Moon_sign='Cancer',
+        ascendant_sign=['Leo', 'Virgo']) are answered from bitmap indexes.
+        Other columns take a (low, high) half-open range and are scanned
+        from their memory-mapped files.
+
+        Returns:
+            numpy.ndarray: Matching global row ids (int64, ascending)
+        """
+        indexed, ranges = self._split_conditions(conditions)
+        matches = []
+        offset = 0
+        for segment, files in self._snapshot([f'{column}.bitmap' for column in indexed] + list(ranges)):
+            rows = segment['rows']
+            bitmap = self._segment_bitmap(files, indexed)
+            mask = np.ones(rows, dtype=bool) if bitmap is None else np.unpackbits(bitmap, count=rows).astype(bool)
+            for column, (low, high) in ranges.items():
+                values = files[column]
+                mask &= (values >= low) & (values < high)
+            matches.append(np.flatnonzero(mask) + offset)
+            offset += rows
+        return np.concatenate(matches) if matches else np.empty(0, dtype=np.int64)
+
+    def count(self, **conditions):
+        """Count matching rows; pure-index queries are counted on packed bitmaps."""
+        indexed, ranges = self._split_conditions(conditions)
+        if ranges or not indexed:
+            return len(self.query(**conditions))
+        return int(sum(_POPCOUNT[self._segment_bitmap(files, indexed)].sum(dtype=np.int64)
+                       for _, files in self._snapshot([f'{column}.bitmap' for column in indexed])))
+
+    def iter_chunks(self, columns, chunk_rows=1_000_000, snapshot=None):
+        """
+        Stream columns segment by segment without loading the whole store.
+
+        Args:
+            columns: Column names to map
+            chunk_rows: Maximum rows per yielded chunk
+            snapshot: Optional result of _snapshot(columns), so callers that
+                      size an output from the same snapshot see the same rows
+
+        Yields:
+            tuple: (first_row_id, dict of column name -> array slice)
+        """
+        offset = 0
+        for segment, mapped in (self._snapshot(columns) if snapshot is None else snapshot):
+            for start in range(0, segment['rows'], chunk_rows):
+                stop = min(start + chunk_rows, segment['rows'])
+                yield offset + start, {column: values[start:stop] for column, values in mapped.items()}
+            offset += segment['rows']
+
+    def read(self, row_ids, columns=None):
+        """
+        Read selected columns for the given global row ids.
+
+        Returns:
+            dict: Column name -> NumPy array aligned with row_ids
+        """
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        columns = list(self.columns) if columns is None else columns
+        snapshot = self._snapshot(columns)
+        bounds = np.cumsum([0] + [segment['rows'] for segment, _ in snapshot])
+        segment_of_row = np.searchsorted(bounds, row_ids, side='right') - 1
+
+        result = {column: np.empty(len(row_ids), dtype=self.columns[column]) for column in columns}
+        for segment_index in np.unique(segment_of_row):
+            selected = segment_of_row == segment_index
+            local = row_ids[selected] - bounds[segment_index]
+            _, files = snapshot[segment_index]
+            for column in columns:
+                result[column][selected] = files[column][local]
+        return result
+
+def chart_batch_from_planets(planets, ascendant_degree, birth_jd):
+    """
+    Wrap one calculate_planets result in the batch layout ChartStore.append expects.
+
+    Args:
+        planets: Planet dictionary from calculate_planets
+        ascendant_degree: The ascendant dictionary from calculate_planets(..., raw_ascendant=True),
+                          or a longitude in the same zodiac as the 'degree' fields
+        birth_jd: Birth Julian date (UT)
+
+    Returns:
+        dict: One-row batch with both tropical and sidereal columns
+    """
+    names = list(planets)
+    tropical = np.array([[planets[name]['tropical_degree'] for name in names]])
+    sidereal = np.array([[planets[name]['sidereal_degree'] for name in names]])
+    tropical_houses = np.array([[planets[name]['tropical_house'] for name in names]], dtype=np.int8)
+    sidereal_houses = np.array([[planets[name]['sidereal_house'] for name in names]], dtype=np.int8)
+
+    if isinstance(ascendant_degree, dict):
+        tropical_ascendant, sidereal_ascendant = ascendant_degree['tropical'], ascendant_degree['sidereal']
+    else:
+        # The ayanamsa is the constant offset between the two frames
+        ayanamsa = (tropical[0, 0] - sidereal[0, 0]) % 360
+        first = planets[names[0]]
+        selected_is_sidereal = first['raw_degree'] == first['sidereal_degree'] and first['raw_degree'] != first['tropical_degree']
+        tropical_ascendant = (ascendant_degree + ayanamsa) % 360 if selected_is_sidereal else ascendant_degree % 360
+        sidereal_ascendant = (tropical_ascendant - ayanamsa) % 360
+
+    return {
+        'planet_names': names,
+        'jd': np.array([birth_jd]),
+        'tropical_degree': tropical,
+        'tropical_signs': sign_indices(tropical),
+        'tropical_houses': tropical_houses,
+        'tropical_ascendant': np.array([tropical_ascendant]),
+        'sidereal_degree': sidereal,
+        'sidereal_signs': sign_indices(sidereal),
+        'sidereal_houses': sidereal_houses,
+        'sidereal_ascendant': np.array([sidereal_ascendant]),
+    }
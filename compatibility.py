@@ -0,0 +1,267 @@
+# compatibility.py
+import heapq
+import numpy as np
+from utils import ZODIAC_SIGNS, NAKSHATRAS
+
+NAKSHATRA_SPAN = 360.0 / 27
+PADA_SPAN = 360.0 / 108
+MAX_SCORE = 36.0
+
+KOOTAS = ['Varna', 'Vashya', 'Tara', 'Yoni', 'Graha Maitri', 'Gana', 'Bhakoot', 'Nadi']
+
+# --- Rasi attributes (indexed by sign, 0=Aries) ---
+# Varna rank: 3=Brahmin (water), 2=Kshatriya (fire), 1=Vaishya (earth), 0=Shudra (air)
+_SIGN_VARNA = [2, 1, 0, 3, 2, 1, 0, 3, 2, 1, 0, 3]
+# Vashya group: 0=Chatushpada, 1=Manava, 2=Jalachara, 3=Vanachara, 4=Keeta
+# as (first half, second half) of each sign: Sagittarius turns Chatushpada at 15 degrees, Capricorn Jalachara
+_SIGN_VASHYA = [(0, 0), (0, 0), (1, 1), (2, 2), (3, 3), (1, 1), (1, 1), (4, 4), (1, 0), (0, 2), (1, 1), (2, 2)]
+_VASHYA_SCORES = np.array([
+    [2.0, 1.0, 1.0, 0.5, 1.0],
+    [1.0, 2.0, 0.5, 0.0, 1.0],
+    [1.0, 0.5, 2.0, 1.0, 1.0],
+    [0.5, 0.0, 1.0, 2.0, 0.0],
+    [1.0, 1.0, 1.0, 0.0, 2.0],
+])
+_SIGN_LORD = ['Mars', 'Venus', 'Mercury', 'Moon', 'Sun', 'Mercury',
+              'Venus', 'Mars', 'Jupiter', 'Saturn', 'Saturn', 'Jupiter']
+# Natural relationships: planet -> (friends, enemies); everything else is neutral
+_FRIENDSHIP = {
+    'Sun': ({'Moon', 'Mars', 'Jupiter'}, {'Venus', 'Saturn'}),
+    'Moon': ({'Sun', 'Mercury'}, set()),
+    'Mars': ({'Sun', 'Moon', 'Jupiter'}, {'Mercury'}),
+    'Mercury': ({'Sun', 'Venus'}, {'Moon'}),
+    'Jupiter': ({'Sun', 'Moon', 'Mars'}, {'Mercury', 'Venus'}),
+    'Venus': ({'Mercury', 'Saturn'}, {'Sun', 'Moon'}),
+    'Saturn': ({'Mercury', 'Venus'}, {'Sun', 'Moon', 'Mars'}),
+}
+# Graha Maitri score keyed by the sorted pair of attitudes (2=friend, 1=neutral, 0=enemy)
+_MAITRI_SCORES = {(2, 2): 5.0, (1, 2): 4.0, (1, 1): 3.0, (0, 2): 1.0, (0, 1): 0.5, (0, 0): 0.0}
+
+# --- Nakshatra attributes (indexed 0=Ashwini) ---
+# Yoni animals: 0 Horse, 1 Elephant, 2 Sheep, 3 Serpent, 4 Dog, 5 Cat, 6 Rat,
+# 7 Cow, 8 Buffalo, 9 Tiger, 10 Deer, 11 Monkey, 12 Mongoose, 13 Lion
+_NAKSHATRA_YONI = [0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9, 8, 9, 10, 10, 4, 11, 12, 11, 13, 0, 13, 7, 1]
+# Standard Yoni points: 4 same animal, 3 friendly, 2 neutral, 1 unfriendly, 0 sworn enemies
+_YONI_SCORES = np.array([
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4],
+], dtype=np.float32)
+# Gana: 0=Deva, 1=Manushya, 2=Rakshasa
+_NAKSHATRA_GANA = [0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2, 0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0]
+_GANA_SCORES = np.array([
+    [6.0, 6.0, 1.0],
+    [5.0, 6.0, 0.0],
+    [1.0, 0.0, 6.0],
+])
+# Nadi: 0=Adi, 1=Madhya, 2=Antya, repeating Adi-Madhya-Antya-Antya-Madhya-Adi
+_NAKSHATRA_NADI = [(0, 1, 2, 2, 1, 0)[n % 6] for n in range(27)]
+
+def _relation(planet, other):
+    """Attitude of planet towards other: 2=friend, 1=neutral, 0=enemy."""
+    if planet == other:
+        return 2
+    friends, enemies = _FRIENDSHIP[planet]
+    return 2 if other in friends else 0 if other in enemies else 1
+
+def _build_rasi_tables():
+    """Varna, Graha Maitri and Bhakoot as (groom_sign, bride_sign) tables (Vashya depends on the half sign)."""
+    tables = {name: np.zeros((12, 12), dtype=np.float32) for name in ('Varna', 'Graha Maitri', 'Bhakoot')}
+    for groom in range(12):
+        for bride in range(12):
+            tables['Varna'][groom, bride] = 1.0 if _SIGN_VARNA[groom] >= _SIGN_VARNA[bride] else 0.0
+            pair = tuple(sorted((_relation(_SIGN_LORD[groom], _SIGN_LORD[bride]),
+                                 _relation(_SIGN_LORD[bride], _SIGN_LORD[groom]))))
+            tables['Graha Maitri'][groom, bride] = _MAITRI_SCORES[pair]
+            distance = (groom - bride) % 12 + 1
+            tables['Bhakoot'][groom, bride] = 0.0 if distance in (2, 12, 5, 9, 6, 8) else 7.0
+    return tables
+
+def _build_nakshatra_tables():
+    """Tara, Yoni, Gana and Nadi as (groom_nakshatra, bride_nakshatra) 27x27 tables."""
+    tables = {name: np.zeros((27, 27), dtype=np.float32) for name in ('Tara', 'Yoni', 'Gana', 'Nadi')}
+    for groom in range(27):
+        for bride in range(27):
+            tara = 0.0
+            for start, end in ((bride, groom), (groom, bride)):
+                remainder = ((end - start) % 27 + 1) % 9
+                tara += 0.0 if remainder in (3, 5, 7) else 1.5
+            tables['Tara'][groom, bride] = tara
+
+            tables['Yoni'][groom, bride] = _YONI_SCORES[_NAKSHATRA_YONI[groom], _NAKSHATRA_YONI[bride]]
+            tables['Gana'][groom, bride] = _GANA_SCORES[_NAKSHATRA_GANA[groom], _NAKSHATRA_GANA[bride]]
+            tables['Nadi'][groom, bride] = 0.0 if _NAKSHATRA_NADI[groom] == _NAKSHATRA_NADI[bride] else 8.0
+    return tables
+
+RASI_TABLES = _build_rasi_tables()
+NAKSHATRA_TABLES = _build_nakshatra_tables()
+
+# A nakshatra pada (quarter) fixes both the nakshatra and the Moon sign, so the
+# full 36-point score folds into one 108x108 table: scoring is a single gather.
+_PADA_NAKSHATRA = np.arange(108) // 4
+_PADA_SIGN = np.arange(108) // 9
+# Vashya half of the sign for each pada. The 15 degree split falls inside the
+# fifth pada of a sign (13°20'-16°40'); that pada keeps the first half's group
+# (Purva Ashadha 1 stays Manava, Shravana 2 stays Chatushpada).
+_PADA_VASHYA = np.array([_SIGN_VASHYA[pada // 9][int(pada % 9 >= 5)] for pada in range(108)])
+
+KOOTA_TABLES = {
+    name: (NAKSHATRA_TABLES[name][np.ix_(_PADA_NAKSHATRA, _PADA_NAKSHATRA)] if name in NAKSHATRA_TABLES
+           else _VASHYA_SCORES[np.ix_(_PADA_VASHYA, _PADA_VASHYA)].astype(np.float32) if name == 'Vashya'
+           else RASI_TABLES[name][np.ix_(_PADA_SIGN, _PADA_SIGN)])
+    for name in KOOTAS
+}
+TOTAL_SCORE_TABLE = sum(KOOTA_TABLES[name] for name in KOOTAS).astype(np.float32)
+
+def moon_padas(moon_longitudes):
+    """
+    Map sidereal Moon longitudes to nakshatra pada indices (0-107).
+
+    Args:
+        moon_longitudes: Scalar or array of sidereal Moon longitudes in degrees
+
+    Returns:
+        int or numpy.ndarray: Pada index; nakshatra = pada // 4, sign = pada // 9
+    """
+    padas = np.minimum((np.mod(np.asarray(moon_longitudes, dtype=float), 360) // PADA_SPAN).astype(np.int16), 107)
+    return int(padas) if padas.ndim == 0 else padas
+
+def moon_pada_from_planets(planets):
+    """Pada index of the Moon from calculate_planets output (sidereal when available)."""
+    moon = planets['Moon']
+    return moon_padas(moon.get('sidereal_degree', moon['raw_degree']))
+
+def describe_pada(pada):
+    """Return (nakshatra name, pada number 1-4, Moon sign) for a pada index."""
+    return NAKSHATRAS[pada // 4], pada % 4 + 1, ZODIAC_SIGNS[pada // 9]
+
+def koota_breakdown(groom_pada, bride_pada):
+    """
+    Score one couple koota by koota.
+
+    Returns:
+        dict: Koota name -> points, plus 'Total'
+    """
+    breakdown = {name: float(KOOTA_TABLES[name][groom_pada, bride_pada]) for name in KOOTAS}
+    breakdown['Total'] = float(TOTAL_SCORE_TABLE[groom_pada, bride_pada])
+    return breakdown
+
+def score_population(query_pada, population_padas, query_is_groom=True):
+    """
+    Score one chart against a whole population with a single gather.
+
+    Args:
+        query_pada: Pada index of the query chart
+        population_padas: Array of candidate pada indices
+        query_is_groom: Whether the query chart is the groom (kootas are directional)
+
+    Returns:
+        numpy.ndarray: float32 scores out of 36, aligned with population_padas
+    """
+    row = TOTAL_SCORE_TABLE[query_pada] if query_is_groom else TOTAL_SCORE_TABLE[:, query_pada]
+    return row[np.asarray(population_padas)]
+
+def top_matches(query_pada, population_padas, k=10, query_is_groom=True, min_score=0.0, chunk_size=1_000_000):
+    """
+    Stream the best K candidates through a bounded heap.
+
+    The population is scored chunk by chunk; only each chunk's best K
+    (found with a partial sort) are pushed through the heap, so memory stays
+    O(chunk_size + k) regardless of population size.
+
+    Args:
+        query_pada: Pada index of the query chart
+        population_padas: Array of candidate pada indices (may be memory-mapped)
+        k: Number of matches to return
+        query_is_groom: Whether the query chart is the groom
+        min_score: Discard candidates scoring below this
+        chunk_size: Candidates scored per vectorized step
+
+    Returns:
+        list: (score, candidate_index) tuples, best first; ties favour lower indices
+    """
+    heap = []
+    for offset in range(0, len(population_padas), chunk_size):
+        scores = score_population(query_pada, population_padas[offset:offset + chunk_size], query_is_groom)
+        if len(scores) > k:
+            # Chunk-local top K; among ties at the cut-off keep the lowest indices
+            cutoff = np.partition(scores, len(scores) - k)[len(scores) - k]
+            better = np.flatnonzero(scores > cutoff)
+            tied = np.flatnonzero(scores == cutoff)[:k - len(better)]
+            candidates = np.concatenate((better, tied))
+        else:
+            candidates = np.arange(len(scores))
+        for local in candidates:
+            score = float(scores[local])
+            if score < min_score:
+                continue
+            # Min-heap on (score, -index) keeps the K best with lower indices winning ties
+            entry = (score, -(offset + int(local)))
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+    return [(score, -negative_index) for score, negative_index in sorted(heap, reverse=True)]
+
+class CompatibilityIndex:
+    """
+    Population index bucketed by Moon nakshatra pada.
+
+    Every candidate in a bucket shares the same score against a given query,
+    so threshold queries evaluate 108 bucket scores and only touch the
+    candidates of buckets that pass.
+    """
+
+    def __init__(self, population_padas):
+        population_padas = np.asarray(population_padas, dtype=np.int16)
+        self.size = len(population_padas)
+        self.order = np.argsort(population_padas, kind='stable').astype(np.int64)
+        counts = np.bincount(population_padas, minlength=108)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def candidates_in(self, pada):
+        """Indices of all candidates whose Moon falls in the given pada."""
+        return self.order[self.offsets[pada]:self.offsets[pada + 1]]
+
+    def candidates_in_nakshatra(self, nakshatra):
+        """Indices of all candidates whose Moon falls in the given nakshatra (0-26)."""
+        return self.order[self.offsets[nakshatra * 4]:self.offsets[nakshatra * 4 + 4]]
+
+    def matches_above(self, query_pada, min_score, query_is_groom=True):
+        """
+        Return every candidate scoring at least min_score.
+
+        Returns:
+            tuple: (candidate_indices, scores) sorted by descending score
+        """
+        bucket_scores = TOTAL_SCORE_TABLE[query_pada] if query_is_groom else TOTAL_SCORE_TABLE[:, query_pada]
+        passing = np.flatnonzero(bucket_scores >= min_score)
+        passing = passing[np.argsort(-bucket_scores[passing], kind='stable')]
+
+        indices = [self.candidates_in(pada) for pada in passing]
+        scores = [np.full(len(bucket), bucket_scores[pada], dtype=np.float32) for pada, bucket in zip(passing, indices)]
+        if not indices:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(indices), np.concatenate(scores)
+
+    def top_matches(self, query_pada, k=10, query_is_groom=True):
+        """Best K candidates, walking score levels from the highest down."""
+        bucket_scores = TOTAL_SCORE_TABLE[query_pada] if query_is_groom else TOTAL_SCORE_TABLE[:, query_pada]
+        results = []
+        for score in np.unique(bucket_scores)[::-1]:
+            tied = np.sort(np.concatenate([self.candidates_in(pada) for pada in np.flatnonzero(bucket_scores == score)]))
+            results.extend((float(score), int(candidate)) for candidate in tied[:k - len(results)])
+            if len(results) >= k:
+                break
+        return results
@@ -0,0 +1,20 @@
+# conftest.py
+import os
+import pytest
+import skyfield
+import ephemeris
+import kundli_calculator
+
+EXCERPT = os.path.join(os.path.dirname(skyfield.__file__), 'tests', 'data', 'de430-2015-03-02.bsp')
+
+@pytest.fixture
+def excerpt_kernel(monkeypatch):
+    """Skyfield's bundled 2015-03-02 excerpt (about 2015-02-28 to 2015-03-07) instead of de421."""
+    if not os.path.exists(EXCERPT):
+        pytest.skip("de430-2015-03-02.bsp is not shipped with this Skyfield install")
+    monkeypatch.setenv('KUNDLI_EPHEMERIS', EXCERPT)
+    # The excerpt only carries the Mars barycenter
+    monkeypatch.setitem(kundli_calculator.EPHEMERIS_TARGETS, 'Mars', 'mars barycenter')
+    ephemeris.load_skyfield.cache_clear()
+    yield
+    ephemeris.load_skyfield.cache_clear()
@@ -0,0 +1,201 @@
+# dasha.py
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import timedelta
+import numpy as np
+
+# Vimshottari sequence starting from Ketu, with Mahadasha lengths in years
+DASHA_LORDS = ['Ketu', 'Venus', 'Sun', 'Moon', 'Mars', 'Rahu', 'Jupiter', 'Saturn', 'Mercury']
+DASHA_YEARS = np.array([7, 20, 6, 10, 7, 18, 16, 19, 17], dtype=float)
+TOTAL_YEARS = 120.0
+DAYS_PER_YEAR = 365.25
+NAKSHATRA_SPAN = 360.0 / 27
+LEVEL_NAMES = ['Mahadasha', 'Antardasha', 'Pratyantardasha', 'Sookshma', 'Prana']
+
+# Cumulative share of the 120-year cycle at the start of each lord (10 boundaries)
+_WEIGHTS = DASHA_YEARS / TOTAL_YEARS
+_CUMULATIVE = np.concatenate(([0.0], np.cumsum(_WEIGHTS)))
+_CUMULATIVE[-1] = 1.0
+_CUMULATIVE_LIST = _CUMULATIVE.tolist()
+
+DashaPeriod = namedtuple('DashaPeriod', ['lords', 'start', 'end'])
+
+def dasha_seed(moon_longitudes):
+    """
+    Derive the starting Mahadasha lord and the elapsed share of it at birth.
+
+    Args:
+        moon_longitudes: Sidereal Moon longitude(s) in degrees
+
+    Returns:
+        tuple: (lord_index, elapsed_fraction) as scalars or arrays
+    """
+    moon = np.mod(np.asarray(moon_longitudes, dtype=float), 360)
+    nakshatra = np.minimum((moon // NAKSHATRA_SPAN).astype(np.int64), 26)
+    elapsed = (moon - nakshatra * NAKSHATRA_SPAN) / NAKSHATRA_SPAN
+    lord = nakshatra % 9
+    if lord.ndim == 0:
+        return int(lord), float(elapsed)
+    return lord, elapsed
+
+def _cycle_start(moon_longitude, birth_dt):
+    """Return (starting lord index, datetime when its Mahadasha began)."""
+    lord, elapsed = dasha_seed(moon_longitude)
+    elapsed_years = elapsed * DASHA_YEARS[lord]
+    return lord, birth_dt - timedelta(days=elapsed_years * DAYS_PER_YEAR)
+
+def _sub_periods(parent_lord, start, length_years):
+    """Yield (lord, start, end) for the nine sub-periods of a period."""
+    for step in range(9):
+        lord = (parent_lord + step) % 9
+        sub_years = length_years * _WEIGHTS[lord]
+        end = start + timedelta(days=sub_years * DAYS_PER_YEAR)
+        yield lord, start, end, sub_years
+        start = end
+
+def iter_dasha_periods(moon_longitude, birth_dt, levels=3, start=None, end=None):
+    """
+    Lazily generate Vimshottari periods in chronological order.
+
+    Subtrees that fall completely outside [start, end) are never expanded, so
+    asking for a few years at three or more levels touches only a handful of
+    periods instead of the full tree.
+
+    Args:
+        moon_longitude: Sidereal Moon longitude in degrees
+        birth_dt: Birth datetime
+        levels: Depth to generate (1=Mahadasha, 2=Antardasha, 3=Pratyantardasha, ...)
+        start: Optional datetime; periods ending before it are skipped
+        end: Optional datetime; generation stops at it (defaults to one full 120-year cycle)
+
+    Yields:
+        DashaPeriod: (lords, start, end) where lords lists the lord names from
+                     Mahadasha down to the requested level
+    """
+    if levels < 1:
+        raise ValueError("levels must be at least 1")
+
+    first_lord, cycle_start = _cycle_start(moon_longitude, birth_dt)
+
+    def expand(parent_lords, parent_lord, period_start, period_years, depth):
+        for lord, sub_start, sub_end, sub_years in _sub_periods(parent_lord, period_start, period_years):
+            if end is not None and sub_start >= end:
+                return
+            if start is not None and sub_end <= start:
+                continue
+            lords = parent_lords + (DASHA_LORDS[lord],)
+            if depth == levels:
+                yield DashaPeriod(lords, sub_start, sub_end)
+            else:
+                yield from expand(lords, lord, sub_start, sub_years, depth + 1)
+
+    # A full Vimshottari cycle is one 120-year "period" whose children are the Mahadashas
+    cycle = 0
+    while True:
+        offset = timedelta(days=cycle * TOTAL_YEARS * DAYS_PER_YEAR)
+        yield from expand((), first_lord, cycle_start + offset, TOTAL_YEARS, 1)
+        cycle += 1
+        if end is None or cycle_start + offset + timedelta(days=TOTAL_YEARS * DAYS_PER_YEAR) >= end:
+            return
+
+def active_period(moon_longitude, birth_dt, when, levels=3):
+    """
+    Find the period active at a date by bisecting cumulative boundaries.
+
+    Each level is located with one bisection over the 10 cumulative
+    boundaries of its parent, so the lookup is O(levels * log 9) and does
+    not expand any of the tree.
+
+    Args:
+        moon_longitude: Sidereal Moon longitude in degrees
+        birth_dt: Birth datetime
+        when: Datetime to query
+        levels: Depth of the lookup
+
+    Returns:
+        DashaPeriod: The innermost active period with lords from each level
+    """
+    first_lord, cycle_start = _cycle_start(moon_longitude, birth_dt)
+    years = (when - cycle_start).total_seconds() / 86400.0 / DAYS_PER_YEAR
+    cycles, position = divmod(years / TOTAL_YEARS, 1.0)
+
+    parent_lord = first_lord
+    period_start_years = cycles * TOTAL_YEARS
+    period_years = TOTAL_YEARS
+    lords = ()
+    for _ in range(levels):
+        # Rotate into the Ketu-based cumulative table, then bisect
+        rotated = (_CUMULATIVE_LIST[parent_lord] + position) % 1.0
+        lord = min(bisect_right(_CUMULATIVE_LIST, rotated) - 1, 8)
+        offset = (_CUMULATIVE_LIST[lord] - _CUMULATIVE_LIST[parent_lord]) % 1.0
+        position = (rotated - _CUMULATIVE_LIST[lord]) / _WEIGHTS[lord]
+        period_start_years += offset * period_years
+        period_years *= _WEIGHTS[lord]
+        parent_lord = lord
+        lords += (DASHA_LORDS[lord],)
+
+    start = cycle_start + timedelta(days=period_start_years * DAYS_PER_YEAR)
+    end = start + timedelta(days=period_years * DAYS_PER_YEAR)
+    return DashaPeriod(lords, start, end)
+
+def active_periods_batch(moon_longitudes, birth_jds, when_jds, levels=3):
+    """
+    Vectorized active-period lookup for many charts.
+
+    Args:
+        moon_longitudes: Array of sidereal Moon longitudes in degrees
+        birth_jds: Array of birth Julian dates
+        when_jds: Julian date (scalar or array) to query
+        levels: Depth of the lookup
+
+    Returns:
+        dict: 'lords' (n_charts, levels) int8 indices into DASHA_LORDS,
+              'start_jd' and 'end_jd' of the innermost active period
+    """
+    lord, elapsed = dasha_seed(np.atleast_1d(moon_longitudes))
+    birth_jds = np.asarray(birth_jds, dtype=float)
+    cycle_start = birth_jds - elapsed * DASHA_YEARS[lord] * DAYS_PER_YEAR
+    years = (np.asarray(when_jds, dtype=float) - cycle_start) / DAYS_PER_YEAR
+    cycles, position = np.divmod(years / TOTAL_YEARS, 1.0)
+
+    parent_lord = lord
+    period_start_years = cycles * TOTAL_YEARS
+    period_years = np.full(parent_lord.shape, TOTAL_YEARS)
+    lords = np.empty((parent_lord.shape[0], levels), dtype=np.int8)
+    for level in range(levels):
+        rotated = np.mod(_CUMULATIVE[parent_lord] + position, 1.0)
+        child = np.minimum(np.searchsorted(_CUMULATIVE, rotated, side='right') - 1, 8)
+        offset = np.mod(_CUMULATIVE[child] - _CUMULATIVE[parent_lord], 1.0)
+        position = (rotated - _CUMULATIVE[child]) / _WEIGHTS[child]
+        period_start_years = period_start_years + offset * period_years
+        period_years = period_years * _WEIGHTS[child]
+        parent_lord = child
+        lords[:, level] = child
+
+    start_jd = cycle_start + period_start_years * DAYS_PER_YEAR
+    return {
+        'lords': lords,
+        'start_jd': start_jd,
+        'end_jd': start_jd + period_years * DAYS_PER_YEAR,
+    }
+
+def format_dasha_period(period):
+    """Return a readable description like 'Venus / Sun / Moon (01 Jan 2020 - 15 Mar 2020)'."""
+    return f"{' / '.join(period.lords)} ({period.start.strftime('%d %b %Y')} - {period.end.strftime('%d %b %Y')})"
+
+def dasha_from_planets(planets, birth_dt, when, levels=3):
+    """
+    Find the active dasha for a chart returned by calculate_planets.
+
+    Args:
+        planets: Planet dictionary from calculate_planets
+        birth_dt: Birth datetime
+        when: Datetime to query
+        levels: Depth of the lookup
+
+    Returns:
+        DashaPeriod: Active period
+    """
+    moon = planets['Moon']
+    moon_longitude = moon.get('sidereal_degree', moon['raw_degree'])
+    return active_period(moon_longitude, birth_dt, when, levels)
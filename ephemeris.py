@@ -0,0 +1,193 @@
+# ephemeris.py
+import argparse
+import os
+from functools import lru_cache
+import numpy as np
+from skyfield.api import load, load_file
+
+FULL_KERNEL = 'de421.bsp'
+DEFAULT_TRIMMED_KERNEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ephemeris-trimmed.bsp')
+# The range every date input of the app stays inside. de421 itself only
+# covers 1899-07-29 to 2053-10-09; requested ranges are clamped to the
+# source kernel, and a trimmed kernel that does not span this whole range
+# is ignored in favour of the full one.
+DEFAULT_START = '1900/01/01'
+DEFAULT_END = '2053/10/01'
+
+# NAIF ids of the bodies the app observes (see kundli_calculator.EPHEMERIS_TARGETS) plus Earth
+NAIF_IDS = {
+    'earth': 399,
+    'sun': 10,
+    'moon': 301,
+    'mercury': 199,
+    'venus': 299,
+    'mars': 499,
+    'jupiter barycenter': 5,
+    'saturn barycenter': 6,
+}
+
+@lru_cache(maxsize=1)
+def load_skyfield():
+    """
+    Load the timescale and ephemeris once per process.
+
+    The kernel named by the KUNDLI_EPHEMERIS environment variable is used
+    when set; otherwise the trimmed kernel from build_trimmed_kernel is
+    preferred when present and covering DEFAULT_START - DEFAULT_END,
+    falling back to the full de421.bsp. Kernels are
+    opened read-only and memory-mapped by jplephem, so worker processes
+    share one copy in the page cache.
+
+    Returns:
+        tuple: (timescale, ephemeris)
+    """
+    ts = load.timescale()
+    path = os.getenv('KUNDLI_EPHEMERIS')
+    if path:
+        return ts, load_file(path)
+    if os.path.exists(DEFAULT_TRIMMED_KERNEL):
+        eph = load_file(DEFAULT_TRIMMED_KERNEL)
+        start_jd, end_jd = _coverage(eph.spk.segments)
+        if start_jd <= _calendar_jd(DEFAULT_START) and end_jd >= _calendar_jd(DEFAULT_END):
+            return ts, eph
+        eph.close()
+    return ts, load(FULL_KERNEL)
+
+def kernel_coverage():
+    """(start_jd, end_jd) TDB span in which the loaded kernel covers every body it holds."""
+    return _coverage(load_skyfield()[1].spk.segments)
+
+def _calendar_jd(date_str):
+    """Julian date at 0h of a 'YYYY/MM/DD' date string."""
+    year, month, day = (int(part) for part in date_str.split('/'))
+    return load.timescale().tt(year, month, day).tt
+
+def _coverage(segments):
+    """(start_jd, end_jd) range in which every (center, target) pair of the segments is covered."""
+    spans = {}
+    for segment in segments:
+        key = (segment.center, segment.target)
+        start_jd, end_jd = spans.get(key, (segment.start_jd, segment.end_jd))
+        spans[key] = (min(start_jd, segment.start_jd), max(end_jd, segment.end_jd))
+    return max(start_jd for start_jd, _ in spans.values()), min(end_jd for _, end_jd in spans.values())
+
+def _required_segments(spk, target_names):
+    """Segments needed to chain every target back to the solar system barycenter."""
+    by_target = {segment.target: segment for segment in spk.segments}
+    required = []
+    for name in target_names:
+        code = NAIF_IDS[name]
+        while code != 0:
+            segment = by_target[code]
+            if segment not in required:
+                required.append(segment)
+            code = segment.center
+    return required
+
+def build_trimmed_kernel(source=FULL_KERNEL, output=DEFAULT_TRIMMED_KERNEL, start=DEFAULT_START, end=DEFAULT_END,
+                         targets=tuple(NAIF_IDS)):
+    """
+    Write an SPK excerpt holding only the needed segments and date range.
+
+    Chebyshev records are copied verbatim from the source kernel, so
+    positions computed from the excerpt are bit-for-bit identical.
+
+    Args:
+        source: Path to the full kernel
+        output: Path of the trimmed kernel to create
+        start: First date to cover (YYYY/MM/DD), clamped to the source coverage
+        end: Last date to cover (YYYY/MM/DD), clamped to the source coverage
+        targets: Body names (keys of NAIF_IDS) to keep
+
+    Returns:
+        str: Path of the written kernel
+    """
+    from jplephem.spk import SPK
+    from jplephem.excerpter import write_excerpt
+
+    if not os.path.exists(source):
+        load(source)  # downloads into the working directory like the rest of the app
+    spk = SPK.open(source)
+    try:
+        required = _required_segments(spk, targets)
+        summaries = [(name, values) for (name, values), segment in zip(spk.daf.summaries(), spk.segments)
+                     if segment in required]
+        source_start, source_end = _coverage(required)
+        start_jd, end_jd = max(_calendar_jd(start), source_start), min(_calendar_jd(end), source_end)
+        if start_jd >= end_jd:
+            raise ValueError(f"{source} does not cover {start} - {end}")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        tmp_path = output + '.tmp'
+        with open(tmp_path, 'w+b') as output_file:
+            write_excerpt(spk, output_file, start_jd, end_jd, summaries)
+        os.replace(tmp_path, output)
+    finally:
+        spk.close()
+    return output
+
+def verify_trimmed_kernel(trimmed=DEFAULT_TRIMMED_KERNEL, source=FULL_KERNEL, start=DEFAULT_START, end=DEFAULT_END,
+                          samples=200_000, seed=0):
+    """
+    Confirm the trimmed kernel reproduces the full kernel exactly.
+
+    Every segment of the trimmed kernel is evaluated at an evenly spaced
+    grid plus random instants and compared bit-for-bit with the matching
+    segment of the source kernel. Only the part of start - end that both
+    kernels cover is sampled.
+
+    Returns:
+        dict: (center, target) -> number of instants compared
+
+    Raises:
+        ValueError: If any position differs or a segment is missing
+    """
+    from jplephem.spk import SPK
+
+    full = SPK.open(source)
+    small = SPK.open(trimmed)
+    try:
+        reference = {(segment.center, segment.target): segment for segment in full.segments}
+        missing = [key for key in ((segment.center, segment.target) for segment in small.segments)
+                   if key not in reference]
+        if missing:
+            raise ValueError(f"Segment {missing[0]} is not in {source}")
+
+        trimmed_start, trimmed_end = _coverage(small.segments)
+        source_start, source_end = _coverage([reference[segment.center, segment.target] for segment in small.segments])
+        start_jd = max(_calendar_jd(start), trimmed_start, source_start)
+        end_jd = min(_calendar_jd(end), trimmed_end, source_end)
+        rng = np.random.default_rng(seed)
+        tdb = np.concatenate((np.linspace(start_jd, end_jd, samples // 2, endpoint=False),
+                              rng.uniform(start_jd, end_jd, samples - samples // 2)))
+
+        checked = {}
+        for segment in small.segments:
+            key = (segment.center, segment.target)
+            expected = reference[key].compute(tdb)
+            actual = segment.compute(tdb)
+            if not np.array_equal(expected, actual):
+                worst = np.max(np.abs(expected - actual))
+                raise ValueError(f"Segment {key} differs from {source} by up to {worst} km")
+            checked[key] = len(tdb)
+    finally:
+        full.close()
+        small.close()
+    return checked
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a trimmed, date-range ephemeris kernel")
+    parser.add_argument("--source", default=FULL_KERNEL)
+    parser.add_argument("--output", default=DEFAULT_TRIMMED_KERNEL)
+    parser.add_argument("--start", default=DEFAULT_START, help="YYYY/MM/DD")
+    parser.add_argument("--end", default=DEFAULT_END, help="YYYY/MM/DD")
+    parser.add_argument("--verify-only", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verify_only:
+        path = build_trimmed_kernel(args.source, args.output, args.start, args.end)
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB, source {os.path.getsize(args.source) / 1e6:.1f} MB)")
+    if args.output == DEFAULT_TRIMMED_KERNEL and (args.start, args.end) != (DEFAULT_START, DEFAULT_END):
+        print(f"Note: load_skyfield only uses {args.output} when it covers {DEFAULT_START} - {DEFAULT_END}")
+    checked = verify_trimmed_kernel(args.output, args.source, args.start, args.end)
+    for (center, target), count in checked.items():
+        print(f"Segment {center} -> {target}: {count} instants identical")
@@ -1,12 +1,23 @@
 # forecast.py
-from skyfield.api import load
 from datetime import datetime
 from utils import get_zodiac_sign
 from skyfield.api import utc  # Import Skyfield's utc object
+from skyfield.framelib import ecliptic_frame
+from ephemeris import load_skyfield
+from analytic_ephemeris import compute_positions, julian_day
+from kundli_calculator import POSITION_ENGINES
 
-def daily_forecast():
-    ts = load.timescale()
-    eph = load('de421.bsp')
+def daily_forecast(engine='ephemeris'):
+    """Today's Sun and Moon signs; engine='analytic' skips the kernel load entirely."""
+    if engine not in POSITION_ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(POSITION_ENGINES)}")
+    if engine == 'analytic':
+        now = datetime.now(tz=utc)
+        jd_ut = julian_day(now.year, now.month, now.day, now.hour, now.minute + now.second / 60.0)
+        (sun_pos, moon_pos), _, _ = compute_positions(jd_ut, bodies=('Sun', 'Moon'))
+        return f"Today: Sun in {get_zodiac_sign(sun_pos)}, Moon in {get_zodiac_sign(moon_pos)}"
+
+    ts, eph = load_skyfield()
     t = ts.utc(datetime.now(tz=utc))  # Use timezone-aware datetime
     
     # Get Sun and Moon positions
@@ -14,7 +25,7 @@ def daily_forecast():
     sun = eph['sun']
     moon = eph['moon']
     
-    sun_pos = earth.at(t).observe(sun).ecliptic_latlon()[1].degrees
-    moon_pos = earth.at(t).observe(moon).ecliptic_latlon()[1].degrees
+    sun_pos = earth.at(t).observe(sun).frame_latlon(ecliptic_frame)[1].degrees
+    moon_pos = earth.at(t).observe(moon).frame_latlon(ecliptic_frame)[1].degrees
     
     return f"Today: Sun in {get_zodiac_sign(sun_pos)}, Moon in {get_zodiac_sign(moon_pos)}"
\ No newline at end of file
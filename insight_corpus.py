@@ -0,0 +1,463 @@
+# insight_corpus.py
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+from kundli_calculator import PLANET_NAMES
+from utils import ZODIAC_SIGNS, parse_degree
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'insights')
+
+# Category key -> question_type passed to the LLM for the same insight
+INSIGHT_CATEGORIES = {
+    'career': 'career and profession',
+    'love': 'love, relationships and marriage',
+    'health': 'health and wellness',
+    'finance': 'finance, wealth and prosperity',
+}
+CATEGORY_LABELS = {'career': 'your career', 'love': 'love and relationships', 'health': 'your health',
+                   'finance': 'money matters'}
+# Words that identify a category in a free-form question_type (and measure focus in readings)
+CATEGORY_KEYWORDS = {
+    'career': ('career', 'profession', 'work', 'job'),
+    'love': ('love', 'relationship', 'marriage', 'partner'),
+    'health': ('health', 'wellness', 'vitality', 'body'),
+    'finance': ('finance', 'wealth', 'money', 'income', 'prosperity'),
+}
+
+def _keyword_pattern(keyword):
+    """Regex for a keyword and its plural ('job' -> jobs, 'body' -> bodies)."""
+    if keyword.endswith('y') and keyword[-2] not in 'aeiou':
+        return keyword[:-1] + "(?:y|ies)"
+    return keyword + "(?:s|es)?"
+
+# Whole words only (plurals allowed), so 'networking' or 'somebody' match nothing
+CATEGORY_PATTERNS = {category: re.compile(r"\b(?:" + "|".join(map(_keyword_pattern, keywords)) + r")\b", re.IGNORECASE)
+                     for category, keywords in CATEGORY_KEYWORDS.items()}
+# Houses that carry the most weight for each category
+KEY_HOUSES = {'career': (2, 6, 10, 11), 'love': (2, 5, 7, 12), 'health': (1, 6, 8, 12), 'finance': (2, 5, 9, 11)}
+
+# Index rows: planet-in-sign for each planet, planet-in-house for each planet, then the ascendant sign
+FACTOR_ROWS = [('sign', name) for name in PLANET_NAMES] + [('house', name) for name in PLANET_NAMES] + [('ascendant', None)]
+FACTOR_VALUES = 12
+
+# Vetting rules for generated snippets
+MIN_SNIPPET_CHARS = 40
+MAX_SNIPPET_CHARS = 700
+REJECT_PATTERN = re.compile(r"\b(sorry|as an ai|i cannot|error|guarantee[sd]?|diagnos\w*|cures?|death)\b", re.IGNORECASE)
+
+SNIPPET_TEMPLATE = """You are a Vedic astrologer writing a reusable snippet for a reading library.
+Write 2-3 sentences on what {factor} means for {question_type}.
+Plain prose addressed to the reader as "you", no greeting, no lists, no medical or financial
+guarantees, under 80 words."""
+
+SMOOTH_TEMPLATE = """You are editing an astrology reading about {question_type}. Rewrite it as flowing,
+warm prose. Keep every planet, sign and house that is mentioned and do not add new predictions.
+
+Reading to rewrite:
+{reading}"""
+
+SIGN_TRAITS = {
+    'Aries': 'bold, direct and pioneering', 'Taurus': 'steady, patient and practical',
+    'Gemini': 'curious, versatile and communicative', 'Cancer': 'protective, intuitive and caring',
+    'Leo': 'confident, generous and expressive', 'Virgo': 'precise, analytical and service-minded',
+    'Libra': 'diplomatic, fair and partnership-oriented', 'Scorpio': 'intense, private and determined',
+    'Sagittarius': 'optimistic, principled and freedom-loving', 'Capricorn': 'disciplined, ambitious and methodical',
+    'Aquarius': 'independent, inventive and community-minded', 'Pisces': 'compassionate, imaginative and adaptable',
+}
+ELEMENTS = ('fire', 'earth', 'air', 'water')   # indexed by sign % 4
+ELEMENT_ADVICE = {
+    'fire': {
+        'career': "Take the lead on projects you believe in, and pace yourself so enthusiasm does not turn into burnout.",
+        'love': "Keep the spark alive with shared adventures, and give a partner room to speak before you act.",
+        'health': "Regular vigorous exercise releases restlessness; guard against overexertion and running on adrenaline.",
+        'finance': "Bold moves can pay off, but set limits in advance so impulse does not drive spending.",
+    },
+    'earth': {
+        'career': "Steady effort and visible results build your reputation; structured roles and long-term goals suit you.",
+        'love': "Loyalty and practical care say more than words, but make time to express feelings openly too.",
+        'health': "Consistent routines in sleep and diet keep you strong; watch for stiffness and a sedentary rut.",
+        'finance': "Patient saving and tangible assets favour you; review plans regularly rather than holding on out of habit.",
+    },
+    'air': {
+        'career': "Work built on ideas, networks and communication brings out your best; make a point of finishing what you start.",
+        'love': "Conversation and shared interests keep the bond alive; stay present when emotions run deep.",
+        'health': "A busy mind needs rest: breathing practice, fresh air and screen breaks calm the nervous system.",
+        'finance': "Information and contacts bring opportunities; compare options carefully before committing funds.",
+    },
+    'water': {
+        'career': "Roles that draw on intuition and care for others are rewarding; protect your energy in tense workplaces.",
+        'love': "Deep emotional bonds matter to you; share your needs clearly instead of expecting them to be sensed.",
+        'health': "Emotional wellbeing and physical health are closely linked; rest, hydration and calm surroundings restore you.",
+        'finance': "Trust your instincts about security, but base major decisions on figures rather than mood.",
+    },
+}
+PLANET_THEMES = {
+    'Sun': {'career': 'ambition and the drive for recognition', 'love': 'pride and the wish to be admired',
+            'health': 'core vitality', 'finance': 'the urge to earn through status and authority'},
+    'Moon': {'career': 'the need for emotional satisfaction at work', 'love': 'emotional needs',
+             'health': 'emotional balance and daily rhythms', 'finance': 'the need for financial security'},
+    'Mercury': {'career': 'communication and analytical skill', 'love': 'the way you talk through feelings',
+                'health': 'the nervous system and mental restlessness', 'finance': 'commercial sense and calculation'},
+    'Venus': {'career': 'creativity and cooperation at work', 'love': 'affection and romantic taste',
+              'health': 'comfort-seeking habits and balance', 'finance': 'spending on comfort and beauty'},
+    'Mars': {'career': 'drive and competitiveness', 'love': 'passion and assertiveness',
+             'health': 'physical energy and the tendency to overdo it', 'finance': 'boldness in taking financial risks'},
+    'Jupiter': {'career': 'growth, guidance and opportunity', 'love': 'generosity and shared ideals',
+                'health': 'resilience and the risk of excess', 'finance': 'expansion and good fortune with money'},
+    'Saturn': {'career': 'discipline and long-term responsibility', 'love': 'commitment and caution',
+               'health': 'endurance and long-term strain', 'finance': 'thrift and slow, steady accumulation'},
+}
+HOUSE_THEMES = ('self-image and personal direction', 'money, family and speech', 'courage, skills and communication',
+                'home, mother and inner peace', 'creativity, romance and children', 'daily work, health and obstacles',
+                'partnerships and marriage', 'transformation, shared resources and hidden matters',
+                'fortune, higher learning and beliefs', 'career and public standing', 'gains, income and friendships',
+                'expenses, rest and retreat')
+EXALTATION = {'Sun': 'Aries', 'Moon': 'Taurus', 'Mercury': 'Virgo', 'Venus': 'Pisces', 'Mars': 'Capricorn',
+              'Jupiter': 'Cancer', 'Saturn': 'Libra'}
+OWN_SIGNS = {'Sun': ('Leo',), 'Moon': ('Cancer',), 'Mercury': ('Gemini', 'Virgo'), 'Venus': ('Taurus', 'Libra'),
+             'Mars': ('Aries', 'Scorpio'), 'Jupiter': ('Sagittarius', 'Pisces'), 'Saturn': ('Capricorn', 'Aquarius')}
+
+def category_for(question_type):
+    """Corpus category for a question_type such as 'career and profession', or None."""
+    for category, pattern in CATEGORY_PATTERNS.items():
+        if pattern.search(question_type):
+            return category
+    return None
+
+def _ordinal(number):
+    return f"{number}{'th' if 10 <= number % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(number % 10, 'th')}"
+
+def factor_text(kind, planet, value):
+    """Human-readable factor, e.g. 'Mars in Capricorn', 'Mars in the 10th house' or 'Leo ascendant'."""
+    if kind == 'sign':
+        return f"{planet} in {ZODIAC_SIGNS[value]}"
+    if kind == 'house':
+        return f"{planet} in the {_ordinal(value + 1)} house"
+    return f"{ZODIAC_SIGNS[value]} ascendant"
+
+def template_snippet(kind, planet, value, category):
+    """
+    Deterministic snippet from the sign, house and planet tables (no LLM).
+
+    Args:
+        kind: 'sign', 'house' or 'ascendant'
+        planet: Planet name (None for the ascendant)
+        value: Sign index (0-11) or house number minus one
+        category: Key of INSIGHT_CATEGORIES
+
+    Returns:
+        str: Snippet text
+    """
+    label = CATEGORY_LABELS[category]
+    if kind == 'ascendant':
+        sign = ZODIAC_SIGNS[value]
+        return (f"With {sign} rising, you approach {label} in a {SIGN_TRAITS[sign]} manner. "
+                f"{ELEMENT_ADVICE[ELEMENTS[value % 4]][category]}")
+    theme = PLANET_THEMES[planet][category]
+    if kind == 'house':
+        house = value + 1
+        text = f"{planet} in the {_ordinal(house)} house brings {theme} into {HOUSE_THEMES[value]}."
+        if house in KEY_HOUSES[category]:
+            return text + f" This is one of the main houses for {label}, so the placement carries extra weight."
+        return text + f" Its effect on {label} is indirect, working through these areas of life."
+    sign = ZODIAC_SIGNS[value]
+    text = f"{planet} in {sign} expresses {theme} in a {SIGN_TRAITS[sign]} way."
+    if EXALTATION[planet] == sign:
+        text += f" {planet} is exalted here, so these qualities come through strongly and constructively."
+    elif ZODIAC_SIGNS[(ZODIAC_SIGNS.index(EXALTATION[planet]) + 6) % 12] == sign:
+        text += f" {planet} is debilitated here, so these qualities need conscious effort before they help."
+    elif sign in OWN_SIGNS[planet]:
+        text += f" {planet} rules this sign and acts with confidence here."
+    return text
+
+def llm_snippet_generator(complete):
+    """
+    Snippet generator backed by an LLM.
+
+    Args:
+        complete: Callable taking a prompt string and returning the reply text
+
+    Returns:
+        callable: Generator with the template_snippet signature
+    """
+    def generate(kind, planet, value, category):
+        return complete(SNIPPET_TEMPLATE.format(factor=factor_text(kind, planet, value),
+                                                question_type=INSIGHT_CATEGORIES[category]))
+    return generate
+
+def vet_snippet(text, kind, planet, value):
+    """
+    Check a generated snippet before it enters the corpus.
+
+    It must be within the length limits, end a sentence, name its factor
+    (the planet, or the sign for the ascendant) and contain no refusal,
+    error or guarantee language.
+
+    Returns:
+        bool: True if the snippet is acceptable
+    """
+    text = text.strip()
+    lowered = text.lower()
+    subject = ZODIAC_SIGNS[value] if kind == 'ascendant' else planet
+    return (MIN_SNIPPET_CHARS <= len(text) <= MAX_SNIPPET_CHARS and text[-1] in '.!?'
+            and subject.lower() in lowered and not REJECT_PATTERN.search(text))
+
+def build_insight_corpus(output_dir=DEFAULT_CORPUS_DIR, generate=template_snippet, attempts=2, workers=1):
+    """
+    Generate, vet and store one snippet per factor and category.
+
+    Every (category, factor row, value) cell of the index gets a snippet.
+    A generator result that fails vet_snippet after `attempts` tries is
+    replaced by template_snippet and counted in the manifest.
+
+    Args:
+        output_dir: Directory to write the corpus into
+        generate: Callable (kind, planet, value, category) -> str, e.g.
+                  template_snippet or llm_snippet_generator(...)
+        attempts: Generator calls per cell before falling back to the template
+        workers: Threads issuing generator calls (useful for remote LLMs)
+
+    Returns:
+        str: The corpus directory
+    """
+    cells = [(category, kind, planet, value) for category in INSIGHT_CATEGORIES
+             for kind, planet in FACTOR_ROWS for value in range(FACTOR_VALUES)]
+
+    def vetted(cell):
+        category, kind, planet, value = cell
+        for _ in range(attempts):
+            try:
+                text = generate(kind, planet, value, category).strip()
+            except Exception:
+                continue
+            if vet_snippet(text, kind, planet, value):
+                return text, False
+        return template_snippet(kind, planet, value, category), True
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(vetted, cells))
+
+    encoded = [text.encode('utf-8') for text, _ in results]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(data) for data in encoded])
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, values in (('text', np.frombuffer(b''.join(encoded), dtype=np.uint8)), ('offsets', offsets)):
+        tmp_path = os.path.join(output_dir, f'{name}.tmp.npy')
+        np.save(tmp_path, values)
+        os.replace(tmp_path, os.path.join(output_dir, f'{name}.npy'))
+    manifest_path = os.path.join(output_dir, 'corpus.json')
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump({'categories': list(INSIGHT_CATEGORIES), 'rows': [list(row) for row in FACTOR_ROWS],
+                   'values': FACTOR_VALUES, 'generator': getattr(generate, '__name__', str(generate)),
+                   'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                   'replaced_by_template': sum(replaced for _, replaced in results)}, f)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return output_dir
+
+class InsightCorpus:
+    """
+    Memory-mapped snippet corpus.
+
+    All snippets are stored back to back as UTF-8 bytes in one array, and
+    offsets holds where each (category, factor row, value) cell starts, so
+    a lookup is two array reads and a decode.
+    """
+
+    def __init__(self, path=DEFAULT_CORPUS_DIR):
+        manifest_path = os.path.join(path, 'corpus.json')
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"No insight corpus in {path}. Build it with: python insight_corpus.py")
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+        self.categories = self.manifest['categories']
+        self.rows = [tuple(row) for row in self.manifest['rows']]
+        self.n_values = self.manifest['values']
+        self.text = np.load(os.path.join(path, 'text.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode='r')
+
+    def snippet(self, category, kind, planet, value):
+        """Stored snippet for one factor, e.g. snippet('career', 'house', 'Mars', 9) for Mars in the 10th."""
+        cell = (self.categories.index(category) * len(self.rows) + self.rows.index((kind, planet))) * self.n_values + value
+        return self.text[self.offsets[cell]:self.offsets[cell + 1]].tobytes().decode('utf-8')
+
+    def assemble(self, planets, ascendant, category):
+        """
+        Build a reading from the snippets of one chart's factors.
+
+        The ascendant comes first, then planets in the category's key houses,
+        then the rest in PLANET_NAMES order.
+
+        Args:
+            planets: calculate_planets result
+            ascendant: Ascendant string from calculate_planets
+            category: Key of INSIGHT_CATEGORIES
+
+        Returns:
+            str: Paragraphs separated by blank lines
+        """
+        paragraphs = [self.snippet(category, 'ascendant', None, int(parse_degree(ascendant) // 30))]
+        placed = [name for name in PLANET_NAMES if name in planets]
+        placed.sort(key=lambda name: planets[name]['house'] not in KEY_HOUSES[category])
+        for name in placed:
+            data = planets[name]
+            degree = data['raw_degree'] if 'raw_degree' in data else parse_degree(data['degree'])
+            paragraphs.append(f"{self.snippet(category, 'sign', name, int(degree % 360 // 30))} "
+                              f"{self.snippet(category, 'house', name, int(data['house']) - 1)}")
+        return "\n\n".join(paragraphs)
+
+@lru_cache(maxsize=1)
+def get_insight_corpus(path=DEFAULT_CORPUS_DIR):
+    """
+    Open the insight corpus once per process.
+
+    When no corpus has been built yet, the template corpus is built on
+    first use (like the ayanamsa table); an LLM-written corpus built with
+    python insight_corpus.py --generator groq replaces it.
+    """
+    path = os.getenv('KUNDLI_INSIGHT_CORPUS', path)
+    if not os.path.exists(os.path.join(path, 'corpus.json')):
+        try:
+            build_insight_corpus(path)
+        except OSError:
+            pass  # Read-only install: InsightCorpus reports the missing corpus
+    return InsightCorpus(path)
+
+def corpus_reading(planets, ascendant, question_type):
+    """
+    Reading assembled from the corpus, or None when the question_type has no
+    category or the corpus is unavailable, e.g. on a read-only install
+    (callers then fall back to the LLM).
+    """
+    category = category_for(question_type)
+    if category is None:
+        return None
+    try:
+        corpus = get_insight_corpus()
+    except FileNotFoundError:
+        return None
+    return corpus.assemble(planets, ascendant, category)
+
+def reading_quality(reading, planets, ascendant, category):
+    """
+    Simple, model-independent quality measures for a reading.
+
+    Returns:
+        dict: 'coverage' (share of the chart's sign, house and ascendant
+              factors named together in one sentence), 'focus' (category
+              keyword mentions), 'words' and 'vetted' (no REJECT_PATTERN match)
+    """
+    sentences = [sentence.lower() for sentence in re.split(r'(?<=[.!?])\s+', reading)]
+    ascendant_sign = ZODIAC_SIGNS[int(parse_degree(ascendant) // 30)].lower()
+    factors = [(ascendant_sign, ('rising', 'ascendant', 'lagna'))]
+    for name, data in planets.items():
+        degree = data['raw_degree'] if 'raw_degree' in data else parse_degree(data['degree'])
+        house = int(data['house'])
+        factors.append((name.lower(), (ZODIAC_SIGNS[int(degree % 360 // 30)].lower(),)))
+        factors.append((name.lower(), (f"{_ordinal(house)} house", f"house {house}")))
+    covered = sum(any(subject in sentence and any(term in sentence for term in terms) for sentence in sentences)
+                  for subject, terms in factors)
+    return {'coverage': covered / len(factors),
+            'focus': len(CATEGORY_PATTERNS[category].findall(reading)),
+            'words': len(reading.split()),
+            'vetted': not REJECT_PATTERN.search(reading)}
+
+class FakeLLM:
+    """
+    Stand-in LLM for the comparison harness: sleeps for a fixed latency.
+
+    Smoothing prompts get the reading back as one paragraph. Insight
+    prompts get a generic answer that mentions the first few planet lines
+    of the prompt, like a short real reply would.
+    """
+
+    def __init__(self, latency=0.5, planet_lines=3):
+        self.latency = latency
+        self.planet_lines = planet_lines
+        self.calls = 0
+
+    def __call__(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency)
+        if "Reading to rewrite:" in prompt:
+            return " ".join(prompt.split("Reading to rewrite:", 1)[1].split())
+        lines = [line.strip() for line in prompt.splitlines() if line.strip().split(':')[0] in PLANET_NAMES]
+        notes = " ".join(f"Your {line.replace(':', ' is at')}." for line in lines[:self.planet_lines])
+        return f"Based on your chart, this is a period to build steadily. {notes} Stay patient and practical."
+
+def _insight_prompt(planets, ascendant, question_type):
+    """Same content as KundliAIInterpreter.get_astrological_insights sends, without LangChain."""
+    from utils import format_planet_positions
+    return (f"As a Vedic astrologer, provide specific insights about {question_type} based on this birth chart:\n"
+            f"Ascendant: {ascendant}\nPlanetary Positions:\n{format_planet_positions(planets)}\n"
+            f"Focus specifically on {question_type} predictions, remedies, and guidance.")
+
+def compare_paths(complete, n_charts=5, corpus=None, seed=0):
+    """
+    Compare quality and latency of the LLM, corpus and corpus + smoothing paths.
+
+    Args:
+        complete: Callable prompt -> text (FakeLLM or a wrapper around a real model)
+        n_charts: Random charts to read, each in every category
+        corpus: InsightCorpus (defaults to get_insight_corpus())
+
+    Returns:
+        dict: path -> {'p50_ms', 'p95_ms', 'coverage', 'focus', 'words', 'vetted'}
+    """
+    from reports import planets_from_degrees
+
+    corpus = corpus or get_insight_corpus()
+    rng = np.random.default_rng(seed)
+    paths = {
+        'llm': lambda planets, ascendant, category: complete(
+            _insight_prompt(planets, ascendant, INSIGHT_CATEGORIES[category])),
+        'corpus': lambda planets, ascendant, category: corpus.assemble(planets, ascendant, category),
+        'corpus+smooth': lambda planets, ascendant, category: complete(SMOOTH_TEMPLATE.format(
+            question_type=INSIGHT_CATEGORIES[category], reading=corpus.assemble(planets, ascendant, category))),
+    }
+    charts = [planets_from_degrees(rng.uniform(0, 360, len(PLANET_NAMES)), rng.uniform(0, 360))
+              for _ in range(n_charts)]
+
+    results = {}
+    for path, read in paths.items():
+        timings, scores = [], []
+        for planets, ascendant in charts:
+            for category in INSIGHT_CATEGORIES:
+                began = time.perf_counter()
+                reading = read(planets, ascendant, category)
+                timings.append((time.perf_counter() - began) * 1000)
+                scores.append(reading_quality(reading, planets, ascendant, category))
+        results[path] = {'p50_ms': float(np.percentile(timings, 50)), 'p95_ms': float(np.percentile(timings, 95))}
+        results[path].update({key: float(np.mean([score[key] for score in scores]))
+                              for key in ('coverage', 'focus', 'words', 'vetted')})
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the insight snippet corpus or compare reading paths")
+    parser.add_argument("--output", default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--generator", choices=('template', 'groq'), default='template')
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent LLM calls when building with groq")
+    parser.add_argument("--compare", action="store_true", help="Run the quality/latency harness against a fake LLM")
+    parser.add_argument("--charts", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM latency in seconds")
+    args = parser.parse_args()
+
+    if args.compare:
+        for path, row in compare_paths(FakeLLM(args.latency), args.charts, InsightCorpus(args.output)).items():
+            print(f"{path:14s} p50 {row['p50_ms']:8.2f} ms  p95 {row['p95_ms']:8.2f} ms  coverage {row['coverage']:.2f}  "
+                  f"focus {row['focus']:.1f}  words {row['words']:.0f}  vetted {row['vetted']:.2f}")
+    else:
+        generate = template_snippet
+        if args.generator == 'groq':
+            from ai_interpreter import create_ai_interpreter
+            llm = create_ai_interpreter().llm
+            generate = llm_snippet_generator(lambda prompt: llm.invoke(prompt).content)
+        path = build_insight_corpus(args.output, generate, workers=args.workers if args.generator == 'groq' else 1)
+        corpus = InsightCorpus(path)
+        print(f"Stored {len(corpus.offsets) - 1} snippets ({len(corpus.text) / 1e3:.0f} kB) in {path}; "
+              f"{corpus.manifest['replaced_by_template']} replaced by the template after failing vetting")
@@ -0,0 +1,24 @@
+# instrumentation.py
+import functools
+from collections import Counter
+
+# Expensive call name -> number of times it actually ran in this process
+CALL_COUNTS = Counter()
+
+def counted(name):
+    """Decorator counting every real execution of an expensive function (place it under any cache decorator)."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            CALL_COUNTS[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def reset_counts():
+    """Forget all counts."""
+    CALL_COUNTS.clear()
+
+def snapshot():
+    """Copy of the current counts."""
+    return dict(CALL_COUNTS)
@@ -1,8 +1,10 @@
 # kundali_chart.py
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from datetime import timedelta
+import numpy as np
 
-def draw_kundali_chart(planets, ascendant):
+def draw_kundali_chart(planets, ascendant, title="Kundli Chart (North Indian Style)"):
     """Draw a North Indian style Kundli chart using Matplotlib."""
     fig, ax = plt.subplots(figsize=(10, 10))
     ax.set_aspect('equal')
@@ -72,9 +74,41 @@ def draw_kundali_chart(planets, ascendant):
     ax.set_facecolor('#fffef0')  # light cream
     
     # Add title
-    ax.text(0.5, 1.05, "Kundli Chart (North Indian Style)", 
+    ax.text(0.5, 1.05, title, 
             ha='center', va='bottom', fontsize=14, weight='bold')
     
     plt.tight_layout()
     
     return fig
+
+def draw_sensitivity_timeline(sweep):
+    """Draw a compact timeline of a birth-time sweep (one row per factor)."""
+    from rectification import SWEEP_FACTORS
+
+    fig, ax = plt.subplots(figsize=(10, 2.4))
+    start = sweep['start']
+    total = (sweep['end'] - start).total_seconds() / 60 or 1
+    colors = ['#e8d8b0', '#c9dcb3']
+
+    for row, factor in enumerate(reversed(SWEEP_FACTORS)):
+        for index, interval in enumerate(sweep[factor]):
+            left = (interval['start'] - start).total_seconds() / 60
+            width = (interval['end'] - interval['start']).total_seconds() / 60
+            ax.broken_barh([(left, width)], (row - 0.4, 0.8), facecolors=colors[index % 2], edgecolor='gray')
+            # Labels only where they fit; house lists are too long to print
+            if factor != 'houses' and width / total > 0.08:
+                ax.text(left + width / 2, row, interval['label'], ha='center', va='center', fontsize=8)
+
+    birth = (sweep['birth'] - start).total_seconds() / 60
+    ax.axvline(birth, color='darkred', linewidth=1.5)
+    ax.set_yticks(range(len(SWEEP_FACTORS)))
+    ax.set_yticklabels([factor.replace('_', ' ').title() for factor in reversed(SWEEP_FACTORS)], fontsize=9)
+    ticks = np.linspace(0, total, 5)
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([(start + timedelta(minutes=float(tick))).strftime('%H:%M') for tick in ticks], fontsize=8)
+    ax.set_xlim(0, total)
+    for side in ('top', 'right', 'left'):
+        ax.spines[side].set_visible(False)
+
+    plt.tight_layout()
+    return fig
@@ -1,79 +1,365 @@
 # kundli_calculator.py
-from skyfield.api import load, Topos
-from datetime import datetime
-from utils import get_zodiac_sign, format_degree, get_house
+import numpy as np
+from skyfield.api import Topos
+from skyfield.framelib import ecliptic_frame, ecliptic_J2000_frame
+from datetime import datetime, timedelta
+from utils import get_zodiac_sign, format_degree, get_house, sign_indices, house_numbers, naive_utc
 from skyfield.api import utc
+from ayanamsa import get_ayanamsa
+from ephemeris import load_skyfield
+from analytic_ephemeris import compute_positions, compute_motion, julian_day
 
-def calculate_planets(birth_date_str, birth_time_str, latitude, longitude):
+PLANET_NAMES = ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn']
+
+EPHEMERIS_TARGETS = {
+    'Sun': 'sun',
+    'Moon': 'moon',
+    'Mercury': 'mercury',
+    'Venus': 'venus',
+    'Mars': 'mars',
+    'Jupiter': 'jupiter barycenter',
+    'Saturn': 'saturn barycenter',
+}
+
+ZODIAC_MODES = ('tropical', 'sidereal')
+
+# 'ephemeris' evaluates the JPL kernel; 'analytic' uses the low-precision
+# series of analytic_ephemeris (no file I/O, see its ERROR_BOUNDS)
+POSITION_ENGINES = ('ephemeris', 'analytic')
+
+# Combustion orbs (degrees from the Sun), with the tighter orbs used while retrograde
+COMBUSTION_ORBS = {'Moon': 12.0, 'Mercury': 14.0, 'Venus': 10.0, 'Mars': 17.0, 'Jupiter': 11.0, 'Saturn': 15.0}
+RETROGRADE_COMBUSTION_ORBS = {'Mercury': 12.0, 'Venus': 8.0}
+
+# Bodies moving slower than this (degrees/day) are treated as stationary
+STATIONARY_SPEEDS = {'Mercury': 0.1, 'Venus': 0.05, 'Mars': 0.03, 'Jupiter': 0.01, 'Saturn': 0.005}
+
+def motion_flags(degrees, speeds, planet_names=PLANET_NAMES):
+    """
+    Vectorized retrograde, stationary and combustion flags.
+
+    Args:
+        degrees: (n, bodies) longitudes in any single frame
+        speeds: (n, bodies) longitude rates in degrees/day
+        planet_names: Body order of the columns
+
+    Returns:
+        dict: 'retrograde', 'stationary' and 'combust' boolean arrays shaped like degrees
+    """
+    degrees, speeds = np.asarray(degrees), np.asarray(speeds)
+    stationary_speeds = np.array([STATIONARY_SPEEDS.get(name, 0.0) for name in planet_names])
+    retrograde = speeds < 0
+    stationary = np.abs(speeds) < stationary_speeds
+
+    sun = degrees[..., planet_names.index('Sun')][..., None]
+    separation = np.abs((degrees - sun + 180) % 360 - 180)
+    direct_orbs = np.array([COMBUSTION_ORBS.get(name, -1.0) for name in planet_names])
+    retrograde_orbs = np.array([RETROGRADE_COMBUSTION_ORBS.get(name, COMBUSTION_ORBS.get(name, -1.0))
+                                for name in planet_names])
+    combust = separation <= np.where(retrograde, retrograde_orbs, direct_orbs)
+    return {'retrograde': retrograde, 'stationary': stationary, 'combust': combust}
+
+def _compute_tropical_positions(t, latitudes, longitudes, motion=False):
+    """
+    Evaluate all bodies and the ascendant in a single ephemeris pass.
+
+    Longitudes are in the true ecliptic and equinox of date, the frame the
+    ayanamsa is measured in, so sidereal positions are a plain subtraction.
+
+    Args:
+        t: Skyfield Time (scalar or array)
+        latitudes: Observer latitude(s) in degrees
+        longitudes: Observer longitude(s) in degrees
+        motion: Also return geocentric longitudes and rates, derived from the
+                same observe() calls
+
+    Returns:
+        tuple: (planet_degrees, ascendant_degrees) where planet_degrees has
+               one row per body in PLANET_NAMES order; with motion also
+               (geocentric_degrees, planet_speeds) in the same layout, speeds
+               in degrees/day
+    """
+    ts, eph = load_skyfield()
+    earth = eph['earth']
+    location = Topos(latitude_degrees=latitudes, longitude_degrees=longitudes)
+    observer = earth + location
+
+    # Calculate ascendant (simplified calculation based on local sidereal time)
+    # This is a rough calculation - actual ascendant calculation is more complex
+    lst_hours = t.gast  # Greenwich Apparent Sidereal Time
+    ascendant_degrees = (lst_hours * 15 + np.asarray(longitudes)) % 360
+
+    observer_at_t = observer.at(t)
+    positions = [observer_at_t.observe(eph[EPHEMERIS_TARGETS[name]]) for name in PLANET_NAMES]
+    planet_degrees = np.array([position.frame_latlon(ecliptic_frame)[1].degrees % 360 for position in positions])
+    if not motion:
+        return planet_degrees, ascendant_degrees
+
+    # Topocentric rates carry the observer's daily rotation (the Moon would swing
+    # between about 7 and 17 degrees/day), so add back the site's offset from
+    # the geocentre and its velocity. Rates are taken in the inertial J2000
+    # ecliptic; the precession of the equinox adds only 0.00004 degrees/day.
+    site = location.at(t)
+    rotation = ecliptic_J2000_frame.rotation_at(t)
+    geocentric_degrees, planet_speeds = [], []
+    for position in positions:
+        x, y, _ = np.einsum('ij,j...->i...', rotation, position.position.au + site.position.au)
+        vx, vy, _ = np.einsum('ij,j...->i...', rotation, position.velocity.au_per_d + site.velocity.au_per_d)
+        geocentric_degrees.append(np.degrees(np.arctan2(y, x)) % 360)
+        planet_speeds.append(np.degrees((x * vy - y * vx) / (x * x + y * y)))
+    return planet_degrees, ascendant_degrees, np.array(geocentric_degrees), np.array(planet_speeds)
+
+def _evaluate(when, latitudes, longitudes, engine='ephemeris', motion=False):
+    """
+    Positions from either engine, optionally with the geocentric motion.
+
+    Args:
+        when: Skyfield Time for 'ephemeris', Julian date(s) in UT for 'analytic'
+        latitudes: Observer latitude(s) in degrees
+        longitudes: Observer longitude(s) in degrees
+        engine: Position engine from POSITION_ENGINES
+        motion: Also return geocentric longitudes and speeds (same evaluation)
+
+    Returns:
+        tuple: (planet_degrees, ascendant_degrees, geocentric_degrees, planet_speeds);
+               the last two are None unless motion is requested
+    """
+    if engine == 'analytic':
+        if motion:
+            return compute_motion(when, latitudes, longitudes, PLANET_NAMES)
+        planet_degrees, ascendant_degrees, _ = compute_positions(when, latitudes, longitudes, PLANET_NAMES)
+        return planet_degrees, ascendant_degrees, None, None
+
+    if motion:
+        return _compute_tropical_positions(when, latitudes, longitudes, motion=True)
+    return _compute_tropical_positions(when, latitudes, longitudes) + (None, None)
+
+def calculate_positions_jd(jd_ut, latitude, longitude, zodiac='sidereal', ayanamsa='lahiri', engine='ephemeris'):
+    """
+    Evaluate all bodies and the ascendant at an array of instants for one place.
+
+    Args:
+        jd_ut: Julian date(s) in UT
+        latitude: Geographic latitude
+        longitude: Geographic longitude
+        zodiac: 'tropical' or 'sidereal'
+        ayanamsa: Ayanamsa system used for sidereal positions
+        engine: Position engine from POSITION_ENGINES
+
+    Returns:
+        tuple: (degrees (n, len(PLANET_NAMES)), ascendant_degrees (n,))
+    """
+    if zodiac not in ZODIAC_MODES:
+        raise ValueError(f"Unknown zodiac '{zodiac}'. Choose from: {', '.join(ZODIAC_MODES)}")
+    if engine not in POSITION_ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(POSITION_ENGINES)}")
+    jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+    when = jd_ut if engine == 'analytic' else load_skyfield()[0].ut1_jd(jd_ut)
+    planet_degrees, ascendant, _, _ = _evaluate(when, latitude, longitude, engine)
+    degrees = planet_degrees.T
+    if zodiac == 'sidereal':
+        ayanamsa_degrees = get_ayanamsa(jd_ut, ayanamsa, use_table=engine != 'analytic')
+        degrees = (degrees - ayanamsa_degrees[:, None]) % 360
+        ascendant = (ascendant - ayanamsa_degrees) % 360
+    return degrees, np.broadcast_to(ascendant, jd_ut.shape)
+
+def calculate_planets(birth_date_str, birth_time_str, latitude, longitude, zodiac='tropical', ayanamsa='lahiri',
+                      utc_offset_hours=0.0, engine='ephemeris', raw_ascendant=False):
     """
     Calculate planetary positions for given birth details.
-    
+
     Args:
         birth_date_str: Birth date as string (YYYY/MM/DD)
         birth_time_str: Birth time as string (HH:MM)
         latitude: Geographic latitude
         longitude: Geographic longitude
-    
+        zodiac: 'tropical' or 'sidereal' - selects which frame fills the
+                'degree', 'house' and 'raw_degree' fields
+        ayanamsa: Ayanamsa system used for sidereal positions ('lahiri', 'raman', 'kp')
+        utc_offset_hours: Offset of the birth time from UTC (see timezones.utc_offset_hours)
+        engine: 'ephemeris' (JPL kernel) or 'analytic' (fast previews with no
+                kernel load; see analytic_ephemeris.ERROR_BOUNDS)
+        raw_ascendant: Also return the unrounded ascendant longitude
+
     Returns:
         tuple: (planets_dict, ascendant_sign) where planets_dict contains
-               planet positions with degree and house information
+               planet positions with degree and house information. Both
+               tropical and sidereal values are always included, as are the
+               speed (degrees/day) and retrograde/stationary/combust flags.
+               With raw_ascendant a third item holds the ascendant in
+               degrees: {'degree': selected zodiac, 'tropical': ..., 'sidereal': ...}
+               (None on error). The ascendant_sign label is rounded to the
+               arc-minute, too coarse for the finer vargas.
     """
     try:
-        # Load ephemeris data
-        ts = load.timescale()
-        eph = load('de421.bsp')
-        
+        if zodiac not in ZODIAC_MODES:
+            raise ValueError(f"Unknown zodiac '{zodiac}'. Choose from: {', '.join(ZODIAC_MODES)}")
+        if engine not in POSITION_ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(POSITION_ENGINES)}")
+
         # Parse birth datetime
         birth_dt = datetime.strptime(f"{birth_date_str} {birth_time_str}", '%Y/%m/%d %H:%M')
+        birth_dt = birth_dt - timedelta(hours=utc_offset_hours)  # local civil time to UTC
         birth_dt = birth_dt.replace(tzinfo=utc)  # make it timezone aware
-        
-        # Create time object
-        t = ts.utc(birth_dt.year, birth_dt.month, birth_dt.day, 
-                   birth_dt.hour, birth_dt.minute)
-        
-        # Set observer location
-        location = Topos(latitude_degrees=latitude, longitude_degrees=longitude)
-        
-        # Get Earth
-        earth = eph['earth']
-        
-        # Calculate planetary positions
-        planets_to_calc = {
-            'Sun': eph['sun'],
-            'Moon': eph['moon'],
-            'Mercury': eph['mercury'],
-            'Venus': eph['venus'],
-            'Mars': eph['mars'],
-            'Jupiter': eph['jupiter barycenter'],
-            'Saturn': eph['saturn barycenter'],
-        }
-        
+
+        if engine == 'analytic':
+            jd_ut = when = julian_day(birth_dt.year, birth_dt.month, birth_dt.day, birth_dt.hour, birth_dt.minute)
+        else:
+            ts, eph = load_skyfield()
+
+            # Create time object
+            when = ts.utc(birth_dt.year, birth_dt.month, birth_dt.day,
+                          birth_dt.hour, birth_dt.minute)
+            jd_ut = when.ut1
+
+        planet_degrees, ascendant_tropical, geocentric_degrees, planet_speeds = _evaluate(
+            when, latitude, longitude, engine, motion=True)
+        ascendant_tropical = float(ascendant_tropical)
+        flags = motion_flags(geocentric_degrees[None, :], planet_speeds[None, :])
+
+        # Sidereal positions are a constant shift of the same evaluation
+        ayanamsa_degree = get_ayanamsa(jd_ut, ayanamsa, use_table=engine != 'analytic')
+        ascendant_sidereal = (ascendant_tropical - ayanamsa_degree) % 360
+
         planets = {}
-        
-        # Calculate ascendant (simplified calculation based on local sidereal time)
-        # This is a rough calculation - actual ascendant calculation is more complex
-        observer = earth + location
-        lst_hours = t.gast  # Greenwich Apparent Sidereal Time
-        # Adjust for longitude
-        lst_deg = (lst_hours * 15 + longitude) % 360
-        ascendant_degree = lst_deg % 360
-        ascendant_sign = get_zodiac_sign(ascendant_degree)
-        
-        # Calculate planet positions
-        for planet_name, planet_obj in planets_to_calc.items():
-            # Get ecliptic longitude
-            astrometric = observer.at(t).observe(planet_obj)
-            lat, lon, distance = astrometric.ecliptic_latlon()
-            degree = lon.degrees % 360
-            
+        for index, (planet_name, tropical) in enumerate(zip(PLANET_NAMES, planet_degrees)):
+            tropical = float(tropical)
+            sidereal = (tropical - ayanamsa_degree) % 360
+            degree = sidereal if zodiac == 'sidereal' else tropical
+            ascendant_degree = ascendant_sidereal if zodiac == 'sidereal' else ascendant_tropical
+
             planets[planet_name] = {
                 'degree': format_degree(degree),
                 'house': get_house(degree, ascendant_degree),
-                'raw_degree': degree
+                'raw_degree': degree,
+                'tropical_degree': tropical,
+                'tropical_sign': get_zodiac_sign(tropical),
+                'tropical_house': get_house(tropical, ascendant_tropical),
+                'sidereal_degree': sidereal,
+                'sidereal_sign': get_zodiac_sign(sidereal),
+                'sidereal_house': get_house(sidereal, ascendant_sidereal),
+                'speed': float(planet_speeds[index]),
+                'retrograde': bool(flags['retrograde'][0, index]),
+                'stationary': bool(flags['stationary'][0, index]),
+                'combust': bool(flags['combust'][0, index]),
             }
-        
-        return planets, f"{format_degree(ascendant_degree)} ({ascendant_sign})"
-    
+
+        ascendant_degree = ascendant_sidereal if zodiac == 'sidereal' else ascendant_tropical
+        ascendant_sign = get_zodiac_sign(ascendant_degree)
+        ascendant_label = f"{format_degree(ascendant_degree)} ({ascendant_sign})"
+        if raw_ascendant:
+            return planets, ascendant_label, {'degree': ascendant_degree, 'tropical': ascendant_tropical,
+                                              'sidereal': ascendant_sidereal}
+        return planets, ascendant_label
+
     except Exception as e:
         # Return error message
-        return str(e), "Error"
+        return (str(e), "Error", None) if raw_ascendant else (str(e), "Error")
+
+def utc_components(birth_datetimes):
+    """Split datetimes into a (n, 5) float array of UTC year, month, day, hour, minute (naive values are UTC)."""
+    return np.array([[dt.year, dt.month, dt.day, dt.hour, dt.minute + dt.second / 60.0]
+                     for dt in map(naive_utc, birth_datetimes)], dtype=float).reshape(-1, 5)
+
+def compute_batch_arrays(components, latitudes, longitudes, ayanamsa='lahiri', engine='ephemeris', motion=False):
+    """
+    Run the single vectorized ephemeris pass for a batch.
+
+    Args:
+        components: (n, 5) array from utc_components
+        latitudes: Array of geographic latitudes
+        longitudes: Array of geographic longitudes
+        ayanamsa: Ayanamsa system used for sidereal positions
+        engine: Position engine from POSITION_ENGINES
+        motion: Also derive speeds and geocentric longitudes from the same pass
+
+    Returns:
+        tuple: (jd, tropical_degrees (n, bodies), tropical_ascendant, ayanamsa_degrees,
+                speeds (n, bodies) in degrees/day, geocentric_degrees (n, bodies));
+               the last two are None unless motion is requested
+    """
+    components = np.asarray(components, dtype=float)
+    if engine == 'analytic':
+        jd = when = julian_day(*components.T)
+    else:
+        ts, eph = load_skyfield()
+        when = ts.utc(components[:, 0].astype(int), components[:, 1].astype(int), components[:, 2].astype(int),
+                      components[:, 3], components[:, 4])
+        jd = when.ut1
+
+    planet_degrees, ascendant_tropical, geocentric_degrees, planet_speeds = _evaluate(
+        when, np.asarray(latitudes, dtype=float), np.asarray(longitudes, dtype=float), engine, motion)
+    ayanamsa_degrees = get_ayanamsa(jd, ayanamsa, use_table=engine != 'analytic')
+    if not motion:
+        return jd, planet_degrees.T, ascendant_tropical, ayanamsa_degrees, None, None
+    return jd, planet_degrees.T, ascendant_tropical, ayanamsa_degrees, planet_speeds.T, geocentric_degrees.T
+
+def assemble_batch(jd, tropical, ascendant_tropical, ayanamsa_degrees, zodiac='tropical', speeds=None,
+                   geocentric=None):
+    """
+    Derive signs, houses and sidereal values from the raw batch arrays.
+
+    The motion flags come from speeds and the geocentric longitudes; they
+    fall back to the tropical longitudes when geocentric is not given.
+
+    Returns:
+        dict: The calculate_planets_batch result layout
+    """
+    if zodiac not in ZODIAC_MODES:
+        raise ValueError(f"Unknown zodiac '{zodiac}'. Choose from: {', '.join(ZODIAC_MODES)}")
+
+    sidereal = (tropical - ayanamsa_degrees[:, None]) % 360
+    ascendant_sidereal = (ascendant_tropical - ayanamsa_degrees) % 360
+
+    result = {
+        'planet_names': PLANET_NAMES,
+        'jd': jd,
+        'ayanamsa': ayanamsa_degrees,
+        'tropical_degree': tropical,
+        'tropical_signs': sign_indices(tropical),
+        'tropical_houses': house_numbers(tropical, ascendant_tropical[:, None]),
+        'tropical_ascendant': ascendant_tropical,
+        'sidereal_degree': sidereal,
+        'sidereal_signs': sign_indices(sidereal),
+        'sidereal_houses': house_numbers(sidereal, ascendant_sidereal[:, None]),
+        'sidereal_ascendant': ascendant_sidereal,
+    }
+    if speeds is not None:
+        result['speed'] = speeds
+        result.update(motion_flags(tropical if geocentric is None else geocentric, speeds))
+    result['raw_degree'] = result[f'{zodiac}_degree']
+    result['signs'] = result[f'{zodiac}_signs']
+    result['houses'] = result[f'{zodiac}_houses']
+    result['ascendant'] = result[f'{zodiac}_ascendant']
+    return result
+
+def calculate_planets_batch(birth_datetimes, latitudes, longitudes, zodiac='tropical', ayanamsa='lahiri',
+                            engine='ephemeris', motion=False):
+    """
+    Calculate planetary positions for many births with one vectorized ephemeris pass.
+
+    Args:
+        birth_datetimes: Sequence of birth datetimes (naive values are treated as UTC;
+                         timezones.to_utc_batch converts local birth times)
+        latitudes: Sequence of geographic latitudes
+        longitudes: Sequence of geographic longitudes
+        zodiac: 'tropical' or 'sidereal' - selects which frame fills 'raw_degree',
+                'signs', 'houses' and 'ascendant'
+        ayanamsa: Ayanamsa system used for sidereal positions
+        engine: 'ephemeris' or 'analytic' (cheaper screening at reduced precision)
+        motion: Also include 'speed' and the motion flags
+
+    Returns:
+        dict: NumPy arrays keyed by field. Per-body arrays have shape
+              (n_charts, len(PLANET_NAMES)); signs are indices into ZODIAC_SIGNS.
+              With motion, 'speed' is in degrees/day and 'retrograde',
+              'stationary' and 'combust' are boolean
+    """
+    if zodiac not in ZODIAC_MODES:
+        raise ValueError(f"Unknown zodiac '{zodiac}'. Choose from: {', '.join(ZODIAC_MODES)}")
+    if engine not in POSITION_ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(POSITION_ENGINES)}")
+
+    jd, tropical, ascendant_tropical, ayanamsa_degrees, speeds, geocentric = compute_batch_arrays(
+        utc_components(birth_datetimes), latitudes, longitudes, ayanamsa, engine, motion)
+    return assemble_batch(jd, tropical, ascendant_tropical, ayanamsa_degrees, zodiac, speeds, geocentric)
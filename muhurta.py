@@ -0,0 +1,158 @@
+# muhurta.py
+import numpy as np
+from kundli_calculator import PLANET_NAMES, calculate_positions_jd
+from utils import (ZODIAC_SIGNS, NAKSHATRAS, WEEKDAYS, sign_indices, nakshatra_indices, house_numbers,
+                   julian_date, jd_to_datetime, refine_transitions)
+
+MALEFICS = ['Sun', 'Mars', 'Saturn']
+
+# Supported constraint keys and what they accept
+CONSTRAINT_KEYS = {
+    'moon_sign': 'sign name or list of sign names',
+    'moon_nakshatra': 'nakshatra name or list of nakshatra names',
+    'ascendant_sign': 'sign name or list of sign names',
+    'weekday': 'weekday name or list of weekday names (local civil day)',
+    'no_malefic_in_house': 'house number or list of houses that must be free of Sun, Mars and Saturn',
+}
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+def _lookup(names, values, kind):
+    """Translate names to indices, raising a helpful error for typos."""
+    lowered = [name.lower() for name in names]
+    indices = []
+    for value in _as_list(values):
+        if str(value).lower() not in lowered:
+            raise ValueError(f"Unknown {kind} '{value}'")
+        indices.append(lowered.index(str(value).lower()))
+    return indices
+
+def validate_constraints(constraints):
+    """
+    Check a constraint dictionary and translate names to index arrays.
+
+    Args:
+        constraints: Dictionary using the keys in CONSTRAINT_KEYS
+
+    Returns:
+        dict: Constraint key -> NumPy array of allowed (or forbidden) indices
+    """
+    unknown = set(constraints) - set(CONSTRAINT_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown constraint(s): {', '.join(sorted(unknown))}. "
+                         f"Supported: {', '.join(CONSTRAINT_KEYS)}")
+    compiled = {}
+    if 'moon_sign' in constraints:
+        compiled['moon_sign'] = np.array(_lookup(ZODIAC_SIGNS, constraints['moon_sign'], 'sign'))
+    if 'moon_nakshatra' in constraints:
+        compiled['moon_nakshatra'] = np.array(_lookup(NAKSHATRAS, constraints['moon_nakshatra'], 'nakshatra'))
+    if 'ascendant_sign' in constraints:
+        compiled['ascendant_sign'] = np.array(_lookup(ZODIAC_SIGNS, constraints['ascendant_sign'], 'sign'))
+    if 'weekday' in constraints:
+        compiled['weekday'] = np.array(_lookup(WEEKDAYS, constraints['weekday'], 'weekday'))
+    if 'no_malefic_in_house' in constraints:
+        houses = [int(house) for house in _as_list(constraints['no_malefic_in_house'])]
+        if any(house < 1 or house > 12 for house in houses):
+            raise ValueError("Houses must be between 1 and 12")
+        compiled['no_malefic_in_house'] = np.array(houses)
+    return compiled
+
+def evaluate_constraints(jd_ut, latitude, longitude, compiled, utc_offset_hours=0.0, zodiac='sidereal', ayanamsa='lahiri'):
+    """
+    Evaluate compiled constraints at many instants with one ephemeris call.
+
+    Returns:
+        numpy.ndarray: Boolean mask aligned with jd_ut
+    """
+    jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+    mask = np.ones(jd_ut.shape, dtype=bool)
+
+    if 'weekday' in compiled:
+        # JD 0.5 boundaries are midnights; (day number + 1) % 7 gives 0=Sunday
+        local_day = np.floor(jd_ut + 0.5 + utc_offset_hours / 24.0).astype(np.int64)
+        mask &= np.isin((local_day + 1) % 7, compiled['weekday'])
+
+    needs_positions = set(compiled) - {'weekday'}
+    if not needs_positions or not mask.any():
+        return mask
+
+    degrees, ascendant = calculate_positions_jd(jd_ut, latitude, longitude, zodiac, ayanamsa)
+    moon = degrees[:, PLANET_NAMES.index('Moon')]
+    if 'moon_sign' in compiled:
+        mask &= np.isin(sign_indices(moon), compiled['moon_sign'])
+    if 'moon_nakshatra' in compiled:
+        mask &= np.isin(nakshatra_indices(moon), compiled['moon_nakshatra'])
+    if 'ascendant_sign' in compiled:
+        mask &= np.isin(sign_indices(ascendant), compiled['ascendant_sign'])
+    if 'no_malefic_in_house' in compiled:
+        malefic_columns = [PLANET_NAMES.index(name) for name in MALEFICS]
+        houses = house_numbers(degrees[:, malefic_columns], ascendant[:, None])
+        mask &= ~np.isin(houses, compiled['no_malefic_in_house']).any(axis=1)
+    return mask
+
+def find_muhurta_windows(start, end, latitude, longitude, constraints, step_minutes=20, precision_seconds=30,
+                         utc_offset_hours=0.0, zodiac='sidereal', ayanamsa='lahiri'):
+    """
+    Find the time windows in [start, end) that satisfy every constraint.
+
+    The constraints are evaluated on a coarse grid in one vectorized call;
+    every change of state between neighbouring grid points is then refined
+    by vectorized bisection. Windows shorter than step_minutes that fall
+    completely between two grid points can be missed, so keep the step
+    below the shortest window of interest (the ascendant stays in a sign
+    for roughly two hours).
+
+    Args:
+        start: Search start (naive datetimes are UTC)
+        end: Search end
+        latitude: Geographic latitude
+        longitude: Geographic longitude
+        constraints: Dictionary using the keys in CONSTRAINT_KEYS, e.g.
+                     {'moon_sign': ['Taurus', 'Cancer'], 'no_malefic_in_house': 8,
+                      'ascendant_sign': 'Leo', 'weekday': ['Monday', 'Thursday']}
+        step_minutes: Coarse grid spacing
+        precision_seconds: Boundary precision after refinement
+        utc_offset_hours: Local offset used for weekdays and returned times
+        zodiac: 'tropical' or 'sidereal'
+        ayanamsa: Ayanamsa system used for sidereal positions
+
+    Returns:
+        list: (window_start, window_end) local datetimes
+    """
+    compiled = validate_constraints(constraints)
+    start_jd, end_jd = julian_date(start), julian_date(end)
+    if end_jd <= start_jd:
+        return []
+
+    def evaluate(jd):
+        return evaluate_constraints(jd, latitude, longitude, compiled, utc_offset_hours, zodiac, ayanamsa)
+
+    step_days = step_minutes / 1440.0
+    grid = np.append(np.arange(start_jd, end_jd, step_days), end_jd)
+    mask = evaluate(grid)
+
+    # State changes between neighbouring grid points
+    changes = np.flatnonzero(mask[1:] != mask[:-1])
+    boundaries = refine_transitions(grid[changes], grid[changes + 1], mask[changes], evaluate,
+                                    precision_seconds / 86400.0)
+
+    # Pair rising and falling edges into windows
+    edges = list(zip(boundaries, mask[changes + 1]))
+    windows = []
+    window_start = start_jd if mask[0] else None
+    for jd, becomes_true in edges:
+        if becomes_true:
+            window_start = jd
+        elif window_start is not None:
+            windows.append((window_start, jd))
+            window_start = None
+    if window_start is not None:
+        windows.append((window_start, end_jd))
+
+    return [(jd_to_datetime(a, utc_offset_hours), jd_to_datetime(b, utc_offset_hours)) for a, b in windows]
+
+def format_windows(windows):
+    """Return a readable list of windows, one per line."""
+    return "\n".join(f"{a.strftime('%a %d %b %Y %H:%M')} - {b.strftime('%H:%M' if a.date() == b.date() else '%a %d %b %Y %H:%M')}"
+                     for a, b in windows)
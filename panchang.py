@@ -0,0 +1,230 @@
+# panchang.py
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import numpy as np
+from skyfield.api import wgs84
+from skyfield.framelib import ecliptic_frame
+from ephemeris import load_skyfield
+from ayanamsa import get_ayanamsa
+from utils import NAKSHATRAS, WEEKDAYS, julian_date, jd_to_datetime, refine_transitions
+
+_TITHI_NAMES = ["Pratipada", "Dwitiya", "Tritiya", "Chaturthi", "Panchami", "Shashthi", "Saptami",
+                "Ashtami", "Navami", "Dashami", "Ekadashi", "Dwadashi", "Trayodashi", "Chaturdashi"]
+TITHIS = ([f"Shukla {name}" for name in _TITHI_NAMES] + ["Purnima"]
+          + [f"Krishna {name}" for name in _TITHI_NAMES] + ["Amavasya"])
+
+YOGAS = ["Vishkambha", "Priti", "Ayushman", "Saubhagya", "Shobhana", "Atiganda", "Sukarma", "Dhriti",
+         "Shula", "Ganda", "Vriddhi", "Dhruva", "Vyaghata", "Harshana", "Vajra", "Siddhi", "Vyatipata",
+         "Variyan", "Parigha", "Shiva", "Siddha", "Sadhya", "Shubha", "Shukla", "Brahma", "Indra", "Vaidhriti"]
+
+# Sixty half-tithis: Kimstughna, eight rounds of the seven movable karanas, then three fixed ones
+_MOVABLE_KARANAS = ["Bava", "Balava", "Kaulava", "Taitila", "Garaja", "Vanija", "Vishti"]
+KARANAS = ["Kimstughna"] + _MOVABLE_KARANAS * 8 + ["Shakuni", "Chatushpada", "Naga"]
+
+ELEMENTS = ('tithi', 'nakshatra', 'yoga', 'karana')
+ELEMENT_NAMES = {'tithi': TITHIS, 'nakshatra': NAKSHATRAS, 'yoga': YOGAS, 'karana': KARANAS}
+
+# Search settings: every element lasts well over the element grid step
+ELEMENT_STEP_DAYS = 1.0 / 24
+SUN_STEP_DAYS = 10.0 / 1440
+PRECISION_DAYS = 20.0 / 86400
+SUNRISE_ALTITUDE = -0.8333   # upper limb on the horizon with standard refraction
+
+# Locations are snapped to this grid so nearby users share cached years
+GRID_CELL_DEGREES = 0.1
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'panchang')
+# Bumped whenever the computed records change, so stale cache files are ignored
+CACHE_VERSION = 2
+
+CSV_FIELDS = ['date', 'weekday', 'sunrise', 'sunset'] + [
+    field for element in ELEMENTS for field in (element, f'{element}_ends')]
+
+def _sun_moon(jd_ut):
+    """Geocentric longitudes of the Sun and Moon (ecliptic of date) for an array of instants."""
+    ts, eph = load_skyfield()
+    earth_at_t = eph['earth'].at(ts.ut1_jd(jd_ut))
+    sun = earth_at_t.observe(eph['sun']).frame_latlon(ecliptic_frame)[1].degrees % 360
+    moon = earth_at_t.observe(eph['moon']).frame_latlon(ecliptic_frame)[1].degrees % 360
+    return sun, moon
+
+def element_states(jd_ut, ayanamsa='lahiri'):
+    """
+    Tithi, nakshatra, yoga and karana indices at many instants in one ephemeris pass.
+
+    Returns:
+        numpy.ndarray: int array of shape (n, 4) in ELEMENTS order
+    """
+    jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+    sun, moon = _sun_moon(jd_ut)
+    ayanamsa_degrees = get_ayanamsa(jd_ut, ayanamsa)
+    elongation = (moon - sun) % 360
+    span = 360.0 / 27
+    return np.column_stack([
+        elongation // 12,
+        ((moon - ayanamsa_degrees) % 360) // span,
+        ((sun + moon - 2 * ayanamsa_degrees) % 360) // span,
+        elongation // 6,
+    ]).astype(np.int16)
+
+def _sun_above_horizon(jd_ut, latitude, longitude):
+    """Whether the Sun's upper limb is above the horizon at each instant."""
+    ts, eph = load_skyfield()
+    observer = eph['earth'] + wgs84.latlon(latitude, longitude)
+    altitude = observer.at(ts.ut1_jd(jd_ut)).observe(eph['sun']).apparent().altaz()[0].degrees
+    return altitude > SUNRISE_ALTITUDE
+
+def find_sunrises_sunsets(start_jd, end_jd, latitude, longitude):
+    """
+    Vectorized rise/set search: sample the Sun's altitude on a grid, then bisect every crossing together.
+
+    Returns:
+        tuple: (sunrise_jds, sunset_jds) arrays
+    """
+    grid = np.append(np.arange(start_jd, end_jd, SUN_STEP_DAYS), end_jd)
+    above = _sun_above_horizon(grid, latitude, longitude)
+    changes = np.flatnonzero(above[1:] != above[:-1])
+    crossings = refine_transitions(grid[changes], grid[changes + 1], above[changes],
+                                   lambda jd: _sun_above_horizon(jd, latitude, longitude), PRECISION_DAYS)
+    rising = above[changes + 1]
+    return crossings[rising], crossings[~rising]
+
+def find_element_transitions(start_jd, end_jd, ayanamsa='lahiri'):
+    """
+    Locate every tithi, nakshatra, yoga and karana change in a range.
+
+    All elements share one hourly grid evaluation; every bracket of every
+    element is then refined together, one ephemeris call per bisection round.
+
+    Returns:
+        dict: Element name -> (transition_jds, index_after_transition) arrays
+    """
+    grid = np.append(np.arange(start_jd, end_jd, ELEMENT_STEP_DAYS), end_jd)
+    states = element_states(grid, ayanamsa)
+    rows, columns = np.nonzero(states[1:] != states[:-1])
+    order = np.lexsort((rows, columns))
+    rows, columns = rows[order], columns[order]
+
+    def evaluate(jd):
+        return element_states(jd, ayanamsa)[np.arange(len(jd)), columns]
+
+    instants = refine_transitions(grid[rows], grid[rows + 1], states[rows, columns], evaluate, PRECISION_DAYS)
+    following = states[rows + 1, columns]
+    return {element: (instants[columns == index], following[columns == index])
+            for index, element in enumerate(ELEMENTS)}
+
+def _format_time(jd, utc_offset_hours):
+    return jd_to_datetime(jd, utc_offset_hours).strftime('%Y-%m-%d %H:%M')
+
+def compute_panchang_year(year, latitude, longitude, utc_offset_hours=0.0, ayanamsa='lahiri'):
+    """
+    Compute a full year of daily Panchang entries in one vectorized run.
+
+    Elements are reported as prevailing at local sunrise (at local midnight
+    when the Sun does not rise), with the local end times of every element
+    that changes during the civil day.
+
+    Returns:
+        list: One dictionary per day with the CSV_FIELDS keys
+    """
+    first_day = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - first_day).days
+    # Local midnights expressed in UT Julian dates
+    midnights = julian_date(datetime(year, 1, 1)) - utc_offset_hours / 24.0 + np.arange(days + 1)
+    start_jd, end_jd = midnights[0] - 1, midnights[-1] + 1
+
+    sunrises, sunsets = find_sunrises_sunsets(start_jd, end_jd, latitude, longitude)
+    transitions = find_element_transitions(start_jd, end_jd, ayanamsa)
+
+    day_sunrise = np.full(days, np.nan)
+    day_sunset = np.full(days, np.nan)
+    for values, target in ((sunrises, day_sunrise), (sunsets, day_sunset)):
+        position = np.searchsorted(values, midnights[:-1])
+        valid = (position < len(values))
+        valid[valid] &= values[position[valid]] < midnights[1:][valid]
+        target[valid] = values[position[valid]]
+
+    reference = np.where(np.isnan(day_sunrise), midnights[:-1], day_sunrise)
+    at_reference = element_states(reference, ayanamsa)
+
+    records = []
+    for day in range(days):
+        current = first_day + timedelta(days=day)
+        record = {
+            'date': current.isoformat(),
+            'weekday': WEEKDAYS[(current.weekday() + 1) % 7],
+            'sunrise': '' if np.isnan(day_sunrise[day]) else _format_time(day_sunrise[day], utc_offset_hours),
+            'sunset': '' if np.isnan(day_sunset[day]) else _format_time(day_sunset[day], utc_offset_hours),
+        }
+        for index, element in enumerate(ELEMENTS):
+            instants, _ = transitions[element]
+            lo, hi = np.searchsorted(instants, [midnights[day], midnights[day + 1]])
+            record[element] = ELEMENT_NAMES[element][at_reference[day, index]]
+            record[f'{element}_ends'] = ';'.join(_format_time(jd, utc_offset_hours)[11:] for jd in instants[lo:hi])
+        records.append(record)
+    return records
+
+def _cell(value):
+    """Snap a coordinate to the centre of its cache grid cell."""
+    return round((np.floor(value / GRID_CELL_DEGREES) + 0.5) * GRID_CELL_DEGREES, 4)
+
+@lru_cache(maxsize=16)
+def _cached_year(year, lat_cell, lon_cell, utc_offset_hours, ayanamsa, cache_dir):
+    path = os.path.join(cache_dir, f"v{CACHE_VERSION}_{year}_{lat_cell:+.2f}_{lon_cell:+.2f}_{utc_offset_hours:+.2f}_{ayanamsa}.json") if cache_dir else None
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return tuple(json.load(f))
+
+    records = compute_panchang_year(year, lat_cell, lon_cell, utc_offset_hours, ayanamsa)
+    if path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(records, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # caching is best effort
+    return tuple(records)
+
+def get_panchang_year(year, latitude, longitude, utc_offset_hours=0.0, ayanamsa='lahiri', cache_dir=CACHE_DIR):
+    """
+    Cached yearly Panchang for a location.
+
+    Results are keyed by (year, location grid cell, UTC offset, ayanamsa) in
+    memory and on disk, so every user within a 0.1 degree cell shares them.
+
+    Returns:
+        tuple: Daily record dictionaries (see compute_panchang_year)
+    """
+    return _cached_year(int(year), _cell(latitude), _cell(longitude), float(utc_offset_hours), ayanamsa, cache_dir)
+
+def iter_panchang_csv(records):
+    """Stream records as CSV text, one line at a time."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    for record in records:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(record)
+        yield buffer.getvalue()
+
+def iter_panchang_json(records):
+    """Stream records as a JSON array, one element at a time."""
+    yield '['
+    for index, record in enumerate(records):
+        yield (',\n' if index else '\n') + json.dumps(record)
+    yield '\n]\n'
+
+def export_panchang(records, path, fmt='csv'):
+    """Write records to a CSV or JSON file without building the whole document in memory."""
+    chunks = iter_panchang_csv(records) if fmt == 'csv' else iter_panchang_json(records)
+    with open(path, 'w', newline='') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return path
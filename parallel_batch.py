@@ -0,0 +1,186 @@
+# parallel_batch.py
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory, get_context, get_all_start_methods
+import numpy as np
+from kundli_calculator import PLANET_NAMES, compute_batch_arrays, assemble_batch, utc_components
+from ephemeris import load_skyfield
+
+# Adaptive chunking: aim for tasks of about this many seconds
+TARGET_TASK_SECONDS = 0.25
+MIN_CHUNK = 256
+MAX_CHUNK = 200_000
+INITIAL_CHUNK = 2_000
+
+# Worker-side views onto the shared buffers, set up once per process
+_shared = {}
+
+def _buffer_specs(n_charts, motion=False):
+    """Name -> (shape, dtype) of every shared input and output buffer."""
+    n_bodies = len(PLANET_NAMES)
+    specs = {
+        'components': ((n_charts, 5), np.float64),
+        'latitudes': ((n_charts,), np.float64),
+        'longitudes': ((n_charts,), np.float64),
+        'jd': ((n_charts,), np.float64),
+        'tropical': ((n_charts, n_bodies), np.float64),
+        'ascendant': ((n_charts,), np.float64),
+        'ayanamsa': ((n_charts,), np.float64),
+    }
+    if motion:
+        specs['speed'] = ((n_charts, n_bodies), np.float64)
+        specs['geocentric'] = ((n_charts, n_bodies), np.float64)
+    return specs
+
+def _attach(block_names, n_charts, motion):
+    """Map NumPy arrays onto existing shared memory blocks."""
+    blocks, arrays = {}, {}
+    for name, (shape, dtype) in _buffer_specs(n_charts, motion).items():
+        blocks[name] = shared_memory.SharedMemory(name=block_names[name])
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+    return blocks, arrays
+
+def _init_worker(block_names, n_charts, ayanamsa, motion):
+    """Attach shared buffers and open the memory-mapped kernel once per worker."""
+    blocks, arrays = _attach(block_names, n_charts, motion)
+    _shared.update(blocks=blocks, arrays=arrays, ayanamsa=ayanamsa, motion=motion)
+    load_skyfield()
+
+def _run_chunk(start, stop):
+    """Compute one slice of the batch and write it straight into the shared outputs."""
+    began = time.perf_counter()
+    arrays = _shared['arrays']
+    jd, tropical, ascendant, ayanamsa_degrees, speeds, geocentric = compute_batch_arrays(
+        arrays['components'][start:stop], arrays['latitudes'][start:stop],
+        arrays['longitudes'][start:stop], _shared['ayanamsa'], motion=_shared['motion'])
+    arrays['jd'][start:stop] = jd
+    arrays['tropical'][start:stop] = tropical
+    arrays['ascendant'][start:stop] = ascendant
+    arrays['ayanamsa'][start:stop] = ayanamsa_degrees
+    if _shared['motion']:
+        arrays['speed'][start:stop] = speeds
+        arrays['geocentric'][start:stop] = geocentric
+    return start, stop, time.perf_counter() - began
+
+class _ChunkSizer:
+    """Grow or shrink chunk sizes so each task takes about TARGET_TASK_SECONDS."""
+
+    def __init__(self, initial=INITIAL_CHUNK):
+        self.size = initial
+        self.rate = None  # charts per second, smoothed
+
+    def record(self, charts, seconds):
+        if seconds <= 0:
+            return
+        rate = charts / seconds
+        self.rate = rate if self.rate is None else 0.7 * self.rate + 0.3 * rate
+        self.size = int(min(MAX_CHUNK, max(MIN_CHUNK, self.rate * TARGET_TASK_SECONDS)))
+
+    def next_size(self, remaining, workers):
+        # Keep the tail balanced: never hand one worker more than its share of what is left
+        return max(1, min(self.size, remaining, max(MIN_CHUNK, remaining // workers)))
+
+def calculate_planets_parallel(birth_datetimes, latitudes, longitudes, zodiac='tropical', ayanamsa='lahiri',
+                               workers=None, components=None, motion=False):
+    """
+    Shard a batch across a process pool with shared-memory inputs and outputs.
+
+    Workers read their slice of the inputs from shared memory, evaluate it
+    with the same vectorized code as calculate_planets_batch and write the
+    raw results back in place, so nothing but (start, stop) ranges is
+    pickled. Chunk sizes adapt to the measured throughput.
+
+    Args:
+        birth_datetimes: Sequence of UTC birth datetimes (ignored when components is given)
+        latitudes: Sequence of geographic latitudes
+        longitudes: Sequence of geographic longitudes
+        zodiac: 'tropical' or 'sidereal'
+        ayanamsa: Ayanamsa system used for sidereal positions
+        workers: Number of processes (defaults to the CPU count)
+        components: Optional precomputed (n, 5) array from utc_components
+        motion: Also compute speeds and the motion flags
+
+    Returns:
+        dict: Same layout as calculate_planets_batch
+    """
+    components = utc_components(birth_datetimes) if components is None else np.asarray(components, dtype=float)
+    n_charts = len(components)
+    workers = workers or os.cpu_count() or 1
+
+    blocks = {}
+    try:
+        for name, (shape, dtype) in _buffer_specs(n_charts, motion).items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            blocks[name] = shared_memory.SharedMemory(create=True, size=size)
+        arrays = {name: np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+                  for name, (shape, dtype) in _buffer_specs(n_charts, motion).items()}
+        arrays['components'][:] = components
+        arrays['latitudes'][:] = latitudes
+        arrays['longitudes'][:] = longitudes
+
+        block_names = {name: block.name for name, block in blocks.items()}
+        sizer = _ChunkSizer()
+        next_start = 0
+        context = get_context("fork") if "fork" in get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(block_names, n_charts, ayanamsa, motion)) as pool:
+            pending = set()
+            while next_start < n_charts or pending:
+                # Keep two tasks queued per worker so nobody idles between chunks
+                while next_start < n_charts and len(pending) < 2 * workers:
+                    stop = next_start + sizer.next_size(n_charts - next_start, workers)
+                    pending.add(pool.submit(_run_chunk, next_start, stop))
+                    next_start = stop
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, stop, seconds = future.result()
+                    sizer.record(stop - start, seconds)
+
+        # Copy out of shared memory before the blocks are released
+        return assemble_batch(arrays['jd'].copy(), arrays['tropical'].copy(), arrays['ascendant'].copy(),
+                              arrays['ayanamsa'].copy(), zodiac,
+                              arrays['speed'].copy() if motion else None,
+                              arrays['geocentric'].copy() if motion else None)
+    finally:
+        arrays = None
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+def benchmark(n_charts=200_000, worker_counts=None, seed=0):
+    """
+    Measure throughput and scaling of calculate_planets_parallel.
+
+    Returns:
+        list: (workers, seconds, charts_per_second, speedup) tuples
+    """
+    rng = np.random.default_rng(seed)
+    components = np.column_stack([
+        rng.integers(1950, 2030, n_charts), rng.integers(1, 13, n_charts), rng.integers(1, 29, n_charts),
+        rng.integers(0, 24, n_charts), rng.uniform(0, 60, n_charts),
+    ]).astype(float)
+    latitudes = rng.uniform(-60, 60, n_charts)
+    longitudes = rng.uniform(-180, 180, n_charts)
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = worker_counts or sorted({1, 2, max(1, cpu_count // 2), cpu_count})
+    results = []
+    baseline = None
+    for workers in worker_counts:
+        began = time.perf_counter()
+        calculate_planets_parallel(None, latitudes, longitudes, workers=workers, components=components)
+        seconds = time.perf_counter() - began
+        baseline = baseline or seconds
+        results.append((workers, seconds, n_charts / seconds, baseline / seconds))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the parallel batch chart executor")
+    parser.add_argument("--charts", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="*")
+    args = parser.parse_args()
+
+    for workers, seconds, rate, speedup in benchmark(args.charts, args.workers):
+        print(f"{workers:3d} workers: {seconds:7.2f}s  {rate:10.0f} charts/s  speedup x{speedup:.2f}")
@@ -0,0 +1,116 @@
+# rectification.py
+from datetime import timedelta
+import numpy as np
+from kundli_calculator import PLANET_NAMES, ZODIAC_MODES, calculate_positions_jd
+from ayanamsa import get_ayanamsa
+from utils import ZODIAC_SIGNS, NAKSHATRAS, sign_indices, nakshatra_indices, house_numbers, julian_date
+
+SWEEP_FACTORS = ('ascendant', 'houses', 'moon_nakshatra')
+
+def _runs(states):
+    """Start indices of the runs of identical rows in a (n, k) state array."""
+    changed = np.any(states[1:] != states[:-1], axis=1)
+    return np.concatenate(([0], np.flatnonzero(changed) + 1))
+
+def _house_label(houses):
+    return ", ".join(f"{name} {house}" for name, house in zip(PLANET_NAMES, houses))
+
+def birth_time_sweep(birth_dt, latitude, longitude, window_minutes=120, resolution_minutes=1.0,
+                     utc_offset_hours=0.0, zodiac='sidereal', ayanamsa='lahiri'):
+    """
+    Evaluate every candidate birth time in a window with one ephemeris call.
+
+    The window birth_dt +/- window_minutes is sampled every
+    resolution_minutes; the ascendant sign, the house of every body and the
+    Moon's nakshatra are derived from the sampled longitudes and split into
+    intervals where each stays constant. Interval boundaries are accurate
+    to the resolution.
+
+    Args:
+        birth_dt: Recorded birth datetime (naive values are UTC)
+        latitude: Geographic latitude
+        longitude: Geographic longitude
+        window_minutes: Half-width of the sweep
+        resolution_minutes: Sampling step (fractions of a minute allowed)
+        utc_offset_hours: Local offset used for the returned times
+        zodiac: 'tropical' or 'sidereal' (nakshatras are always sidereal)
+        ayanamsa: Ayanamsa system used for sidereal positions
+
+    Returns:
+        dict: 'birth' (local datetime), 'start'/'end' of the sweep, 'samples',
+              one interval list per SWEEP_FACTORS key and 'stable', the
+              (start, end) span around the birth time where none change.
+              Intervals are dicts with 'start', 'end', 'label' and
+              'contains_birth'.
+    """
+    if zodiac not in ZODIAC_MODES:
+        raise ValueError(f"Unknown zodiac '{zodiac}'. Choose from: {', '.join(ZODIAC_MODES)}")
+    if window_minutes <= 0 or resolution_minutes <= 0:
+        raise ValueError("window_minutes and resolution_minutes must be positive")
+
+    birth_jd = julian_date(birth_dt)
+    steps = int(np.ceil(window_minutes / resolution_minutes))
+    offsets = np.arange(-steps, steps + 1) * resolution_minutes
+    offsets[[0, -1]] = -window_minutes, window_minutes
+    jd = birth_jd + offsets / 1440.0
+    birth_index = steps
+
+    # One evaluation in the sidereal frame; the tropical frame is a constant shift per instant
+    degrees, ascendant = calculate_positions_jd(jd, latitude, longitude, 'sidereal', ayanamsa)
+    moon_nakshatras = nakshatra_indices(degrees[:, PLANET_NAMES.index('Moon')])
+    if zodiac == 'tropical':
+        ayanamsa_degrees = get_ayanamsa(jd, ayanamsa)
+        degrees = (degrees + ayanamsa_degrees[:, None]) % 360
+        ascendant = (ascendant + ayanamsa_degrees) % 360
+
+    states = {
+        'ascendant': sign_indices(ascendant)[:, None],
+        'houses': house_numbers(degrees, ascendant[:, None]),
+        'moon_nakshatra': moon_nakshatras[:, None],
+    }
+    labels = {
+        'ascendant': lambda row: ZODIAC_SIGNS[row[0]],
+        'houses': _house_label,
+        'moon_nakshatra': lambda row: NAKSHATRAS[row[0]],
+    }
+
+    # Local times are built from the exact minute offsets to avoid Julian date rounding
+    birth_local = birth_dt.replace(tzinfo=None) + timedelta(hours=utc_offset_hours)
+
+    def local(index):
+        return birth_local + timedelta(minutes=float(offsets[index]))
+
+    result = {
+        'birth': birth_local,
+        'start': local(0),
+        'end': local(-1),
+        'samples': len(jd),
+    }
+    for factor in SWEEP_FACTORS:
+        starts = _runs(states[factor])
+        stops = np.append(starts[1:], len(jd) - 1)
+        result[factor] = [{
+            'start': local(first),
+            'end': local(last),
+            'label': labels[factor](states[factor][first]),
+            'contains_birth': first <= birth_index and (birth_index < last or last == len(jd) - 1),
+        } for first, last in zip(starts, stops)]
+
+    combined = np.column_stack([states[factor] for factor in SWEEP_FACTORS])
+    starts = _runs(combined)
+    position = np.searchsorted(starts, birth_index, side='right') - 1
+    stop = starts[position + 1] if position + 1 < len(starts) else len(jd) - 1
+    result['stable'] = (local(starts[position]), local(stop))
+    return result
+
+def format_sweep(sweep):
+    """Return a readable summary of a birth_time_sweep result."""
+    lines = [f"Birth time {sweep['birth'].strftime('%H:%M')}: chart unchanged from "
+             f"{sweep['stable'][0].strftime('%H:%M')} to {sweep['stable'][1].strftime('%H:%M')}"]
+    for factor in SWEEP_FACTORS:
+        lines.append(f"{factor.replace('_', ' ').title()}:")
+        for interval in sweep[factor]:
+            marker = " <- recorded time" if interval['contains_birth'] else ""
+            lines.append(f"  {interval['start'].strftime('%H:%M')}-{interval['end'].strftime('%H:%M')} "
+                         f"{interval['label']}{marker}")
+    return "\n".join(lines)
@@ -0,0 +1,44 @@
+# test_analytic_ephemeris.py
+import os
+import pytest
+import skyfield
+import analytic_ephemeris
+import ephemeris
+import kundli_calculator
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SKYFIELD_TEST_DATA = os.path.join(os.path.dirname(skyfield.__file__), 'tests', 'data')
+
+# Short excerpts shipped with Skyfield's own test suite: (file, start year, end year)
+BUNDLED_EXCERPTS = [
+    ('de430-2015-03-02.bsp', 2015, 2016),
+    ('de441-1969.bsp', 1969, 1970),
+]
+
+@pytest.fixture
+def kernel(monkeypatch):
+    """Point load_skyfield at a given kernel file for one test."""
+    def use(path):
+        monkeypatch.setenv('KUNDLI_EPHEMERIS', path)
+        ephemeris.load_skyfield.cache_clear()
+    yield use
+    ephemeris.load_skyfield.cache_clear()
+
+def assert_within_bounds(report):
+    exceeded = {name: round(errors['max'], 1) for name, errors in report.items() if errors['max'] > errors['bound']}
+    assert not exceeded, f"Errors beyond ERROR_BOUNDS (arc-seconds): {exceeded}"
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(ROOT, 'de421.bsp')), reason="de421.bsp is not downloaded")
+def test_error_bounds_against_de421(kernel):
+    kernel(os.path.join(ROOT, 'de421.bsp'))
+    assert_within_bounds(analytic_ephemeris.compare_with_ephemeris(1900, 2053, samples=5000))
+
+@pytest.mark.parametrize('filename, start_year, end_year', BUNDLED_EXCERPTS)
+def test_error_bounds_against_bundled_excerpts(kernel, monkeypatch, filename, start_year, end_year):
+    path = os.path.join(SKYFIELD_TEST_DATA, filename)
+    if not os.path.exists(path):
+        pytest.skip(f"{filename} is not shipped with this Skyfield install")
+    # The excerpts only carry the Mars system barycenter, a few km from Mars itself
+    monkeypatch.setitem(kundli_calculator.EPHEMERIS_TARGETS, 'Mars', 'mars barycenter')
+    kernel(path)
+    assert_within_bounds(analytic_ephemeris.compare_with_ephemeris(start_year, end_year, samples=500))
@@ -0,0 +1,45 @@
+# test_aspects.py
+import numpy as np
+import pytest
+import aspects
+from kundli_calculator import PLANET_NAMES
+
+def planets_from(degrees):
+    return {name: {'raw_degree': float(degree), 'degree': 'Aries', 'house': 1} for name, degree in zip(PLANET_NAMES, degrees)}
+
+def pairs(result):
+    return sorted((item['from'], item['to']) for item in result['drishti'])
+
+def batch_pairs(result, chart):
+    drishti = result['drishti']
+    rows = drishti['chart'] == chart
+    return sorted((PLANET_NAMES[i], PLANET_NAMES[j]) for i, j in zip(drishti['from'][rows], drishti['to'][rows]))
+
+def test_drishti_counts_signs_from_the_planet():
+    degrees = np.full(len(PLANET_NAMES), 15.0)    # everyone in Aries except the aspecting bodies below
+    degrees[PLANET_NAMES.index('Mars')] = 75.0      # Gemini: 4th is Virgo, 7th Sagittarius, 8th Capricorn
+    degrees[PLANET_NAMES.index('Sun')] = 165.0      # Virgo, receives the Mars 4th aspect
+    degrees[PLANET_NAMES.index('Moon')] = 255.0     # Sagittarius, receives the Mars 7th aspect
+    result = aspects.chart_aspects(planets_from(degrees))
+    assert {('Mars', 'Sun'), ('Mars', 'Moon')} <= set(pairs(result))
+    assert ('Sun', 'Mars') not in pairs(result)     # the Sun's 7th from Virgo is Pisces
+
+def test_batch_drishti_matches_single_charts():
+    rng = np.random.default_rng(2)
+    degrees, partners = rng.uniform(0, 360, (2, 40, len(PLANET_NAMES)))
+    within = aspects.batch_aspects(degrees)
+    across = aspects.batch_aspects(degrees, partners)
+    for chart in range(len(degrees)):
+        single = planets_from(degrees[chart])
+        assert batch_pairs(within, chart) == pairs(aspects.chart_aspects(single))
+        assert batch_pairs(across, chart) == pairs(aspects.synastry_aspects(single, planets_from(partners[chart])))
+        rows = within['chart'] == chart
+        assert len(aspects.chart_aspects(single)['aspects']) == rows.sum()
+
+def test_chat_context_skips_aspects_without_raw_degrees():
+    ai_chat = pytest.importorskip('ai_chat')
+    planets = {name: {'degree': 'Leo', 'house': 1} for name in PLANET_NAMES}
+    context = ai_chat.KundliChatInterface.format_birth_chart_context(None, {'planets': planets, 'ascendant': 'Leo'})
+    assert "Ascendant: Leo" in context and "Aspects:" not in context
+    with_degrees = {name: dict(data, raw_degree=125.0) for name, data in planets.items()}
+    assert "Aspects:" in ai_chat.KundliChatInterface.format_birth_chart_context(None, {'planets': with_degrees})
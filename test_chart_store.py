@@ -0,0 +1,65 @@
+# test_chart_store.py
+import numpy as np
+import pytest
+from chart_store import ChartStore
+from kundli_calculator import PLANET_NAMES
+from utils import sign_indices
+
+def synthetic_batch(rows, seed):
+    """Random positions in the layout calculate_planets_batch returns; no ephemeris needed."""
+    rng = np.random.default_rng(seed)
+    degrees = rng.uniform(0, 360, (rows, len(PLANET_NAMES)))
+    ascendant = rng.uniform(0, 360, rows)
+    houses = ((sign_indices(degrees) - sign_indices(ascendant)[:, None]) % 12 + 1).astype(np.int8)
+    return {
+        'planet_names': list(PLANET_NAMES),
+        'jd': rng.uniform(2415020, 2470000, rows),
+        'sidereal_degree': degrees,
+        'sidereal_signs': sign_indices(degrees),
+        'sidereal_houses': houses,
+        'sidereal_ascendant': ascendant,
+    }
+
+def fill(store, sizes):
+    for seed, rows in enumerate(sizes):
+        store.append(synthetic_batch(rows, seed), np.zeros(rows), np.zeros(rows),
+                     user_ids=np.arange(rows) + 1000 * seed)
+
+def test_row_ids_survive_compaction(tmp_path):
+    store = ChartStore(str(tmp_path / 'charts'))
+    # Small runs on both sides of a large segment, so merged runs must stay in place
+    fill(store, [1, 1, 2, 50, 1, 3, 1])
+    before = store.read(np.arange(len(store)))
+    saturn_in_7th = store.query(Saturn_house=7)
+
+    merged = store.compact(small_rows=10)
+
+    assert merged == 6
+    assert [segment['rows'] for segment in store.manifest['segments']] == [4, 50, 5]
+    after = store.read(np.arange(len(store)))
+    for column in before:
+        np.testing.assert_array_equal(after[column], before[column])
+    np.testing.assert_array_equal(store.query(Saturn_house=7), saturn_in_7th)
+
+def test_compact_leaves_isolated_small_segments(tmp_path):
+    store = ChartStore(str(tmp_path / 'charts'))
+    fill(store, [1, 50, 1])
+    assert store.compact(small_rows=10) == 0
+    assert len(store.manifest['segments']) == 3
+
+@pytest.mark.parametrize('conditions', [{'Saturn_house': 0}, {'Saturn_house': 13}, {'Moon_sign': 12},
+                                        {'Moon_sign': 'Ophiuchus'}, {'ascendant_sign': [0, -1]}])
+def test_indexed_values_outside_the_index_are_rejected(tmp_path, conditions):
+    store = ChartStore(str(tmp_path / 'charts'))
+    fill(store, [5])
+    with pytest.raises(ValueError):
+        store.query(**conditions)
+    with pytest.raises(ValueError):
+        store.count(**conditions)
+
+def test_sign_names_and_lists_match_indexes(tmp_path):
+    store = ChartStore(str(tmp_path / 'charts'))
+    fill(store, [200])
+    signs = store.read(np.arange(len(store)), ['Moon_sign'])['Moon_sign']
+    assert store.count(Moon_sign='cancer') == np.sum(signs == 3)
+    np.testing.assert_array_equal(store.query(Moon_sign=['Cancer', 11]), np.flatnonzero((signs == 3) | (signs == 11)))
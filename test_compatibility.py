@@ -0,0 +1,57 @@
+# test_compatibility.py
+import numpy as np
+import pytest
+import compatibility
+from compatibility import KOOTAS, KOOTA_TABLES, TOTAL_SCORE_TABLE, koota_breakdown, moon_padas
+
+KOOTA_MAXIMUM = {'Varna': 1, 'Vashya': 2, 'Tara': 3, 'Yoni': 4, 'Graha Maitri': 5, 'Gana': 6, 'Bhakoot': 7, 'Nadi': 8}
+
+def test_kootas_add_up_to_36_points():
+    for name in KOOTAS:
+        assert KOOTA_TABLES[name].max() == KOOTA_MAXIMUM[name]
+        assert KOOTA_TABLES[name].min() >= 0
+    assert TOTAL_SCORE_TABLE.max() == compatibility.MAX_SCORE == 36
+    np.testing.assert_allclose(TOTAL_SCORE_TABLE, sum(KOOTA_TABLES[name] for name in KOOTAS))
+
+def test_ashwini_groom_with_rohini_bride():
+    # Aries (Kshatriya, Chatushpada, Mars, Deva, Adi) with Taurus (Vaishya, Chatushpada, Venus, Manushya, Antya)
+    breakdown = koota_breakdown(moon_padas(1.0), moon_padas(41.0))
+    assert breakdown == {
+        'Varna': 1.0,          # groom's varna ranks higher
+        'Vashya': 2.0,         # both quadrupeds
+        'Tara': 1.5,           # 4th tara from the groom is Kshema, 25th (7th) from the bride is Vadha
+        'Yoni': 3.0,           # horse and serpent are friendly
+        'Graha Maitri': 3.0,   # Mars and Venus are mutually neutral
+        'Gana': 6.0,           # Deva groom, Manushya bride
+        'Bhakoot': 0.0,        # 2/12 placement
+        'Nadi': 8.0,           # different nadis
+        'Total': 24.5,
+    }
+
+@pytest.mark.parametrize('groom_nakshatra, bride_nakshatra, points', [
+    (0, 23, 4.0),    # Ashwini and Shatabhisha: both horse
+    (0, 1, 2.0),     # horse and elephant
+    (6, 9, 0.0),     # Punarvasu (cat) and Magha (rat): sworn enemies
+    (11, 12, 3.0),   # cow and buffalo
+    (0, 11, 1.0),    # horse and cow
+])
+def test_yoni_uses_the_graded_matrix(groom_nakshatra, bride_nakshatra, points):
+    assert KOOTA_TABLES['Yoni'][groom_nakshatra * 4, bride_nakshatra * 4] == points
+
+def test_vashya_splits_sagittarius_and_capricorn():
+    aries, cancer = moon_padas(1.0), moon_padas(91.0)
+    # Sagittarius: Manava before 15 degrees, Chatushpada after
+    assert KOOTA_TABLES['Vashya'][aries, moon_padas(245.0)] == 1.0
+    assert KOOTA_TABLES['Vashya'][aries, moon_padas(260.0)] == 2.0
+    # Capricorn: Chatushpada before 15 degrees, Jalachara after
+    assert KOOTA_TABLES['Vashya'][cancer, moon_padas(275.0)] == 1.0
+    assert KOOTA_TABLES['Vashya'][cancer, moon_padas(290.0)] == 2.0
+
+def test_index_and_streaming_top_matches_agree():
+    population = np.random.default_rng(5).integers(0, 108, 5000).astype(np.int16)
+    query = moon_padas(123.0)
+    streamed = compatibility.top_matches(query, population, k=25, chunk_size=700)
+    indexed = compatibility.CompatibilityIndex(population).top_matches(query, k=25)
+    assert streamed == indexed
+    scores = compatibility.score_population(query, population)
+    assert [score for score, _ in streamed] == sorted(scores, reverse=True)[:25]
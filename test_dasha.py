@@ -0,0 +1,52 @@
+# test_dasha.py
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+import dasha
+from utils import julian_date
+
+BIRTH = datetime(1990, 5, 17, 6, 30)
+
+def years(value):
+    return timedelta(days=value * dasha.DAYS_PER_YEAR)
+
+@pytest.mark.parametrize('moon, lord, balance_years', [
+    (0.0, 'Ketu', 7.0),                               # start of Ashwini: the whole Ketu dasha remains
+    (10.0, 'Ketu', 7.0 * 0.25),                       # three quarters of Ashwini traversed
+    (1.5 * dasha.NAKSHATRA_SPAN, 'Venus', 10.0),      # middle of Bharani
+    (9 * dasha.NAKSHATRA_SPAN, 'Ketu', 7.0),          # Magha starts the second round of lords
+    (26.5 * dasha.NAKSHATRA_SPAN, 'Mercury', 8.5),    # middle of Revati
+])
+def test_balance_at_birth(moon, lord, balance_years):
+    period = dasha.active_period(moon, BIRTH, BIRTH, levels=1)
+    assert period.lords == (lord,)
+    assert abs((period.end - BIRTH) - years(balance_years)) < timedelta(seconds=1)
+
+def test_active_period_switches_exactly_at_boundaries():
+    moon = 123.4
+    periods = list(dasha.iter_dasha_periods(moon, BIRTH, levels=2, end=BIRTH + years(60)))
+    for before, after in zip(periods, periods[1:]):
+        assert before.end == after.start
+        assert dasha.active_period(moon, BIRTH, after.start - timedelta(minutes=1), levels=2).lords == before.lords
+        assert dasha.active_period(moon, BIRTH, after.start + timedelta(minutes=1), levels=2).lords == after.lords
+
+def test_sub_periods_follow_the_vimshottari_order():
+    # Saturn Mahadasha: Saturn, Mercury, Ketu, Venus, ... Jupiter Antardashas
+    moon = 7 * dasha.NAKSHATRA_SPAN    # start of Pushya (Saturn)
+    antardashas = [period.lords[1] for period in dasha.iter_dasha_periods(moon, BIRTH, levels=2, end=BIRTH + years(19))]
+    assert antardashas == ['Saturn', 'Mercury', 'Ketu', 'Venus', 'Sun', 'Moon', 'Mars', 'Rahu', 'Jupiter']
+    # Saturn / Saturn lasts 19 * 19 / 120 years
+    first = dasha.active_period(moon, BIRTH, BIRTH, levels=2)
+    assert abs((first.end - first.start) - years(19 * 19 / 120)) < timedelta(seconds=1)
+
+def test_batch_agrees_with_scalar_lookup():
+    rng = np.random.default_rng(3)
+    moons = rng.uniform(0, 360, 200)
+    births = [BIRTH + timedelta(days=float(offset)) for offset in rng.uniform(-20000, 20000, 200)]
+    whens = [birth + timedelta(days=float(offset)) for birth, offset in zip(births, rng.uniform(0, 45000, 200))]
+    batch = dasha.active_periods_batch(moons, [julian_date(b) for b in births], [julian_date(w) for w in whens])
+    for row, (moon, birth, when) in enumerate(zip(moons, births, whens)):
+        period = dasha.active_period(moon, birth, when)
+        assert [dasha.DASHA_LORDS[lord] for lord in batch['lords'][row]] == list(period.lords)
+        assert abs(batch['start_jd'][row] - julian_date(period.start)) < 1e-5
+        assert abs(batch['end_jd'][row] - julian_date(period.end)) < 1e-5
@@ -0,0 +1,64 @@
+# test_insight_corpus.py
+import pytest
+import insight_corpus
+from reports import planets_from_degrees
+
+@pytest.fixture
+def fresh_corpus_dir(tmp_path, monkeypatch):
+    """Point the shared corpus at an empty directory."""
+    monkeypatch.setenv('KUNDLI_INSIGHT_CORPUS', str(tmp_path / 'insights'))
+    insight_corpus.get_insight_corpus.cache_clear()
+    yield tmp_path / 'insights'
+    insight_corpus.get_insight_corpus.cache_clear()
+
+def test_corpus_is_built_on_first_use(fresh_corpus_dir):
+    planets, ascendant = planets_from_degrees([10, 40, 70, 100, 130, 160, 190], 5)
+    reading = insight_corpus.corpus_reading(planets, ascendant, "career and profession")
+    assert (fresh_corpus_dir / 'corpus.json').exists()
+    assert reading.startswith("With Aries rising")
+    assert insight_corpus.get_insight_corpus().manifest['generator'] == 'template_snippet'
+
+@pytest.mark.parametrize('question_type, category', [
+    ("health of the body", 'health'), ("our bodies", 'health'), ("jobs and careers", 'career'),
+    ("finances", 'finance'), ("relationships", 'love'), ("somebody at a networking event", None),
+])
+def test_categories_match_whole_words_and_plurals(question_type, category):
+    assert insight_corpus.category_for(question_type) == category
+
+def test_focus_counts_whole_keyword_matches():
+    planets, ascendant = planets_from_degrees([10, 40, 70, 100, 130, 160, 190], 5)
+    reading = "Your body and other bodies need rest. Somebody at work is busy with homework."
+    assert insight_corpus.reading_quality(reading, planets, ascendant, 'health')['focus'] == 2
+    assert insight_corpus.reading_quality(reading, planets, ascendant, 'career')['focus'] == 1
+
+@pytest.fixture(scope='module')
+def corpus(tmp_path_factory):
+    return insight_corpus.InsightCorpus(insight_corpus.build_insight_corpus(str(tmp_path_factory.mktemp('insights'))))
+
+def test_snippet_addresses_every_cell(corpus):
+    template = insight_corpus.template_snippet
+    assert corpus.snippet('career', 'ascendant', None, 4) == template('ascendant', None, 4, 'career')
+    assert corpus.snippet('career', 'house', 'Mars', 9) == template('house', 'Mars', 9, 'career')
+    # The last cell closes the text array
+    last = corpus.snippet('finance', 'ascendant', None, 11)
+    assert last == template('ascendant', None, 11, 'finance')
+    assert corpus.offsets[-1] == len(corpus.text)
+    assert len(corpus.offsets) - 1 == len(insight_corpus.INSIGHT_CATEGORIES) * len(corpus.rows) * corpus.n_values
+
+def test_assemble_puts_key_houses_first(corpus):
+    # Ascendant in Aries: Sun in the 1st ... Saturn in the 7th house
+    planets, ascendant = planets_from_degrees([5, 35, 65, 95, 125, 155, 185], 0)
+    paragraphs = corpus.assemble(planets, ascendant, 'love').split("\n\n")
+    assert paragraphs[0] == corpus.snippet('love', 'ascendant', None, 0)
+    # Love's key houses are 2, 5, 7 and 12: Moon, Mars and Saturn lead, each group in PLANET_NAMES order
+    leading = [paragraph.split()[0] for paragraph in paragraphs[1:]]
+    assert leading == ['Moon', 'Mars', 'Saturn', 'Sun', 'Mercury', 'Venus', 'Jupiter']
+
+def test_corpus_path_covers_the_chart_without_llm_calls(corpus):
+    llm = insight_corpus.FakeLLM(latency=0)
+    results = insight_corpus.compare_paths(llm, 1, corpus)
+    assert results['corpus']['coverage'] == 1.0
+    assert results['corpus']['vetted'] == 1.0
+    # One call per category for the llm path and one for smoothing; the corpus path makes none
+    assert llm.calls == 2 * len(insight_corpus.INSIGHT_CATEGORIES)
+    assert results['llm']['coverage'] < results['corpus']['coverage']
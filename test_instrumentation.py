@@ -0,0 +1,126 @@
+# test_instrumentation.py
+import functools
+import os
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip('streamlit.testing.v1')
+pytest.importorskip('geopy')
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+import instrumentation
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+# Calls each replayed interaction should trigger; anything else is a cache miss
+EXPECTED_COUNTS = {
+    "initial load": {"daily_forecast": 1},
+    "type location": {"geocode": 1},
+    "edit birth time": {},
+    "switch zodiac": {},
+    "generate kundli": {"calculate_planets": 1, "birth_time_sweep": 1, "render_figure": 4},
+    "move sweep slider": {},
+    "show panchang": {"panchang": 1},
+    "rerun without changes": {},
+}
+
+# Coordinates the offline geocoder returns for every query (New Delhi)
+STUB_LOCATION = (28.6139, 77.2090)
+
+def _interactions(location):
+    """(name, action) pairs replayed in order against an AppTest of app.py."""
+    def search_location(at):
+        at.text_input(key="location_search").input(location).run()
+        # Without network the app falls back to manual coordinates
+        if "manual_lat" in [widget.key for widget in at.number_input]:
+            at.number_input(key="manual_lat").set_value(STUB_LOCATION[0])
+            at.number_input(key="manual_lon").set_value(STUB_LOCATION[1]).run()
+
+    return [
+        ("initial load", lambda at: at.run()),
+        ("type location", search_location),
+        ("edit birth time", lambda at: at.text_input(key="birth_time").input("06:30").run()),
+        ("switch zodiac", lambda at: at.radio(key="zodiac").set_value("Tropical").run()),
+        ("generate kundli", lambda at: at.button(key="generate").click().run()),
+        ("move sweep slider", lambda at: at.slider(key="sweep_minutes").set_value(60).run()),
+        ("show panchang", lambda at: at.button(key="show_panchang").click().run()),
+        ("rerun without changes", lambda at: at.run()),
+    ]
+
+class _OfflineGeocoder:
+    """Stand-in for geopy's Nominatim that answers every query with STUB_LOCATION."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def geocode(self, query, exactly_one=True, limit=None):
+        place = SimpleNamespace(address=query, latitude=STUB_LOCATION[0], longitude=STUB_LOCATION[1])
+        return place if exactly_one else [place]
+
+def _offline_panchang(year, latitude, longitude, utc_offset_hours=0.0, ayanamsa='lahiri', **kwargs):
+    """One placeholder Panchang record, so the table and downloads still render."""
+    from panchang import CSV_FIELDS
+    return (dict.fromkeys(CSV_FIELDS, ''),)
+
+@pytest.fixture
+def offline(monkeypatch):
+    """
+    Keep the replay free of network, kernel and Panchang work.
+
+    Geocoding answers from _OfflineGeocoder, charts, sweeps and the forecast
+    use the analytic engine (no de421 download), the Panchang returns one
+    placeholder record and the chart store is disabled. The counted wrappers
+    in app.py still run, so the counts are unaffected.
+    """
+    from kundli_calculator import calculate_planets, calculate_positions_jd
+    from forecasts import daily_forecast
+
+    monkeypatch.setattr('geopy.geocoders.Nominatim', _OfflineGeocoder)
+    monkeypatch.setattr('kundli_calculator.calculate_planets', functools.partial(calculate_planets, engine='analytic'))
+    monkeypatch.setattr('rectification.calculate_positions_jd',
+                        functools.partial(calculate_positions_jd, engine='analytic'))
+    monkeypatch.setattr('forecasts.daily_forecast', functools.partial(daily_forecast, engine='analytic'))
+    monkeypatch.setattr('panchang.get_panchang_year', _offline_panchang)
+    monkeypatch.setenv('CHART_STORE_DIR', '')
+
+def count_interactions(app_path=APP_PATH, location="New Delhi", timeout=120):
+    """
+    Replay typical widget interactions and count the expensive calls each triggers.
+
+    Returns:
+        list: (interaction, {call name: count}) tuples
+
+    Raises:
+        RuntimeError: If the app raised an exception during an interaction
+    """
+    # Results cached by an earlier replay in this process would hide the first calls
+    st.cache_data.clear()
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    results = []
+    for name, action in _interactions(location):
+        instrumentation.reset_counts()
+        action(at)
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].message}")
+        results.append((name, instrumentation.snapshot()))
+    return results
+
+def check_counts(results, expected=EXPECTED_COUNTS):
+    """
+    Compare replayed counts with the expected table.
+
+    Returns:
+        list: One message per interaction whose counts differ (empty when all match)
+    """
+    return [f"{name}: expected {expected.get(name, {})}, got {counts}"
+            for name, counts in results if counts != expected.get(name, {})]
+
+def test_expensive_calls_per_interaction(offline):
+    assert check_counts(count_interactions()) == []
+
+def test_counted_wraps_without_changing_results():
+    instrumentation.reset_counts()
+    double = instrumentation.counted("double")(lambda value: 2 * value)
+    assert [double(1), double(2)] == [2, 4]
+    assert instrumentation.snapshot() == {"double": 2}
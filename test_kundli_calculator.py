@@ -0,0 +1,71 @@
+# test_kundli_calculator.py
+import time
+import numpy as np
+import pytest
+import analytic_ephemeris
+import kundli_calculator
+
+DELHI = (28.6139, 77.2090)
+
+def batch_components(n_charts, seed=0):
+    rng = np.random.default_rng(seed)
+    components = np.column_stack([np.full(n_charts, 2015), np.full(n_charts, 3), rng.integers(3, 6, n_charts),
+                                  rng.integers(0, 24, n_charts), rng.uniform(0, 60, n_charts)])
+    return components, rng.uniform(-60, 60, n_charts), rng.uniform(-180, 180, n_charts)
+
+def best_times(*functions, repeats=5):
+    """Best wall time of each function, interleaving the runs so load drift hits all of them alike."""
+    timings = [[] for _ in functions]
+    for _ in range(repeats):
+        for function, timed in zip(functions, timings):
+            began = time.perf_counter()
+            function()
+            timed.append(time.perf_counter() - began)
+    return [min(timed) for timed in timings]
+
+@pytest.mark.parametrize('engine', kundli_calculator.POSITION_ENGINES)
+def test_motion_reuses_the_position_pass(excerpt_kernel, engine):
+    components, latitudes, longitudes = batch_components(5000)
+    without = kundli_calculator.compute_batch_arrays(components, latitudes, longitudes, engine=engine)
+    with_motion = kundli_calculator.compute_batch_arrays(components, latitudes, longitudes, engine=engine, motion=True)
+    difference = np.abs((with_motion[1] - without[1] + 180) % 360 - 180)
+    assert difference.max() * 3600 < 0.1
+
+def test_ephemeris_motion_stays_close_to_the_position_cost(excerpt_kernel):
+    # Positions alone are the pre-motion path; motion must stay close to its cost
+    components, latitudes, longitudes = batch_components(5000)
+    baseline, timed = best_times(
+        lambda: kundli_calculator.compute_batch_arrays(components, latitudes, longitudes),
+        lambda: kundli_calculator.compute_batch_arrays(components, latitudes, longitudes, motion=True))
+    assert timed < 1.5 * baseline
+
+def test_analytic_motion_is_one_stacked_evaluation(monkeypatch):
+    # Timing cannot tell this engine's two instants apart from noise, so count the evaluations
+    calls = []
+    evaluate = analytic_ephemeris._longitudes
+
+    def counting(jd_ut, *args, **kwargs):
+        calls.append(np.shape(jd_ut))
+        return evaluate(jd_ut, *args, **kwargs)
+
+    monkeypatch.setattr(analytic_ephemeris, '_longitudes', counting)
+    components, latitudes, longitudes = batch_components(500)
+    kundli_calculator.compute_batch_arrays(components, latitudes, longitudes, engine='analytic', motion=True)
+    assert calls == [(2, 500)]
+
+@pytest.mark.parametrize('engine', kundli_calculator.POSITION_ENGINES)
+def test_speeds_are_geocentric(excerpt_kernel, engine):
+    # Topocentric rates would swing the Moon between about 7 and 17 degrees/day over a day
+    speeds = [kundli_calculator.calculate_planets('2015/03/05', f'{hour:02d}:00', *DELHI, engine=engine)[0]['Moon']['speed']
+              for hour in range(0, 24, 3)]
+    assert 11.5 < min(speeds) and max(speeds) < 12.2
+    assert max(speeds) - min(speeds) < 0.05
+
+def test_batch_motion_is_opt_in(excerpt_kernel):
+    components, latitudes, longitudes = batch_components(10)
+    datetimes = [kundli_calculator.datetime(*map(int, row[:4]), int(row[4])) for row in components]
+    plain = kundli_calculator.calculate_planets_batch(datetimes, latitudes, longitudes)
+    assert 'speed' not in plain and 'retrograde' not in plain
+    moving = kundli_calculator.calculate_planets_batch(datetimes, latitudes, longitudes, motion=True)
+    assert moving['speed'].shape == moving['raw_degree'].shape
+    assert moving['retrograde'][:, kundli_calculator.PLANET_NAMES.index('Jupiter')].all()
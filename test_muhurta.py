@@ -0,0 +1,38 @@
+# test_muhurta.py
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+import muhurta
+from utils import julian_date, jd_to_datetime
+
+DELHI = (28.6139, 77.2090)
+START, END = datetime(2015, 3, 2), datetime(2015, 3, 4)
+
+def brute_force_windows(constraints, step_seconds=30):
+    """Windows read straight off a fine grid, with no bisection."""
+    compiled = muhurta.validate_constraints(constraints)
+    grid = np.arange(julian_date(START), julian_date(END), step_seconds / 86400.0)
+    mask = muhurta.evaluate_constraints(grid, *DELHI, compiled)
+    edges = np.flatnonzero(np.diff(mask.astype(np.int8))) + 1
+    bounds = np.concatenate([[0] if mask[0] else [], edges, [len(grid)] if mask[-1] else []]).astype(int)
+    return [(jd_to_datetime(grid[a], 0.0), jd_to_datetime(grid[min(b, len(grid) - 1)], 0.0))
+            for a, b in zip(bounds[::2], bounds[1::2])]
+
+@pytest.mark.parametrize('constraints', [
+    {'ascendant_sign': ['Leo', 'Virgo']},
+    {'ascendant_sign': ['Taurus', 'Leo', 'Scorpio', 'Aquarius'], 'no_malefic_in_house': [7, 8]},
+    {'moon_nakshatra': ['Pushya', 'Ashlesha'], 'weekday': 'Tuesday'},
+])
+def test_windows_match_a_fine_grid(excerpt_kernel, constraints):
+    windows = muhurta.find_muhurta_windows(START, END, *DELHI, constraints)
+    expected = brute_force_windows(constraints)
+    assert windows and len(windows) == len(expected)
+    for (start, end), (grid_start, grid_end) in zip(windows, expected):
+        assert abs(start - grid_start) <= timedelta(minutes=1)
+        assert abs(end - grid_end) <= timedelta(minutes=1)
+
+def test_unknown_names_are_rejected():
+    with pytest.raises(ValueError, match="Unknown sign 'Leon'"):
+        muhurta.validate_constraints({'ascendant_sign': 'Leon'})
+    with pytest.raises(ValueError, match="Unknown constraint"):
+        muhurta.validate_constraints({'tithi': 'Purnima'})
@@ -0,0 +1,70 @@
+# test_panchang.py
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+import panchang
+from utils import julian_date
+
+J2000 = 2451545.0
+DELHI = (28.6139, 77.2090)
+
+def mean_sun_moon(jd_ut):
+    """Mean longitudes: smooth stand-ins for the ephemeris that cover any year."""
+    days = np.asarray(jd_ut, dtype=float) - J2000
+    return (280.46 + 0.9856474 * days) % 360, (218.32 + 13.176396 * days) % 360
+
+def sun_up_by_local_time(jd_ut, latitude, longitude):
+    local_solar_day = (np.asarray(jd_ut) + 0.5 + longitude / 360) % 1
+    return (local_solar_day > 0.26) & (local_solar_day < 0.74)
+
+def grid_transitions(start_jd, end_jd, step_seconds=30):
+    """Element changes read straight off a fine grid, with no bisection."""
+    grid = np.arange(start_jd, end_jd, step_seconds / 86400.0)
+    states = panchang.element_states(grid)
+    return {element: grid[1:][states[1:, index] != states[:-1, index]]
+            for index, element in enumerate(panchang.ELEMENTS)}
+
+def test_transitions_match_a_fine_grid(excerpt_kernel):
+    start_jd, end_jd = julian_date(datetime(2015, 3, 1)), julian_date(datetime(2015, 3, 6))
+    found = panchang.find_element_transitions(start_jd, end_jd)
+    expected = grid_transitions(start_jd, end_jd)
+    for element in panchang.ELEMENTS:
+        instants, following = found[element]
+        assert len(instants) == len(expected[element]) > 0
+        np.testing.assert_allclose(instants, expected[element], atol=60 / 86400.0)
+        np.testing.assert_array_equal(following, panchang.element_states(instants + 60 / 86400.0)[:, panchang.ELEMENTS.index(element)])
+
+@pytest.fixture
+def mean_motion(monkeypatch):
+    monkeypatch.setattr(panchang, '_sun_moon', mean_sun_moon)
+    monkeypatch.setattr(panchang, '_sun_above_horizon', sun_up_by_local_time)
+    panchang._cached_year.cache_clear()
+    yield
+    panchang._cached_year.cache_clear()
+
+def test_cached_year_matches_an_uncached_evaluation(mean_motion, tmp_path):
+    cache_dir = str(tmp_path / 'panchang')
+    records = panchang.get_panchang_year(2001, *DELHI, 5.5, cache_dir=cache_dir)
+    panchang._cached_year.cache_clear()
+    # Read back from disk, and shared by a location in the same grid cell
+    assert panchang.get_panchang_year(2001, 28.6501, 77.2499, 5.5, cache_dir=cache_dir) == records
+    cell = panchang._cell(DELHI[0]), panchang._cell(DELHI[1])
+    assert list(records) == panchang.compute_panchang_year(2001, *cell, 5.5)
+
+    offset = 5.5 / 24
+    changes = grid_transitions(julian_date(datetime(2001, 1, 1)) - offset, julian_date(datetime(2002, 1, 1)) - offset)
+    assert len(records) == 365
+    for record in records:
+        midnight = julian_date(datetime.fromisoformat(record['date'])) - offset
+        sunrise = julian_date(datetime.fromisoformat(record['sunrise'])) - offset
+        states = panchang.element_states([sunrise, sunrise + 1 / 1440])
+        for index, element in enumerate(panchang.ELEMENTS):
+            # The sunrise string is truncated to the minute, so either end of that minute may hold
+            assert record[element] in {panchang.ELEMENT_NAMES[element][state] for state in states[:, index]}
+            day_changes = changes[element][(changes[element] >= midnight) & (changes[element] < midnight + 1)]
+            ends = [datetime.strptime(f"{record['date']} {end}", '%Y-%m-%d %H:%M')
+                    for end in record[f'{element}_ends'].split(';') if end]
+            assert len(ends) == len(day_changes)
+            for end, change in zip(ends, day_changes):
+                local = datetime(2001, 1, 1) + timedelta(days=change + offset - julian_date(datetime(2001, 1, 1)))
+                assert abs(end - local) <= timedelta(minutes=2)
@@ -0,0 +1,43 @@
+# test_rectification.py
+from datetime import datetime, timedelta
+import pytest
+import rectification
+from kundli_calculator import calculate_positions_jd
+from utils import ZODIAC_SIGNS, julian_date, sign_indices
+
+DELHI = (28.6139, 77.2090)
+BIRTH = datetime(2015, 3, 3, 6, 30)
+
+def ascendant_sign(when, zodiac):
+    """Ascendant sign at one instant, evaluated on its own."""
+    return ZODIAC_SIGNS[int(sign_indices(calculate_positions_jd(julian_date(when), *DELHI, zodiac, 'lahiri')[1])[0])]
+
+@pytest.mark.parametrize('zodiac', ['sidereal', 'tropical'])
+def test_ascendant_changes_match_single_instant_evaluation(excerpt_kernel, zodiac):
+    sweep = rectification.birth_time_sweep(BIRTH, *DELHI, window_minutes=180, zodiac=zodiac)
+    scan = [sweep['start'] + timedelta(minutes=minute) for minute in range(0, 361, 2)]
+    signs = [ascendant_sign(when, zodiac) for when in scan]
+    changes = sum(a != b for a, b in zip(signs, signs[1:]))
+    intervals = sweep['ascendant']
+    assert len(intervals) == changes + 1 > 1
+    for before, after in zip(intervals, intervals[1:]):
+        # Boundaries are reported at the first one-minute sample in the new sign
+        assert ascendant_sign(after['start'], zodiac) == after['label'] != before['label']
+        assert ascendant_sign(after['start'] - timedelta(minutes=1), zodiac) == before['label']
+    assert sum(interval['contains_birth'] for interval in intervals) == 1
+
+def test_stable_span_sits_inside_every_factor(excerpt_kernel):
+    sweep = rectification.birth_time_sweep(BIRTH, *DELHI, window_minutes=120, resolution_minutes=0.5, utc_offset_hours=5.5)
+    assert sweep['birth'] == BIRTH + timedelta(hours=5.5)
+    assert sweep['samples'] == 481
+    stable_start, stable_end = sweep['stable']
+    assert stable_start <= sweep['birth'] <= stable_end
+    for factor in rectification.SWEEP_FACTORS:
+        [current] = [interval for interval in sweep[factor] if interval['contains_birth']]
+        assert current['start'] <= stable_start and stable_end <= current['end']
+
+def test_invalid_sweeps_are_rejected():
+    with pytest.raises(ValueError):
+        rectification.birth_time_sweep(BIRTH, *DELHI, zodiac='draconic')
+    with pytest.raises(ValueError):
+        rectification.birth_time_sweep(BIRTH, *DELHI, resolution_minutes=0)
@@ -0,0 +1,29 @@
+# test_reports.py
+import os
+import pytest
+import reports
+
+def synthetic_client(client_id):
+    client = next(reports._synthetic_clients(1))
+    client['id'] = client_id
+    return client
+
+@pytest.mark.parametrize('client_id, name', [
+    ('client-000001', 'client-000001'),
+    ('../../etc/passwd', '.._.._etc_passwd'),
+    ('Asha Rao / 1990', 'Asha_Rao___1990'),
+    (42, '42'),
+])
+def test_report_names_stay_inside_the_output_directory(tmp_path, client_id, name):
+    path = reports.render_report(synthetic_client(client_id), str(tmp_path), 'png')
+    assert path == os.path.join(str(tmp_path), f"{name}.png")
+    assert os.listdir(tmp_path) == [f"{name}.png"]
+
+@pytest.mark.parametrize('ids', [['a', 'b', 'a'], ['a/b', 'a_b']])
+def test_duplicate_ids_are_rejected(tmp_path, ids):
+    with pytest.raises(ValueError, match="Duplicate report id"):
+        list(reports.export_reports((synthetic_client(client_id) for client_id in ids), str(tmp_path), 'png', workers=1))
+
+def test_every_client_gets_its_own_report(tmp_path):
+    paths = list(reports.export_reports(reports._synthetic_clients(4), str(tmp_path), 'png', workers=2))
+    assert sorted(os.path.basename(path) for path in paths) == [f"client-{index:06d}.png" for index in range(4)]
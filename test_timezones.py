@@ -0,0 +1,76 @@
+# test_timezones.py
+import json
+from datetime import datetime
+import numpy as np
+import pytest
+import timezones
+
+def write_geojson(path, zones):
+    features = [{'type': 'Feature', 'properties': {'tzid': tzid}, 'geometry': {'type': 'Polygon', 'coordinates': rings}}
+                for tzid, rings in zones.items()]
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': features}))
+    return str(path)
+
+@pytest.fixture
+def two_zone_index(tmp_path):
+    """West and East share a slanted border through the middle of cells; East has a lake (hole)."""
+    source = write_geojson(tmp_path / 'zones.json', {
+        'Asia/Karachi': [[[0, 0], [2.3, 0], [3.3, 4], [0, 4], [0, 0]]],
+        'Asia/Kolkata': [[[2.3, 0], [6, 0], [6, 4], [3.3, 4], [2.3, 0]],
+                         [[4.2, 1.2], [5.6, 1.2], [5.6, 2.7], [4.2, 2.7], [4.2, 1.2]]],
+    })
+    return timezones.TimezoneIndex(timezones.build_timezone_index(source, str(tmp_path / 'index')))
+
+def border_longitude(latitude):
+    return 2.3 + latitude / 4
+
+def test_lookups_toggle_across_a_border(two_zone_index):
+    latitudes = np.linspace(0.05, 3.95, 40)
+    west = two_zone_index.zone_names_for(latitudes, border_longitude(latitudes) - 0.01)
+    east = two_zone_index.zone_names_for(latitudes, border_longitude(latitudes) + 0.01)
+    assert set(west) == {'Asia/Karachi'}
+    assert set(east) == {'Asia/Kolkata'}
+
+def test_holes_fall_back_to_the_nautical_band(two_zone_index):
+    assert two_zone_index.zone_names_for([2.0, 2.0, 1.15], [4.9, 4.19, 4.9]) == \
+        ['Etc/GMT', 'Asia/Kolkata', 'Asia/Kolkata']
+    assert timezones._nautical_zone(82.5) == 'Etc/GMT-6'
+    assert timezones._nautical_zone(-75.0) == 'Etc/GMT+5'
+
+def test_grid_lookup_matches_ray_casting(two_zone_index, tmp_path):
+    rng = np.random.default_rng(0)
+    latitudes, longitudes = rng.uniform(0.01, 3.99, 2000), rng.uniform(0.01, 5.99, 2000)
+    lake = (longitudes > 4.2) & (longitudes < 5.6) & (latitudes > 1.2) & (latitudes < 2.7)
+    expected = np.where(longitudes < border_longitude(latitudes), 0, np.where(lake, -1, 1))
+    names = two_zone_index.zone_names
+    zone_ids = two_zone_index.zone_ids(latitudes, longitudes)
+    np.testing.assert_array_equal(zone_ids, [names.index(('Asia/Karachi', 'Asia/Kolkata')[zone]) if zone >= 0 else -1
+                                             for zone in expected])
+
+@pytest.fixture
+def bundled_index(tmp_path, monkeypatch):
+    """First-run index built from the bundled boundaries into a fresh directory."""
+    monkeypatch.setenv('KUNDLI_TIMEZONE_INDEX', str(tmp_path / 'timezones'))
+    timezones.get_timezone_index.cache_clear()
+    yield tmp_path / 'timezones'
+    timezones.get_timezone_index.cache_clear()
+
+def test_index_is_built_from_the_bundled_boundaries_on_first_use(bundled_index):
+    assert not bundled_index.exists()
+    assert timezones.resolve_timezone(28.6139, 77.2090) == 'Asia/Kolkata'
+    assert (bundled_index / 'zones.json').exists()
+    assert timezones.utc_offset_hours(27.7172, 85.3240, datetime(2000, 1, 1, 12)) == 5.75
+    assert timezones.resolve_timezone(31.5497, 74.3436) == 'Asia/Karachi'    # Lahore, 0.5 degrees from Amritsar
+    assert timezones.resolve_timezone(31.6340, 74.8723) == 'Asia/Kolkata'    # Amritsar
+
+def test_locations_outside_the_boundary_data_raise(bundled_index):
+    with pytest.raises(LookupError):
+        timezones.resolve_timezone(51.5074, -0.1278)
+    # The batch path cannot ask for an offset, so it keeps the nautical band
+    _, offsets, zones = timezones.to_utc_batch([datetime(2000, 1, 1, 12)], [51.5074], [-0.1278])
+    assert zones == ['Etc/GMT'] and offsets[0] == 0.0
+
+def test_missing_index_without_boundaries_raises(bundled_index, monkeypatch):
+    monkeypatch.setattr(timezones, 'BUNDLED_BOUNDARIES', str(bundled_index / 'missing.geojson'))
+    with pytest.raises(FileNotFoundError):
+        timezones.resolve_timezone(28.6139, 77.2090)
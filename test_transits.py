@@ -0,0 +1,66 @@
+# test_transits.py
+from datetime import datetime
+import numpy as np
+import pytest
+from skyfield.api import utc
+import transits
+from chart_store import ChartStore
+from kundli_calculator import PLANET_NAMES
+from test_chart_store import fill, synthetic_batch
+
+WHEN = datetime(2015, 3, 2, 12, tzinfo=utc)
+TRANSIT_DEGREES = np.linspace(5, 335, len(PLANET_NAMES))
+
+def fixed_positions(monkeypatch):
+    monkeypatch.setattr(transits, 'transit_positions', lambda when, zodiac, ayanamsa: TRANSIT_DEGREES)
+
+def test_appends_during_a_run_do_not_overrun_the_output(tmp_path, monkeypatch):
+    fixed_positions(monkeypatch)
+    store = ChartStore(str(tmp_path / 'charts'))
+    fill(store, [30, 20])
+    take_snapshot = store._snapshot
+
+    def append_then_snapshot(names):
+        # Another process appends while the job starts
+        store.append(synthetic_batch(7, 99), np.zeros(7), np.zeros(7))
+        monkeypatch.setattr(store, '_snapshot', take_snapshot)
+        return take_snapshot(names)
+
+    monkeypatch.setattr(store, '_snapshot', append_then_snapshot)
+    _, summaries = transits.run_daily_transits(store, WHEN, out_dir=str(tmp_path / 'out'), chunk_rows=8)
+
+    np.testing.assert_array_equal(summaries['row_id'], np.arange(57))
+    np.testing.assert_array_equal(summaries['user_id'], np.concatenate([np.arange(30), np.arange(20) + 1000,
+                                                                        np.full(7, -1)]))
+
+def test_personal_summary_matches_the_daily_file(tmp_path, monkeypatch):
+    fixed_positions(monkeypatch)
+    store = ChartStore(str(tmp_path / 'charts'))
+    fill(store, [40])
+    out_dir = str(tmp_path / 'out')
+    _, summaries = transits.run_daily_transits(store, WHEN, out_dir=out_dir)
+    expected = transits.format_transit_summary(summaries[17], TRANSIT_DEGREES)
+
+    assert transits.personal_transit_summary(store, 17, WHEN, out_dir)[1] == expected
+    # A chart stored after the job ran is evaluated on its own
+    assert transits.personal_transit_summary(store, 17, WHEN, str(tmp_path / 'missing'))[1] == expected
+    assert "natal House" in expected
+
+def test_daily_prediction_prompt_gets_the_chart_summary(tmp_path, monkeypatch):
+    ai_chat = pytest.importorskip('ai_chat')
+    fixed_positions(monkeypatch)
+    store = ChartStore(str(tmp_path / 'charts'))
+    fill(store, [5])
+    received = {}
+
+    class RecordingInterpreter:
+        def get_daily_prediction(self, current_positions, birth_chart_summary, transit_summary=None):
+            received.update(current_positions=current_positions, transit_summary=transit_summary)
+            return "prediction"
+
+    monkeypatch.setattr(ai_chat, 'get_shared_interpreter', RecordingInterpreter)
+    chart = {'birth_info': '1 January 2000 at 12:00, Delhi', 'ascendant': 'Leo', 'row_id': 3}
+    assert ai_chat.daily_prediction(chart, store) == "prediction"
+    _, expected = transits.personal_transit_summary(store, 3, out_dir=None)
+    assert received['transit_summary'] == expected
+    assert received['current_positions'] == transits.transit_sign_line(TRANSIT_DEGREES)
@@ -0,0 +1,53 @@
+# test_vargas.py
+import numpy as np
+import pytest
+from utils import ZODIAC_SIGNS
+from vargas import VARGAS, compute_vargas, divisional_signs, varga_chart
+
+def sign(name):
+    return ZODIAC_SIGNS.index(name)
+
+def longitude(sign_name, degree):
+    return sign(sign_name) * 30 + degree
+
+# Navamsa counting starts from the movable sign of the rasi's element
+NAVAMSA_START = {'fire': 'Aries', 'earth': 'Capricorn', 'air': 'Libra', 'water': 'Cancer'}
+ELEMENTS = ('fire', 'earth', 'air', 'water')
+
+@pytest.mark.parametrize('rasi', ZODIAC_SIGNS)
+def test_navamsa_counts_from_the_element_start(rasi):
+    start = sign(NAVAMSA_START[ELEMENTS[sign(rasi) % 4]])
+    degrees = np.array([part * 30 / 9 + 0.1 for part in range(9)])
+    expected = [(start + part) % 12 for part in range(9)]
+    np.testing.assert_array_equal(divisional_signs(longitude(rasi, degrees), 9), expected)
+
+@pytest.mark.parametrize('rasi, degree, ruler_sign', [
+    ('Aries', 4.9, 'Aries'), ('Aries', 5.1, 'Aquarius'), ('Leo', 12.0, 'Sagittarius'),
+    ('Gemini', 24.9, 'Gemini'), ('Libra', 29.9, 'Libra'),
+    ('Taurus', 4.9, 'Taurus'), ('Cancer', 11.9, 'Virgo'), ('Virgo', 19.9, 'Pisces'),
+    ('Scorpio', 22.0, 'Capricorn'), ('Pisces', 25.0, 'Scorpio'),
+])
+def test_trimsamsa_uses_the_unequal_parts(rasi, degree, ruler_sign):
+    # Odd signs: Mars 5, Saturn 5, Jupiter 8, Mercury 7, Venus 5 degrees; even signs in reverse
+    assert divisional_signs(longitude(rasi, degree), 30) == sign(ruler_sign)
+
+@pytest.mark.parametrize('rasi, degree, expected', [
+    ('Aries', 0.2, 'Aries'), ('Aries', 29.9, 'Pisces'), ('Taurus', 14.6, 'Libra'), ('Pisces', 0.6, 'Aries'),
+])
+def test_shashtiamsa_counts_half_degrees_from_the_sign(rasi, degree, expected):
+    assert divisional_signs(longitude(rasi, degree), 60) == sign(expected)
+
+def test_batch_matches_single_vargas_and_rasi():
+    longitudes = np.random.default_rng(1).uniform(0, 360, (50, 8))
+    vargas = compute_vargas(longitudes)
+    for row, division in enumerate(VARGAS):
+        np.testing.assert_array_equal(vargas[row], divisional_signs(longitudes, division))
+    np.testing.assert_array_equal(vargas[0], longitudes // 30)
+
+def test_varga_chart_houses_count_from_the_varga_ascendant():
+    planets = {'Sun': {'raw_degree': longitude('Aries', 1.0)}, 'Moon': {'raw_degree': longitude('Taurus', 1.0)}}
+    varga_planets, ascendant = varga_chart(planets, longitude('Gemini', 1.0), 9)
+    # Navamsa: Aries 1 -> Aries, Taurus 1 -> Capricorn, Gemini 1 -> Libra
+    assert ascendant == 'Libra'
+    assert (varga_planets['Sun']['degree'], varga_planets['Sun']['house']) == ('Aries', 7)
+    assert (varga_planets['Moon']['degree'], varga_planets['Moon']['house']) == ('Capricorn', 4)
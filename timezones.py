@@ -0,0 +1,267 @@
+# timezones.py
+import argparse
+import json
+import os
+from datetime import timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+import numpy as np
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'timezones')
+# Coarse boundaries of India and its neighbours, indexed on first use when no full index has been built
+BUNDLED_BOUNDARIES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'timezone_boundaries.geojson')
+DEFAULT_CELL_DEGREES = 1.0
+# Reference points sit at this fraction of each cell so they never land on a
+# boundary drawn along whole or half degrees
+REFERENCE_FRACTION = 0.4813
+
+def _read_edges(geojson_path):
+    """Flatten every ring of every zone polygon into (x1, y1, x2, y2) edges."""
+    with open(geojson_path) as f:
+        features = json.load(f)['features']
+
+    zone_names = sorted({feature['properties']['tzid'] for feature in features})
+    zone_ids = {name: index for index, name in enumerate(zone_names)}
+    edges, edge_zones = [], []
+    for feature in features:
+        geometry = feature['geometry']
+        polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+        for polygon in polygons:
+            for ring in polygon:
+                ring = np.asarray(ring, dtype=np.float64)[:, :2]
+                if not np.array_equal(ring[0], ring[-1]):
+                    ring = np.vstack([ring, ring[:1]])
+                edges.append(np.hstack([ring[:-1], ring[1:]]))
+                edge_zones.append(np.full(len(ring) - 1, zone_ids[feature['properties']['tzid']], dtype=np.int16))
+    return zone_names, np.concatenate(edges), np.concatenate(edge_zones)
+
+def _reference_zones(edges, edge_zones, ref_x, ref_y):
+    """Zone containing each grid reference point, by even-odd ray casting along each row."""
+    x1, y1, x2, y2 = edges.T
+    ref_zone = np.full((len(ref_y), len(ref_x)), -1, dtype=np.int16)
+    for row, y in enumerate(ref_y):
+        crossing = (y1 > y) != (y2 > y)
+        xs = x1[crossing] + (y - y1[crossing]) * (x2[crossing] - x1[crossing]) / (y2[crossing] - y1[crossing])
+        zones = edge_zones[crossing]
+        for zone in np.unique(zones):
+            zone_xs = np.sort(xs[zones == zone])
+            # Odd number of crossings to the right means inside
+            inside = (len(zone_xs) - np.searchsorted(zone_xs, ref_x, side='right')) % 2 == 1
+            ref_zone[row, inside] = zone
+    return ref_zone
+
+def build_timezone_index(geojson_path, output_dir=DEFAULT_INDEX_DIR, cell_degrees=DEFAULT_CELL_DEGREES):
+    """
+    Build the offline timezone index from boundary polygons.
+
+    The source is a GeoJSON FeatureCollection with a 'tzid' property per
+    feature, e.g. combined-with-oceans.json from timezone-boundary-builder.
+    Every polygon edge is bucketed into the grid cells its bounding box
+    touches, and the zone of one reference point per cell is resolved once
+    here, so lookups only test the edges of a single cell.
+
+    Args:
+        geojson_path: Path to the boundary GeoJSON
+        output_dir: Directory to write the index into
+        cell_degrees: Grid cell size in degrees
+
+    Returns:
+        str: The index directory
+    """
+    zone_names, edges, edge_zones = _read_edges(geojson_path)
+    n_rows, n_cols = int(round(180 / cell_degrees)), int(round(360 / cell_degrees))
+
+    # Cells overlapped by each edge's bounding box
+    col_lo = np.clip(np.floor((np.minimum(edges[:, 0], edges[:, 2]) + 180) / cell_degrees), 0, n_cols - 1).astype(np.int64)
+    col_hi = np.clip(np.floor((np.maximum(edges[:, 0], edges[:, 2]) + 180) / cell_degrees), 0, n_cols - 1).astype(np.int64)
+    row_lo = np.clip(np.floor((np.minimum(edges[:, 1], edges[:, 3]) + 90) / cell_degrees), 0, n_rows - 1).astype(np.int64)
+    row_hi = np.clip(np.floor((np.maximum(edges[:, 1], edges[:, 3]) + 90) / cell_degrees), 0, n_rows - 1).astype(np.int64)
+    widths = col_hi - col_lo + 1
+    counts = widths * (row_hi - row_lo + 1)
+    edge_ids = np.repeat(np.arange(len(edges)), counts)
+    local = np.arange(len(edge_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+    cells = ((row_lo[edge_ids] + local // widths[edge_ids]) * n_cols + col_lo[edge_ids] + local % widths[edge_ids])
+
+    order = np.argsort(cells, kind='stable')
+    cell_offsets = np.zeros(n_rows * n_cols + 1, dtype=np.int64)
+    cell_offsets[1:] = np.cumsum(np.bincount(cells, minlength=n_rows * n_cols))
+
+    ref_x = np.arange(n_cols) * cell_degrees - 180 + REFERENCE_FRACTION * cell_degrees
+    ref_y = np.arange(n_rows) * cell_degrees - 90 + REFERENCE_FRACTION * cell_degrees
+    ref_zone = _reference_zones(edges, edge_zones, ref_x, ref_y)
+
+    os.makedirs(output_dir, exist_ok=True)
+    arrays = {'edges': edges.astype(np.float32), 'edge_zones': edge_zones, 'cell_offsets': cell_offsets,
+              'cell_edges': edge_ids[order].astype(np.int32), 'reference_zones': ref_zone}
+    for name, values in arrays.items():
+        tmp_path = os.path.join(output_dir, f'{name}.tmp.npy')
+        np.save(tmp_path, values)
+        os.replace(tmp_path, os.path.join(output_dir, f'{name}.npy'))
+
+    # Lookups outside the source's extent have no boundary data (a regional source leaves most of the globe out)
+    bounds = [float(np.minimum(edges[:, 0], edges[:, 2]).min()), float(np.minimum(edges[:, 1], edges[:, 3]).min()),
+              float(np.maximum(edges[:, 0], edges[:, 2]).max()), float(np.maximum(edges[:, 1], edges[:, 3]).max())]
+    manifest_path = os.path.join(output_dir, 'zones.json')
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump({'cell_degrees': cell_degrees, 'zones': zone_names, 'bounds': bounds,
+                   'source': os.path.basename(geojson_path)}, f)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return output_dir
+
+class TimezoneIndex:
+    """
+    Grid spatial index over timezone boundary polygons.
+
+    Each cell stores the edges crossing it and the zone of one reference
+    point inside it. A point's zone is the reference zone, toggled by every
+    boundary the segment from the reference point to the query point
+    crosses, so a lookup tests only one cell's edges. Arrays are
+    memory-mapped, so opening the index is cheap.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_DIR):
+        manifest_path = os.path.join(path, 'zones.json')
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"No timezone index in {path}. Build it with: "
+                                    f"python timezones.py --source combined-with-oceans.json")
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.cell_degrees = manifest['cell_degrees']
+        self.zone_names = manifest['zones']
+        self.bounds = manifest.get('bounds', [-180.0, -90.0, 180.0, 90.0])
+        self.n_rows, self.n_cols = int(round(180 / self.cell_degrees)), int(round(360 / self.cell_degrees))
+        load = lambda name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        self.edges = load('edges')
+        self.edge_zones = load('edge_zones')
+        self.cell_offsets = load('cell_offsets')
+        self.cell_edges = load('cell_edges')
+        self.reference_zones = load('reference_zones')
+
+    def zone_ids(self, latitudes, longitudes):
+        """
+        Vectorized lookup of zone ids (indices into zone_names, -1 outside every polygon).
+        """
+        lat = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+        lon = (lon + 180) % 360 - 180
+        rows = np.clip(np.floor((lat + 90) / self.cell_degrees), 0, self.n_rows - 1).astype(np.int64)
+        cols = np.clip(np.floor((lon + 180) / self.cell_degrees), 0, self.n_cols - 1).astype(np.int64)
+        result = self.reference_zones[rows, cols].astype(np.int64)
+        ref_x = cols * self.cell_degrees - 180 + REFERENCE_FRACTION * self.cell_degrees
+        ref_y = rows * self.cell_degrees - 90 + REFERENCE_FRACTION * self.cell_degrees
+
+        # Expand every point into (point, edge of its cell) pairs
+        cells = rows * self.n_cols + cols
+        starts = self.cell_offsets[cells]
+        counts = self.cell_offsets[cells + 1] - starts
+        points = np.repeat(np.arange(len(lat)), counts)
+        if not len(points):
+            return result
+        positions = np.arange(len(points)) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+        edge_ids = self.cell_edges[positions]
+        x1, y1, x2, y2 = self.edges[edge_ids].astype(np.float64).T
+        ax, ay, bx, by = ref_x[points], ref_y[points], lon[points], lat[points]
+
+        # Proper segment intersection by orientation signs
+        def orient(px, py, qx, qy, rx, ry):
+            return (qx - px) * (ry - py) - (qy - py) * (rx - px)
+
+        crosses = ((orient(ax, ay, bx, by, x1, y1) > 0) != (orient(ax, ay, bx, by, x2, y2) > 0)) & \
+                  ((orient(x1, y1, x2, y2, ax, ay) > 0) != (orient(x1, y1, x2, y2, bx, by) > 0))
+
+        # Zones crossed an odd number of times flip membership
+        n_zones = len(self.zone_names)
+        keys, key_counts = np.unique(points[crosses] * n_zones + self.edge_zones[edge_ids[crosses]], return_counts=True)
+        odd = keys[key_counts % 2 == 1]
+        odd_points, odd_zones = odd // n_zones, odd % n_zones
+        leaves_reference = odd_zones == result[odd_points]
+        result[odd_points[leaves_reference]] = -1
+        result[odd_points[~leaves_reference]] = odd_zones[~leaves_reference]
+        return result
+
+    def covers(self, latitudes, longitudes):
+        """Whether each point lies inside the extent of the boundary data the index was built from."""
+        lat = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+        lon = (np.atleast_1d(np.asarray(longitudes, dtype=np.float64)) + 180) % 360 - 180
+        min_lon, min_lat, max_lon, max_lat = self.bounds
+        return (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+
+    def zone_names_for(self, latitudes, longitudes):
+        """IANA zone names for many points; points outside every polygon get a nautical Etc/GMT zone."""
+        lon = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+        return [self.zone_names[zone] if zone >= 0 else _nautical_zone(lon_value)
+                for zone, lon_value in zip(self.zone_ids(latitudes, longitudes), lon)]
+
+def _nautical_zone(longitude):
+    """Etc/GMT zone of the 15 degree nautical band (Etc signs are inverted)."""
+    hours = int(np.clip(np.round(((longitude + 180) % 360 - 180) / 15), -12, 12))
+    return 'Etc/GMT' if hours == 0 else f"Etc/GMT{'-' if hours > 0 else '+'}{abs(hours)}"
+
+@lru_cache(maxsize=1)
+def get_timezone_index(path=DEFAULT_INDEX_DIR):
+    """
+    Open the timezone index once per process.
+
+    When no index has been built yet, one is built from the bundled
+    boundaries on first use (like the ayanamsa table).
+    """
+    path = os.getenv('KUNDLI_TIMEZONE_INDEX', path)
+    if not os.path.exists(os.path.join(path, 'zones.json')) and os.path.exists(BUNDLED_BOUNDARIES):
+        try:
+            build_timezone_index(BUNDLED_BOUNDARIES, path)
+        except OSError:
+            pass  # Read-only install: TimezoneIndex reports the missing index
+    return TimezoneIndex(path)
+
+def resolve_timezone(latitude, longitude):
+    """
+    IANA timezone name for a location.
+
+    Raises:
+        LookupError: If the location lies outside the index's boundary data
+    """
+    index = get_timezone_index()
+    if not index.covers([latitude], [longitude])[0]:
+        raise LookupError(f"No timezone boundaries cover ({latitude:.4f}, {longitude:.4f}). Build the full index with: "
+                          f"python timezones.py --source combined-with-oceans.json")
+    return index.zone_names_for([latitude], [longitude])[0]
+
+def utc_offset_hours(latitude, longitude, local_dt):
+    """
+    Historical UTC offset in hours (DST included) for a local civil time at a location.
+
+    Ambiguous times at the end of DST resolve to the first occurrence.
+    """
+    return ZoneInfo(resolve_timezone(latitude, longitude)).utcoffset(local_dt.replace(tzinfo=None)).total_seconds() / 3600.0
+
+def to_utc(local_dt, latitude, longitude):
+    """Convert a local civil datetime at a location to a naive UTC datetime."""
+    return local_dt.replace(tzinfo=None) - timedelta(hours=utc_offset_hours(latitude, longitude, local_dt))
+
+def to_utc_batch(local_datetimes, latitudes, longitudes):
+    """
+    Resolve many local birth times at once for the bulk pipeline.
+
+    Locations are resolved with one vectorized index lookup; offsets come
+    from tzdata per (zone, datetime). Points outside the boundary data get
+    their nautical Etc/GMT band instead of raising.
+
+    Returns:
+        tuple: (naive UTC datetimes, offsets in hours, zone names)
+    """
+    zones = get_timezone_index().zone_names_for(latitudes, longitudes)
+    offsets = np.array([ZoneInfo(zone).utcoffset(dt.replace(tzinfo=None)).total_seconds() / 3600.0
+                        for zone, dt in zip(zones, local_datetimes)])
+    utc_datetimes = [dt.replace(tzinfo=None) - timedelta(hours=offset) for dt, offset in zip(local_datetimes, offsets)]
+    return utc_datetimes, offsets, zones
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the offline timezone index from boundary GeoJSON")
+    parser.add_argument("--source", required=True, help="GeoJSON with a 'tzid' property per feature")
+    parser.add_argument("--output", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--cell", type=float, default=DEFAULT_CELL_DEGREES, help="Grid cell size in degrees")
+    args = parser.parse_args()
+
+    path = build_timezone_index(args.source, args.output, args.cell)
+    index = TimezoneIndex(path)
+    print(f"Indexed {len(index.edges)} edges of {len(index.zone_names)} zones into {path}")
@@ -0,0 +1,247 @@
+# transits.py
+import argparse
+import os
+from datetime import datetime
+import numpy as np
+from skyfield.api import utc
+from skyfield.framelib import ecliptic_frame
+from kundli_calculator import PLANET_NAMES, EPHEMERIS_TARGETS
+from ephemeris import load_skyfield
+from ayanamsa import get_ayanamsa
+from chart_store import ChartStore, DEFAULT_STORE_DIR
+from utils import ZODIAC_SIGNS, sign_indices, house_numbers, format_degree
+
+DEFAULT_OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'transits')
+DEFAULT_ORB = 5.0
+CHUNK_ROWS = 1_000_000
+MOON = PLANET_NAMES.index('Moon')
+SATURN = PLANET_NAMES.index('Saturn')
+JUPITER = PLANET_NAMES.index('Jupiter')
+
+# Flag bits in the per-user summary
+FLAG_SATURN_ON_MOON = 1       # transit Saturn conjunct natal Moon within the orb
+FLAG_JUPITER_ON_MOON = 2      # transit Jupiter conjunct natal Moon within the orb
+FLAG_SADE_SATI = 4            # Saturn in the 12th, 1st or 2nd sign from the natal Moon
+
+def summary_dtype(n_bodies=len(PLANET_NAMES)):
+    """Structured dtype of one per-user transit summary record."""
+    return np.dtype([
+        ('row_id', np.int64),
+        ('user_id', np.int64),
+        ('transit_houses', np.int8, (n_bodies,)),   # natal house occupied by each transiting body
+        ('conjunctions', np.uint64),                # bit (transit * n_bodies + natal) set when within orb
+        ('saturn_from_moon', np.int8),              # sign count of transit Saturn from natal Moon (1-12)
+        ('jupiter_from_moon', np.int8),             # sign count of transit Jupiter from natal Moon (1-12)
+        ('flags', np.uint8),
+    ])
+
+def transit_positions(when=None, zodiac='sidereal', ayanamsa='lahiri'):
+    """
+    Compute geocentric positions of all bodies once for the job.
+
+    Args:
+        when: Timezone-aware datetime (defaults to now)
+        zodiac: 'tropical' or 'sidereal' (should match the chart store)
+        ayanamsa: Ayanamsa system for sidereal positions
+
+    Returns:
+        numpy.ndarray: Longitudes in degrees, PLANET_NAMES order
+    """
+    ts, eph = load_skyfield()
+    t = ts.from_datetime(when or datetime.now(tz=utc))
+    earth_at_t = eph['earth'].at(t)
+    degrees = np.array([
+        earth_at_t.observe(eph[EPHEMERIS_TARGETS[name]]).frame_latlon(ecliptic_frame)[1].degrees % 360
+        for name in PLANET_NAMES
+    ])
+    if zodiac == 'sidereal':
+        degrees = (degrees - get_ayanamsa(t.ut1, ayanamsa)) % 360
+    return degrees
+
+def evaluate_transits(natal_degrees, natal_ascendants, transit_degrees, orb=DEFAULT_ORB):
+    """
+    Evaluate transits against many natal charts in one vectorized pass.
+
+    Args:
+        natal_degrees: (n_charts, n_bodies) natal longitudes
+        natal_ascendants: (n_charts,) natal ascendant longitudes
+        transit_degrees: (n_bodies,) current longitudes
+        orb: Conjunction orb in degrees
+
+    Returns:
+        numpy.ndarray: Structured summary records (row_id/user_id left at -1)
+    """
+    natal_degrees = np.mod(np.asarray(natal_degrees, dtype=np.float64), 360)
+    transit_degrees = np.mod(np.asarray(transit_degrees, dtype=np.float64), 360)
+    natal_ascendants = np.asarray(natal_ascendants, dtype=np.float64)
+    n_charts, n_bodies = natal_degrees.shape
+    if n_bodies * n_bodies > 64:
+        raise ValueError("Conjunction mask supports at most 8 bodies")
+    summary = np.empty(n_charts, dtype=summary_dtype(n_bodies))
+    summary['row_id'] = -1
+    summary['user_id'] = -1
+
+    # Which natal house each transiting body occupies
+    summary['transit_houses'] = house_numbers(transit_degrees[None, :], natal_ascendants[:, None])
+
+    # Transit x natal conjunction matrix, packed into one 64-bit mask per chart
+    # Longitudes are already in [0, 360), so a wrap check replaces the modulo
+    separation = np.abs(transit_degrees.astype(np.float32)[None, :, None] - natal_degrees.astype(np.float32)[:, None, :])
+    conjunct = (separation <= orb) | (separation >= 360.0 - orb)
+    packed = np.zeros((n_charts, 8), dtype=np.uint8)
+    packed[:, :(n_bodies * n_bodies + 7) // 8] = np.packbits(conjunct.reshape(n_charts, -1), axis=1, bitorder='little')
+    summary['conjunctions'] = packed.view('<u8')[:, 0]
+
+    # Gochara counts from the natal Moon sign
+    moon_signs = sign_indices(natal_degrees[:, MOON]).astype(np.int16)
+    saturn_from_moon = (sign_indices(transit_degrees[SATURN]) - moon_signs) % 12 + 1
+    jupiter_from_moon = (sign_indices(transit_degrees[JUPITER]) - moon_signs) % 12 + 1
+    summary['saturn_from_moon'] = saturn_from_moon
+    summary['jupiter_from_moon'] = jupiter_from_moon
+
+    flags = np.zeros(n_charts, dtype=np.uint8)
+    flags |= np.where(conjunct[:, SATURN, MOON], FLAG_SATURN_ON_MOON, 0).astype(np.uint8)
+    flags |= np.where(conjunct[:, JUPITER, MOON], FLAG_JUPITER_ON_MOON, 0).astype(np.uint8)
+    flags |= np.where(np.isin(saturn_from_moon, (12, 1, 2)), FLAG_SADE_SATI, 0).astype(np.uint8)
+    summary['flags'] = flags
+    return summary
+
+def run_daily_transits(store, when=None, out_dir=None, orb=DEFAULT_ORB, ayanamsa='lahiri', chunk_rows=CHUNK_ROWS):
+    """
+    Evaluate today's transits for every chart in a ChartStore.
+
+    Positions are computed once; natal columns are streamed from the
+    memory-mapped segments in chunks, so memory stays bounded.
+
+    Args:
+        store: ChartStore instance
+        when: Timezone-aware datetime (defaults to now)
+        out_dir: Optional directory; summaries are written to transits-YYYY-MM-DD.npy
+        orb: Conjunction orb in degrees
+        ayanamsa: Ayanamsa system when the store is sidereal
+        chunk_rows: Charts evaluated per vectorized step
+
+    Returns:
+        tuple: (transit_degrees, summaries) where summaries is a structured
+               array or, when out_dir is given, a read-only memory map of the file
+    """
+    when = when or datetime.now(tz=utc)
+    transit_degrees = transit_positions(when, store.zodiac, ayanamsa)
+    dtype = summary_dtype(len(store.planet_names))
+    # One manifest snapshot sizes the output and feeds the chunks, so concurrent appends cannot overrun it
+    degree_columns = [f'{name}_degree' for name in store.planet_names]
+    snapshot = store._snapshot(degree_columns + ['ascendant', 'user_id'])
+    total = sum(segment['rows'] for segment, _ in snapshot)
+
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+        out_path = os.path.join(out_dir, f"transits-{when.strftime('%Y-%m-%d')}.npy")
+        summaries = np.lib.format.open_memmap(out_path + '.tmp.npy', mode='w+', dtype=dtype, shape=(total,))
+    else:
+        summaries = np.empty(total, dtype=dtype)
+
+    body_order = [PLANET_NAMES.index(name) for name in store.planet_names]
+    transit_for_store = transit_degrees[body_order]
+
+    for first_row, columns in store.iter_chunks(degree_columns + ['ascendant', 'user_id'], chunk_rows, snapshot):
+        natal = np.column_stack([columns[column] for column in degree_columns])
+        chunk = evaluate_transits(natal, columns['ascendant'], transit_for_store, orb)
+        chunk['row_id'] = np.arange(first_row, first_row + len(chunk))
+        chunk['user_id'] = columns['user_id']
+        summaries[first_row:first_row + len(chunk)] = chunk
+
+    if out_dir:
+        summaries.flush()
+        del summaries
+        os.replace(out_path + '.tmp.npy', out_path)
+        summaries = np.load(out_path, mmap_mode='r')
+    return transit_degrees, summaries
+
+def format_transit_summary(record, transit_degrees, planet_names=PLANET_NAMES):
+    """
+    Render one summary record as text for the daily prediction prompt.
+
+    Args:
+        record: One element of the summaries array
+        transit_degrees: Transit longitudes from run_daily_transits
+        planet_names: Body order used by the store
+
+    Returns:
+        str: Compact description of today's personal transits
+    """
+    n_bodies = len(planet_names)
+    lines = [f"{name}: {format_degree(degree)} (natal House {house})"
+             for name, degree, house in zip(planet_names, transit_degrees, record['transit_houses'])]
+
+    conjunctions = int(record['conjunctions'])
+    pairs = [f"transit {planet_names[bit // n_bodies]} conjunct natal {planet_names[bit % n_bodies]}"
+             for bit in range(n_bodies * n_bodies) if conjunctions >> bit & 1]
+    if pairs:
+        lines.append("Conjunctions: " + ", ".join(pairs))
+
+    lines.append(f"Saturn is {record['saturn_from_moon']} signs from natal Moon, "
+                 f"Jupiter is {record['jupiter_from_moon']} signs from natal Moon")
+    flags = int(record['flags'])
+    if flags & FLAG_SADE_SATI:
+        lines.append("Sade Sati is active")
+    if flags & FLAG_SATURN_ON_MOON:
+        lines.append("Saturn is transiting over the natal Moon")
+    if flags & FLAG_JUPITER_ON_MOON:
+        lines.append("Jupiter is transiting over the natal Moon")
+    return "\n".join(lines)
+
+def personal_transit_summary(store, row_id, when=None, out_dir=DEFAULT_OUT_DIR, orb=DEFAULT_ORB, ayanamsa='lahiri'):
+    """
+    Today's transit summary for one stored chart, for the daily prediction prompt.
+
+    The record comes from the day's run_daily_transits file when it covers
+    the row; charts stored after the job ran are evaluated on their own.
+
+    Args:
+        store: ChartStore instance holding the chart
+        row_id: Global row id returned by ChartStore.append
+        when: Timezone-aware datetime (defaults to now)
+        out_dir: Directory of the daily summary files
+        orb: Conjunction orb in degrees (for charts not in the file)
+        ayanamsa: Ayanamsa system when the store is sidereal
+
+    Returns:
+        tuple: (transit_degrees, summary text from format_transit_summary)
+    """
+    when = when or datetime.now(tz=utc)
+    transit_degrees = transit_positions(when, store.zodiac, ayanamsa)
+    body_order = [PLANET_NAMES.index(name) for name in store.planet_names]
+    transit_for_store = transit_degrees[body_order]
+
+    record = None
+    out_path = os.path.join(out_dir, f"transits-{when.strftime('%Y-%m-%d')}.npy") if out_dir else None
+    if out_path and os.path.exists(out_path):
+        summaries = np.load(out_path, mmap_mode='r')
+        if row_id < len(summaries) and summaries[row_id]['row_id'] == row_id:
+            record = summaries[row_id]
+    if record is None:
+        degree_columns = [f'{name}_degree' for name in store.planet_names]
+        columns = store.read([row_id], degree_columns + ['ascendant', 'user_id'])
+        natal = np.column_stack([columns[column] for column in degree_columns])
+        record = evaluate_transits(natal, columns['ascendant'], transit_for_store, orb)[0]
+        record['row_id'] = row_id
+        record['user_id'] = columns['user_id'][0]
+    return transit_degrees, format_transit_summary(record, transit_for_store, store.planet_names)
+
+def transit_sign_line(transit_degrees, planet_names=PLANET_NAMES):
+    """One-line sign summary of current positions, e.g. for the generic forecast."""
+    return ", ".join(f"{name} in {ZODIAC_SIGNS[sign]}" for name, sign in zip(planet_names, sign_indices(transit_degrees)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate today's transits against all stored natal charts")
+    parser.add_argument("--store", default=os.getenv("CHART_STORE_DIR", DEFAULT_STORE_DIR))
+    parser.add_argument("--out", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--date", help="UTC date (YYYY-MM-DD), defaults to now")
+    parser.add_argument("--orb", type=float, default=DEFAULT_ORB)
+    args = parser.parse_args()
+
+    when = datetime.strptime(args.date, "%Y-%m-%d").replace(hour=12, tzinfo=utc) if args.date else None
+    started = datetime.now()
+    degrees, results = run_daily_transits(ChartStore(args.store), when, args.out, args.orb)
+    print(f"Evaluated {len(results)} charts in {(datetime.now() - started).total_seconds():.1f}s")
+    print(f"Transits: {transit_sign_line(degrees)}")
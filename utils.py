@@ -1,5 +1,17 @@
 # utils.py
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+ZODIAC_SIGNS = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo", "Libra", "Scorpio",
+                "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+
+NAKSHATRAS = ["Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra", "Punarvasu",
+              "Pushya", "Ashlesha", "Magha", "Purva Phalguni", "Uttara Phalguni", "Hasta",
+              "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha", "Mula", "Purva Ashadha",
+              "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada",
+              "Uttara Bhadrapada", "Revati"]
+
+WEEKDAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
 
 def get_zodiac_sign(degree):
     """Map a degree (0-360) to its corresponding zodiac sign."""
@@ -22,12 +34,60 @@ def format_degree(degree):
     minutes = int((degree % 1) * 60)
     return f"{degrees}° {sign} {minutes}'"
 
+def parse_degree(degree_str):
+    """Parse a 'DD° Sign MM\'' string produced by format_degree back into 0-360 degrees."""
+    degrees, sign, minutes = degree_str.split("(")[0].replace("°", " ").replace("'", " ").split()
+    return ZODIAC_SIGNS.index(sign) * 30 + int(degrees) + int(minutes) / 60
+
 def get_house(degree, ascendant_degree=0):
     """Map a degree to an astrological house (equal house system)."""
     degree = (degree - ascendant_degree) % 360
     house = int(degree // 30) + 1
     return house if 1 <= house <= 12 else 12
 
+def sign_indices(degrees):
+    """Vectorized sign lookup: map degrees to sign indices (0=Aries ... 11=Pisces)."""
+    return (np.floor_divide(np.mod(degrees, 360), 30).astype(np.int8)) % 12
+
+def nakshatra_indices(degrees):
+    """Vectorized nakshatra lookup: map sidereal degrees to indices (0=Ashwini ... 26=Revati)."""
+    return np.minimum((np.mod(degrees, 360) // (360.0 / 27)).astype(np.int8), 26)
+
+def house_numbers(degrees, ascendant_degrees=0):
+    """Vectorized get_house: map degrees to equal-house numbers (1-12)."""
+    offset = np.mod(np.asarray(degrees) - ascendant_degrees, 360)
+    return (np.floor_divide(offset, 30).astype(np.int8) % 12) + 1
+
+def naive_utc(dt):
+    """Convert an aware datetime to naive UTC; naive values are assumed to be UTC already."""
+    if dt.tzinfo is not None and dt.utcoffset() is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.replace(tzinfo=None)
+
+def julian_date(dt):
+    """Julian date of a datetime (naive values are treated as UTC)."""
+    return 2440587.5 + (naive_utc(dt) - datetime(1970, 1, 1)).total_seconds() / 86400.0
+
+def jd_to_datetime(jd, utc_offset_hours=0.0):
+    """Naive datetime for a Julian date, shifted by a UTC offset in hours."""
+    return datetime(1970, 1, 1) + timedelta(days=float(jd) - 2440587.5, hours=utc_offset_hours)
+
+def refine_transitions(lower, upper, lower_state, evaluate, precision_days):
+    """
+    Bisect many state changes at once.
+
+    Each bracket [lower, upper] has evaluate() equal to lower_state at lower
+    and different at upper; every iteration evaluates all midpoints in a
+    single vectorized call. Returns the refined transition instants.
+    """
+    lower, upper = np.array(lower, dtype=float), np.array(upper, dtype=float)
+    while len(lower) and np.max(upper - lower) > precision_days:
+        middle = (lower + upper) / 2
+        same_as_lower = evaluate(middle) == lower_state
+        lower = np.where(same_as_lower, middle, lower)
+        upper = np.where(same_as_lower, upper, middle)
+    return (lower + upper) / 2
+
 def format_date(date_obj):
     """Format a datetime object into 'DD MMM YYYY'."""
     return date_obj.strftime("%d %b %Y")
@@ -36,6 +96,10 @@ def format_planets(planets_dict):
     """Return a formatted string of planets and their signs."""
     return "\n".join([f"{planet}: {sign}" for planet, sign in planets_dict.items()])
 
+def motion_note(pos):
+    """Suffix such as ', retrograde, combust' for the motion flags present in a planet entry."""
+    return "".join(f", {flag}" for flag in ('retrograde', 'stationary', 'combust') if pos.get(flag))
+
 def format_planet_positions(planets_dict):
     """Return a formatted string of planets with degrees and houses."""
-    return "\n".join([f"{planet}: {pos['degree']} (House {pos['house']})" for planet, pos in planets_dict.items()])
\ No newline at end of file
+    return "\n".join([f"{planet}: {pos['degree']} (House {pos['house']}{motion_note(pos)})" for planet, pos in planets_dict.items()])
\ No newline at end of file
@@ -0,0 +1,149 @@
+# vargas.py
+import numpy as np
+from utils import ZODIAC_SIGNS
+
+# The sixteen Shodasavarga divisions
+VARGAS = (1, 2, 3, 4, 7, 9, 10, 12, 16, 20, 24, 27, 30, 40, 45, 60)
+
+VARGA_NAMES = {
+    1: 'Rasi', 2: 'Hora', 3: 'Drekkana', 4: 'Chaturthamsa', 7: 'Saptamsa',
+    9: 'Navamsa', 10: 'Dasamsa', 12: 'Dwadasamsa', 16: 'Shodasamsa',
+    20: 'Vimsamsa', 24: 'Chaturvimsamsa', 27: 'Bhamsa', 30: 'Trimsamsa',
+    40: 'Khavedamsa', 45: 'Akshavedamsa', 60: 'Shashtiamsa',
+}
+
+# Trimsamsa uses unequal parts; boundaries in degrees and the sign ruled by each part
+_TRIMSAMSA_ODD = ((5, 0), (10, 10), (18, 8), (25, 2), (30, 6))    # Mars, Saturn, Jupiter, Mercury, Venus
+_TRIMSAMSA_EVEN = ((5, 1), (12, 5), (20, 11), (25, 9), (30, 7))   # Venus, Mercury, Jupiter, Saturn, Mars
+
+def _start_sign(sign, division):
+    """Sign from which the parts of a rasi are counted for equal-part vargas."""
+    odd = sign % 2 == 0           # Aries (index 0) is an odd sign
+    modality = sign % 3           # 0=movable, 1=fixed, 2=dual
+    if division in (1, 3, 4, 12, 60):
+        return sign
+    if division == 7:
+        return sign if odd else sign + 6
+    if division == 9:
+        return (sign * 9) % 12
+    if division == 10:
+        return sign if odd else sign + 8
+    if division in (16, 45):
+        return (0, 4, 8)[modality]
+    if division == 20:
+        return (0, 8, 4)[modality]
+    if division == 24:
+        return 4 if odd else 3
+    if division == 27:
+        return (sign * 27) % 12
+    if division == 40:
+        return 0 if odd else 6
+    raise ValueError(f"Unsupported division D{division}")
+
+def _build_table(division):
+    """Build the (12, parts) lookup table mapping (rasi, part) to varga sign."""
+    if division == 2:
+        # Hora: odd signs Sun (Leo) then Moon (Cancer); even signs the reverse
+        return np.array([[4, 3] if sign % 2 == 0 else [3, 4] for sign in range(12)], dtype=np.int8)
+    if division == 30:
+        # Unequal parts indexed by whole degree within the sign
+        table = np.empty((12, 30), dtype=np.int8)
+        for sign in range(12):
+            parts = _TRIMSAMSA_ODD if sign % 2 == 0 else _TRIMSAMSA_EVEN
+            lower = 0
+            for upper, ruler in parts:
+                table[sign, lower:upper] = ruler
+                lower = upper
+        return table
+    if division == 3:
+        return np.array([[(sign + 4 * part) % 12 for part in range(3)] for sign in range(12)], dtype=np.int8)
+    if division == 4:
+        return np.array([[(sign + 3 * part) % 12 for part in range(4)] for sign in range(12)], dtype=np.int8)
+    return np.array([[(_start_sign(sign, division) + part) % 12 for part in range(division)]
+                     for sign in range(12)], dtype=np.int8)
+
+VARGA_TABLES = {division: _build_table(division) for division in VARGAS}
+
+def _split_longitudes(longitudes):
+    """Split longitudes into rasi index and degrees within the rasi."""
+    longitudes = np.mod(np.asarray(longitudes, dtype=float), 360)
+    sign = (longitudes // 30).astype(np.intp) % 12
+    return sign, longitudes - sign * 30
+
+def _gather(division, sign, degree_in_sign):
+    """Look up varga signs for pre-split longitudes in one table gather."""
+    table = VARGA_TABLES[division]
+    parts = table.shape[1]
+    part = np.minimum((degree_in_sign * (parts / 30.0)).astype(np.intp), parts - 1)
+    return table[sign, part]
+
+def divisional_signs(longitudes, division):
+    """
+    Map longitudes to varga sign indices with a single table gather.
+
+    Args:
+        longitudes: Array of longitudes in degrees (any shape)
+        division: Varga number (e.g. 9 for Navamsa)
+
+    Returns:
+        numpy.ndarray: int8 sign indices (0=Aries ... 11=Pisces), same shape as input
+    """
+    if division not in VARGA_TABLES:
+        raise ValueError(f"Unsupported division D{division}. Choose from: {', '.join(f'D{d}' for d in VARGAS)}")
+    sign, degree_in_sign = _split_longitudes(longitudes)
+    return _gather(division, sign, degree_in_sign)
+
+def compute_vargas(longitudes, divisions=VARGAS):
+    """
+    Compute several vargas at once.
+
+    Args:
+        longitudes: Array of longitudes, e.g. (n_charts, n_bodies) from
+                    calculate_planets_batch with the ascendant appended as a column
+        divisions: Varga numbers to compute
+
+    Returns:
+        numpy.ndarray: int8 array of shape (len(divisions),) + longitudes.shape
+    """
+    unknown = [division for division in divisions if division not in VARGA_TABLES]
+    if unknown:
+        raise ValueError(f"Unsupported division D{unknown[0]}. Choose from: {', '.join(f'D{d}' for d in VARGAS)}")
+
+    # Rasi and in-sign degree are shared by every varga, so split once
+    sign, degree_in_sign = _split_longitudes(longitudes)
+    result = np.empty((len(divisions),) + sign.shape, dtype=np.int8)
+    for row, division in enumerate(divisions):
+        result[row] = _gather(division, sign, degree_in_sign)
+    return result
+
+def varga_houses(body_signs, ascendant_signs):
+    """Whole-sign houses (1-12) in a varga chart, counted from the varga ascendant."""
+    return (np.asarray(body_signs) - np.expand_dims(ascendant_signs, -1)) % 12 + 1
+
+def varga_chart(planets, ascendant_degree, division):
+    """
+    Build a planets dictionary for one varga that draw_kundali_chart can render.
+
+    Args:
+        planets: Planet dictionary from calculate_planets
+        ascendant_degree: Ascendant longitude in degrees (same zodiac as planets)
+        division: Varga number
+
+    Returns:
+        tuple: (varga_planets, ascendant_label) in the same shape as calculate_planets output
+    """
+    names = list(planets)
+    longitudes = np.array([planets[name]['raw_degree'] for name in names] + [ascendant_degree])
+    signs = divisional_signs(longitudes, division)
+    houses = varga_houses(signs[:-1], signs[-1])
+
+    varga_planets = {
+        name: {'degree': ZODIAC_SIGNS[sign], 'house': int(house), 'sign_index': int(sign)}
+        for name, sign, house in zip(names, signs[:-1], houses)
+    }
+    return varga_planets, ZODIAC_SIGNS[signs[-1]]
+
+def format_varga_positions(varga_planets, ascendant_sign, division):
+    """Return a compact one-line summary of a varga for AI prompts."""
+    placements = ", ".join(f"{planet} in {pos['degree']} (House {pos['house']})" for planet, pos in varga_planets.items())
+    return f"{VARGA_NAMES[division]} (D{division}) - Ascendant {ascendant_sign}: {placements}"